@@ -0,0 +1,145 @@
+"""
+Compare the results of benchmarks/suite.py with a baseline, and exit with an error if
+any benchmark regressed: if it emits more operations of some type or has a greater
+depth than in the baseline, or if its build time or peak memory grew by more than the
+given tolerance. Operation counts and depths do not depend on the machine, so they are
+compared exactly, depths only for the cases where both files measured them; build time
+does depend on it, so it is only compared when --time-tolerance is given, and only for
+cases that took at least --min-seconds to build. Peak memory is only compared for cases
+that allocated at least --min-bytes, as smaller peaks are dominated by noise.
+
+Run from the repository root:
+
+    python benchmarks/compare.py benchmarks/baseline.json results.json --time-tolerance 1.5
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional
+
+
+def load(path: str) -> Dict[tuple, dict]:
+    """
+    Load a results file, keyed by (name, rows, width)
+    """
+
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    return {(r["name"], r["rows"], r["width"]): r for r in report["results"]}
+
+
+def _ratio(baseline: Optional[float], result: Optional[float]) -> Optional[float]:
+    if baseline is None or result is None:
+        return None
+    return result / baseline if baseline > 0 else (1.0 if result <= 0 else float("inf"))
+
+
+def compare(
+        baseline: Dict[tuple, dict],
+        results: Dict[tuple, dict],
+        time_tolerance: float = None,
+        memory_tolerance: float = None,
+        min_seconds: float = 0.0,
+        min_bytes: int = 0
+) -> List[str]:
+    """
+    Return a description of every regression of **results** relative to **baseline**.
+    A tolerance of 1.5 allows build time (or peak memory) to grow by up to 50%, and no
+    tolerance skips the comparison. Build times are not compared for cases that took
+    less than **min_seconds** in both, and peak memory is not compared for cases that
+    allocated less than **min_bytes** in both.
+    """
+
+    regressions = []
+    for key, base in baseline.items():
+        if key not in results:
+            continue
+        result = results[key]
+        case = f"{key[0]} rows={key[1]} width={key[2] if key[2] is not None else '-'}"
+        for op in sorted(set(base["ops"]) | set(result["ops"])):
+            before, after = base["ops"].get(op, 0), result["ops"].get(op, 0)
+            if after > before:
+                regressions.append(f"{case}: {op} {before} -> {after}")
+        if None not in (base["depth"], result["depth"]) and result["depth"] > base["depth"]:
+            regressions.append(f"{case}: depth {base['depth']} -> {result['depth']}")
+        timed = max(base["seconds"], result["seconds"]) >= min_seconds
+        traced = max(base["peak_bytes"] or 0, result["peak_bytes"] or 0) >= min_bytes
+        tolerances = (
+            ("seconds", time_tolerance if timed else None),
+            ("peak_bytes", memory_tolerance if traced else None)
+        )
+        for metric, tolerance in tolerances:
+            ratio = _ratio(base[metric], result[metric])
+            if tolerance is not None and ratio is not None and ratio > tolerance:
+                regressions.append(
+                    f"{case}: {metric} {base[metric]:.6g} -> {result[metric]:.6g} "
+                    f"({ratio:.2f}x)"
+                )
+    return regressions
+
+
+def summary(baseline: Dict[tuple, dict], results: Dict[tuple, dict]) -> List[str]:
+    """
+    Return one line per benchmark name, giving the ratio of the total operations, build
+    time and peak memory of **results** to those of **baseline** over their common cases
+    """
+
+    totals: Dict[str, list] = {}
+    for key in baseline.keys() & results.keys():
+        total = totals.setdefault(key[0], [0, 0, 0.0, 0.0, 0, 0])
+        base, result = baseline[key], results[key]
+        total[0] += sum(base["ops"].values())
+        total[1] += sum(result["ops"].values())
+        total[2] += base["seconds"]
+        total[3] += result["seconds"]
+        total[4] += base["peak_bytes"] or 0
+        total[5] += result["peak_bytes"] or 0
+
+    lines = []
+    for name in sorted(totals):
+        ops, seconds, memory = (
+            _ratio(*totals[name][i:i + 2]) for i in range(0, 6, 2)
+        )
+        lines.append(f"{name:34s} ops {ops:6.3f}x  time {seconds:6.3f}x  memory {memory:6.3f}x")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("baseline", help="baseline results file")
+    parser.add_argument("results", help="results file to compare with the baseline")
+    parser.add_argument(
+        "--time-tolerance", type=float,
+        help="largest allowed ratio of build time to that of the baseline"
+    )
+    parser.add_argument(
+        "--min-seconds", type=float, default=0.01,
+        help="shortest build time for which build times are compared (default 0.01)"
+    )
+    parser.add_argument(
+        "--memory-tolerance", type=float, default=1.25,
+        help="largest allowed ratio of peak memory to that of the baseline (default 1.25)"
+    )
+    parser.add_argument(
+        "--min-bytes", type=int, default=65536,
+        help="smallest peak memory for which peak memory is compared (default 65536)"
+    )
+    args = parser.parse_args()
+
+    baseline, results = load(args.baseline), load(args.results)
+    print("\n".join(summary(baseline, results)))
+    missing = len(baseline.keys() - results.keys())
+    if missing:
+        print(f"{missing} baseline cases were not run", file=sys.stderr)
+
+    regressions = compare(
+        baseline, results, args.time_tolerance, args.memory_tolerance, args.min_seconds,
+        args.min_bytes
+    )
+    if regressions:
+        print("\n".join(regressions), file=sys.stderr)
+        sys.exit(f"{len(regressions)} regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Measure how program-build time grows along a chained select -> sort -> aggregate
+pipeline over nada_dsl SecretInteger values. Every link of the chain builds on the
+expression graph produced by the previous one, so copying that graph (rather than
+sharing references to it) makes each link more expensive than the last and the total
+build time quadratic in the length of the chain.
+
+Run from the repository root:
+
+    python benchmarks/pipeline.py --rows 32 --links 16 --check
+"""
+import argparse
+import math
+import sys
+import time
+from nada_dsl import SecretInteger, Input, Party
+from nada_data import NadaArray, NadaTable
+
+
+def build_table(rows: int) -> NadaTable:
+    """
+    Build a two-column table of fresh inputs
+    """
+
+    party = Party(name="party")
+    return NadaTable(
+        "k", "v",
+        rows=[
+            NadaArray(
+                SecretInteger(Input(name=f"k{i}", party=party)),
+                SecretInteger(Input(name=f"v{i}", party=party))
+            ) for i in range(rows)
+        ]
+    )
+
+
+def run(rows: int, links: int) -> list:
+    """
+    Build the chained pipeline and return the cumulative build time after each link
+    """
+
+    table = build_table(rows)
+    cumulative = []
+    start = time.perf_counter()
+    for _ in range(links):
+        table = table.select("k", "v").sort_by("k", True).aggregate_sum("k", "v")
+        cumulative.append(time.perf_counter() - start)
+    return cumulative
+
+
+def growth_exponent(cumulative: list) -> float:
+    """
+    Least-squares slope of log(total time) against log(number of links), which is
+    close to 1 for linear growth and close to 2 for quadratic growth
+    """
+
+    points = [(math.log(i + 1), math.log(t)) for i, t in enumerate(cumulative)]
+    points = points[len(points) // 4:]
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    return (
+        sum((x - mean_x) * (y - mean_y) for x, y in points) /
+        sum((x - mean_x) ** 2 for x, _ in points)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--rows", type=int, default=32, help="number of table rows")
+    parser.add_argument("--links", type=int, default=16, help="number of chained links")
+    parser.add_argument(
+        "--check", action="store_true",
+        help="exit with an error if build time grows faster than linearly"
+    )
+    args = parser.parse_args()
+
+    cumulative = run(args.rows, args.links)
+    previous = 0.0
+    for i, total in enumerate(cumulative):
+        print(f"link {i + 1:3d}: {total - previous:8.4f}s (total {total:8.4f}s)")
+        previous = total
+
+    exponent = growth_exponent(cumulative)
+    print(f"growth exponent: {exponent:.2f}")
+    if args.check and exponent > 1.25:
+        sys.exit("build time grows faster than linearly in the length of the pipeline")
+
+
+if __name__ == "__main__":
+    main()
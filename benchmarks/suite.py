@@ -0,0 +1,490 @@
+"""
+Measure the operation counts, circuit depth, build time and peak memory of the array and
+table operations of nada-data over nada_dsl.audit values, across a sweep of input sizes
+and table widths, and write the results as JSON.
+
+Operation counts are read from ``audit.Abstract.analysis``, which does not count
+subtractions and reports every order comparison as "cmp". Audit values do not record the
+graph they are computed from, so the circuit depth is measured in a separate build over
+nada_dsl inputs, as the largest number of operations other than additions and
+subtractions along a path of the resulting graph. Build time is the wall-clock time spent
+building the operation, not including the construction of its inputs, and peak memory is
+the largest amount of memory allocated while building it, as traced by ``tracemalloc`` in
+a separate run.
+
+Run from the repository root:
+
+    python benchmarks/suite.py --quick --output results.json
+    python benchmarks/compare.py benchmarks/baseline.json results.json
+
+The full sweep (every power of two from 2 to 16384 rows, and 1 to 32 columns) takes
+hours; use --rows, --widths, --max-cells and --only to restrict it.
+"""
+import argparse
+import fnmatch
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from importlib import metadata
+from typing import Callable, Dict, List, Optional
+from nada_dsl import audit, Input, Party, SecretInteger
+from nada_data import (
+    NadaArray, NadaTable, ColumnarNadaTable, serialize_input_table, nada_lt
+)
+from nada_data import array, table
+from nada_data.utils import initialize_table_data
+
+
+ROWS = [2 ** i for i in range(1, 15)]
+WIDTHS = [1, 2, 4, 8, 16, 32]
+QUICK_ROWS = [2, 8, 32, 128]
+QUICK_WIDTHS = [1, 2, 8]
+
+# largest number of input values for which depth is measured by default, as building
+# over nada_dsl inputs is far slower than over audit inputs
+DEPTH_CELLS = 256
+
+# largest key of the generated inputs, kept small so that groups and joins have matches
+KEYS = 16
+
+# name -> (build, minimum width); build(n, width) prepares fresh inputs and returns the
+# operation to measure, which returns the values it computes, or those it sorts in place
+BENCHMARKS: Dict[str, tuple] = {}
+
+# attributes through which nada_dsl graph nodes reference their operands
+OPERANDS = ("child", "left", "right", "this", "arg_0", "arg_1")
+
+# operations that the parties compute locally, without a round of communication
+LOCAL = {"Addition", "Subtraction"}
+
+# whether _inputs builds nada_dsl inputs, whose graph is kept, rather than audit inputs
+_GRAPH = {"enabled": False}
+
+
+def benchmark(name: str, min_width: int = 1) -> Callable:
+    """
+    Register a benchmark under **name**. Array benchmarks are registered with a
+    **min_width** of 0 and are only run once per number of rows.
+    """
+
+    def register(build: Callable) -> Callable:
+        BENCHMARKS[name] = (build, min_width)
+        return build
+
+    return register
+
+
+def _inputs(n: int, width: int, prefix: str = "p1_input_") -> List[NadaArray]:
+    """
+    Bind random values to **n** rows of **width** inputs, and return the rows
+    """
+
+    rng = random.Random(n * 1009 + width)
+    data = [
+        [rng.randrange(KEYS)] + [rng.randrange(1000) for _ in range(width - 1)]
+        for _ in range(n)
+    ]
+    # the last column of a wider row is a 0/1 bit, used as a keep bit by compaction
+    if width > 1:
+        for row in data:
+            row[-1] %= 2
+    if _GRAPH["enabled"]:
+        party = Party(name="party")
+        return [
+            NadaArray.from_values([
+                SecretInteger(Input(name=f"{prefix}{i}_{j}", party=party)) for j in range(width)
+            ], True) for i in range(n)
+        ]
+    initialize_table_data(prefix, data)
+    return serialize_input_table(data, audit.Party(name="party"), prefix)
+
+
+def _column(n: int) -> NadaArray:
+    return NadaArray([row[0] for row in _inputs(n, 1)])
+
+
+def _cells(rows: List[NadaArray]) -> List[list]:
+    return [list(row) for row in rows]
+
+
+def _bits(rows: List[NadaArray]) -> list:
+    return [row[-1] for row in rows]
+
+
+def _table(n: int, width: int) -> NadaTable:
+    return NadaTable(*(f"c{j}" for j in range(width)), rows=_inputs(n, width))
+
+
+def _k(n: int) -> int:
+    return max(1, n // 8)
+
+
+@benchmark("array.sum_nada_array", 0)
+def _sum_nada_array(n: int, _width: int) -> Callable:
+    values = _column(n)
+    return lambda: array.sum_nada_array(values)
+
+
+@benchmark("array.nada_max", 0)
+def _nada_max(n: int, _width: int) -> Callable:
+    values = _column(n)
+    return lambda: array.nada_max(values)
+
+
+@benchmark("array.nada_min", 0)
+def _nada_min(n: int, _width: int) -> Callable:
+    values = _column(n)
+    return lambda: array.nada_min(values)
+
+
+@benchmark("array.filter_nada_array", 0)
+def _filter_nada_array(n: int, _width: int) -> Callable:
+    values = _column(n)
+    return lambda: array.filter_nada_array(values, nada_lt, values[0])
+
+
+@benchmark("array.sort_nada_array", 0)
+def _sort_nada_array(n: int, _width: int) -> Callable:
+    values = list(_column(n))
+    return lambda: array.sort_nada_array(values)
+
+
+@benchmark("array.top_k_nada_array", 0)
+def _top_k_nada_array(n: int, _width: int) -> Callable:
+    values = _column(n)
+    return lambda: array.top_k_nada_array(values, _k(n))
+
+
+@benchmark("array.compact_nada_array", 0)
+def _compact_nada_array(n: int, _width: int) -> Callable:
+    rows = _inputs(n, 2)
+    values = NadaArray([row[0] for row in rows])
+    return lambda: array.compact_nada_array(values, _bits(rows))
+
+
+@benchmark("array.filter_compact_nada_array", 0)
+def _filter_compact_nada_array(n: int, _width: int) -> Callable:
+    values = _column(n)
+    return lambda: array.filter_compact_nada_array(values, nada_lt, values[0])
+
+
+@benchmark("table.odd_even_sort", 1)
+def _odd_even_sort(n: int, width: int) -> Callable:
+    values = _cells(_inputs(n, width))
+    return lambda: table.odd_even_sort(values, 0, True) or values
+
+
+@benchmark("table.top_k", 1)
+def _top_k(n: int, width: int) -> Callable:
+    values = _cells(_inputs(n, width))
+    return lambda: table.top_k(values, 0, _k(n))
+
+
+def _aggregate_benchmark(agg_type: str):
+
+    @benchmark(f"table.aggregate_{agg_type}", 2)
+    def build(n: int, width: int) -> Callable:
+        values = _cells(_inputs(n, width))
+        return lambda: getattr(table, f"aggregate_{agg_type}")(values, 0, 1) or values
+
+    return build
+
+
+for _agg_type in ("sum", "max", "min", "count", "count_distinct"):
+    _aggregate_benchmark(_agg_type)
+
+
+@benchmark("table.aggregate", 2)
+def _aggregate(n: int, width: int) -> Callable:
+    values = _cells(_inputs(n, width))
+    return lambda: table.aggregate(values, 0, {j: "sum" for j in range(1, width)}) or values
+
+
+@benchmark("table.where", 1)
+def _where(n: int, width: int) -> Callable:
+    values = _cells(_inputs(n, width))
+    return lambda: table.where(values, [(0, "<", KEYS // 2)])
+
+
+@benchmark("table.compact", 2)
+def _compact(n: int, width: int) -> Callable:
+    rows = _inputs(n, width)
+    return lambda: table.compact(_cells(rows), _bits(rows))
+
+
+@benchmark("table.join", 1)
+def _join(n: int, width: int) -> Callable:
+    rows = _inputs(n, 2 * width)
+    primary = [row[:width] for row in _cells(rows)]
+    foreign = [row[width:] for row in _cells(rows)]
+    return lambda: table.join(primary, foreign, 0, 0)
+
+
+@benchmark("NadaTable.select", 1)
+def _select(n: int, width: int) -> Callable:
+    nt = _table(n, width)
+    return lambda: nt.select(*nt.columns[::2])
+
+
+@benchmark("NadaTable.concat", 1)
+def _concat(n: int, width: int) -> Callable:
+    nt = _table(n, width)
+    return lambda: nt.concat(nt)
+
+
+@benchmark("NadaTable.where", 1)
+def _table_where(n: int, width: int) -> Callable:
+    nt = _table(n, width)
+    return lambda: nt.where("c0", "<", KEYS // 2).get_valid()
+
+
+@benchmark("NadaTable.sort_by", 1)
+def _sort_by(n: int, width: int) -> Callable:
+    nt = _table(n, width)
+    return lambda: nt.sort_by("c0", True)
+
+
+@benchmark("NadaTable.top_k", 1)
+def _table_top_k(n: int, width: int) -> Callable:
+    nt = _table(n, width)
+    return lambda: nt.top_k("c0", _k(n))
+
+
+@benchmark("NadaTable.aggregate_sum", 2)
+def _aggregate_sum(n: int, width: int) -> Callable:
+    nt = _table(n, width)
+    return lambda: nt.aggregate_sum("c0", "c1")
+
+
+@benchmark("NadaTable.join", 1)
+def _table_join(n: int, width: int) -> Callable:
+    nt = _table(n, width)
+    other = nt.rename(*(f"c{j}" if j == 0 else f"d{j}" for j in range(width)))
+    return lambda: nt.join(other, "c0")
+
+
+@benchmark("ColumnarNadaTable.sort_by", 1)
+def _columnar_sort_by(n: int, width: int) -> Callable:
+    ct = ColumnarNadaTable.from_rows(_table(n, width))
+    return lambda: ct.sort_by("c0", True)
+
+
+@benchmark("ColumnarNadaTable.aggregate_sum", 2)
+def _columnar_aggregate_sum(n: int, width: int) -> Callable:
+    ct = ColumnarNadaTable.from_rows(_table(n, width))
+    return lambda: ct.aggregate_sum("c0", "c1")
+
+
+def _outputs(result) -> list:
+    """
+    Return the values held by the **result** of an operation
+    """
+
+    stack, values = [result], []
+    while stack:
+        item = stack.pop()
+        if isinstance(item, (NadaTable, ColumnarNadaTable)):
+            stack.extend(item.get_data())
+            stack.append(item.get_valid() if isinstance(item, NadaTable) else None)
+        elif isinstance(item, (list, tuple, NadaArray)):
+            stack.extend(item)
+        elif item is not None:
+            values.append(item)
+    return values
+
+
+def depth(values: list) -> int:
+    """
+    Return the largest number of operations other than additions and subtractions along
+    a path of the nada_dsl graph that computes **values**. The graph is walked
+    iteratively, as it can be deeper than the interpreter's recursion limit.
+    """
+
+    # depth of every node walked, keyed by id, as nodes do not all support hashing
+    depths: Dict[int, int] = {}
+    stack = [(value, False) for value in values]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in depths:
+            continue
+        operands = [getattr(node, a) for a in OPERANDS if getattr(node, a, None) is not None]
+        if not expanded and operands:
+            stack.append((node, True))
+            stack.extend((o, False) for o in operands if id(o) not in depths)
+            continue
+        rounds = int(
+            type(node).__module__ == "nada_dsl.operations" and type(node).__name__ not in LOCAL
+        )
+        depths[id(node)] = rounds + max((depths[id(o)] for o in operands), default=0)
+    return max((depths[id(value)] for value in values), default=0)
+
+
+def measure_depth(name: str, n: int, width: Optional[int]) -> int:
+    """
+    Build benchmark **name** for **n** rows of **width** columns over nada_dsl inputs,
+    and return the depth of the resulting graph
+    """
+
+    build = BENCHMARKS[name][0]
+    _GRAPH["enabled"] = True
+    try:
+        return depth(_outputs(build(n, width or 1)()))
+    finally:
+        _GRAPH["enabled"] = False
+
+
+def measure(
+        name: str, n: int, width: Optional[int], repeat: int = 1, memory: bool = True,
+        depth_cells: int = DEPTH_CELLS
+) -> dict:
+    """
+    Build benchmark **name** for **n** rows of **width** columns, and return its
+    operation counts, shortest build time over **repeat** builds, depth if it has at
+    most **depth_cells** input values and, if **memory** is set, peak memory
+    """
+
+    build = BENCHMARKS[name][0]
+    seconds = []
+    for _ in range(repeat):
+        operation = build(n, width or 1)
+        audit.Abstract.initialize(audit.Abstract.context)
+        gc.collect()
+        start = time.perf_counter()
+        operation()
+        seconds.append(time.perf_counter() - start)
+    result = {
+        "name": name,
+        "rows": n,
+        "width": width,
+        "ops": dict(sorted(audit.Abstract.analysis.items())),
+        "depth": measure_depth(name, n, width) if n * (width or 1) <= depth_cells else None,
+        "seconds": min(seconds),
+        "peak_bytes": None
+    }
+
+    if memory:
+        operation = build(n, width or 1)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            operation()
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return result
+
+
+def cases(
+        rows: List[int], widths: List[int], only: List[str] = None, max_cells: int = None
+) -> List[tuple]:
+    """
+    Return the (name, rows, width) of every benchmark in the sweep, where array
+    benchmarks have no width
+    """
+
+    selected = []
+    for name, (_, min_width) in BENCHMARKS.items():
+        if only and not any(fnmatch.fnmatchcase(name, pattern) for pattern in only):
+            continue
+        for n in rows:
+            if min_width == 0:
+                if max_cells is None or n <= max_cells:
+                    selected.append((name, n, None))
+                continue
+            for width in widths:
+                if width >= min_width and (max_cells is None or n * width <= max_cells):
+                    selected.append((name, n, width))
+    return selected
+
+
+def environment() -> dict:
+    """
+    Describe the interpreter and packages the results were measured with
+    """
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "nada_dsl": metadata.version("nada_dsl")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=ROWS, help="numbers of rows to sweep"
+    )
+    parser.add_argument(
+        "--widths", type=int, nargs="+", default=WIDTHS,
+        help="numbers of table columns to sweep"
+    )
+    parser.add_argument(
+        "--quick", action="store_true",
+        help=f"sweep {QUICK_ROWS} rows and {QUICK_WIDTHS} columns, as for the baseline"
+    )
+    parser.add_argument(
+        "--only", nargs="+", metavar="PATTERN",
+        help="run only the benchmarks whose names match one of these glob patterns"
+    )
+    parser.add_argument(
+        "--max-cells", type=int, help="skip cases with more than this many input values"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3,
+        help="number of builds to time, of which the shortest is reported (default 3)"
+    )
+    parser.add_argument(
+        "--depth-cells", type=int, default=DEPTH_CELLS,
+        help="measure depth only for cases with at most this many input values "
+        f"(default {DEPTH_CELLS})"
+    )
+    parser.add_argument(
+        "--no-memory", action="store_true", help="do not measure peak memory"
+    )
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    parser.add_argument("--output", help="file to write the JSON results to")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return
+    rows, widths = (QUICK_ROWS, QUICK_WIDTHS) if args.quick else (args.rows, args.widths)
+    if min(rows) < 1 or min(widths) < 1 or args.repeat < 1:
+        sys.exit("numbers of rows, columns and repeats must be positive")
+
+    results = []
+    for name, n, width in cases(rows, widths, args.only, args.max_cells):
+        result = measure(name, n, width, args.repeat, not args.no_memory, args.depth_cells)
+        results.append(result)
+        peak = "" if result["peak_bytes"] is None else f" {result['peak_bytes'] / 2**20:9.2f}MiB"
+        depth_str = "-" if result["depth"] is None else result["depth"]
+        print(
+            f"{name:34s} rows={n:<6d} width={width or '-':<3} "
+            f"ops={sum(result['ops'].values()):<10d} depth={depth_str:<6} "
+            f"{result['seconds']:9.4f}s{peak}",
+            file=sys.stderr
+        )
+
+    report = {
+        "environment": environment(),
+        "parameters": {
+            "rows": rows, "widths": widths, "max_cells": args.max_cells, "repeat": args.repeat,
+            "depth_cells": args.depth_cells
+        },
+        "results": results
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+            f.write("\n")
+    else:
+        print(json.dumps(report, indent=1))
+
+
+if __name__ == "__main__":
+    main()
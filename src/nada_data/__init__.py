@@ -4,3 +4,4 @@ Allow users to access the classes and functions directly.
 from nada_data.array import *
 from nada_data.table import *
 from nada_data.utils import *
+from nada_data.network import *
@@ -4,8 +4,10 @@ Control which resources are directly exported from this module
 from nada_data.array.functions.arithmetic import *
 from nada_data.array.functions.filter import *
 from nada_data.array.functions.sort import *
+from nada_data.array.functions.compact import *
 
 __all__ = [
     "sum_nada_array", "filter_nada_array", "nada_max", "nada_min",
-    "nada_lt", "nada_lteq", "nada_gt", "nada_gteq", "nada_eq", "sort_nada_array"
+    "nada_lt", "nada_lteq", "nada_gt", "nada_gteq", "nada_eq", "sort_nada_array",
+    "top_k_nada_array", "compact_nada_array", "filter_compact_nada_array"
 ]
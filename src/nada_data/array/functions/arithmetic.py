@@ -6,23 +6,35 @@ from nada_dsl import (
     SecretInteger, audit
 )
 from nada_data.array.nada_array import NadaArray
+from nada_data import utils
+from nada_data.instrument import instrumented
 
 
 secret_int_types = {SecretInteger, audit.SecretInteger}
 secret_int = Union[*secret_int_types]
 
 
-def sum_nada_array(argument: Union[List[secret_int], NadaArray]) -> secret_int:
+@instrumented
+def sum_nada_array(
+        argument: Union[List[secret_int], NadaArray], tree: bool = True
+) -> secret_int:
     """
     Sum an array of SecretInteger objects
 
     :param argument: A NadaArray or list of SecretInteger instances
+    :param tree: Sum with a balanced pairwise reduction of depth ceil(log2(n)) rather
+        than a left-to-right chain of depth n - 1
     """
 
-    output = argument[0]
     for e in argument[1:]:
         if type(e) not in secret_int_types:
             raise TypeError("all input values must be of type SecretInteger")
+
+    if tree:
+        return utils.tree_reduce(argument, lambda x, y: x + y)
+
+    output = argument[0]
+    for e in argument[1:]:
         output = output + e
 
     return output
@@ -0,0 +1,104 @@
+"""
+Compaction functions for use with NadaArray instances
+"""
+from typing import Iterator, List, Tuple, Union, Callable
+from nada_dsl import (
+    SecretInteger, audit
+)
+from nada_data.array.nada_array import NadaArray
+from nada_data.array.functions.filter import PREDICATES
+from nada_data import utils, network
+from nada_data.instrument import instrumented
+
+secret_int_types = {SecretInteger, audit.SecretInteger}
+secret_int = Union[*secret_int_types]
+
+
+def _compaction_swaps(
+        compaction: network.SortingNetwork, bits: List[secret_int]
+) -> Iterator[Tuple[int, int, secret_int]]:
+    """
+    Yield each comparator (i, j) of **compaction** along with its swap bit, which is set
+    when value i is dropped and value j is kept, and swap the 0/1 keep **bits** of the
+    two values accordingly once the caller has swapped the values
+    """
+
+    one = utils.literal(1, bits[0])
+    for i, j in compaction:
+        swap = (one - bits[i]) * bits[j]
+        yield i, j, swap
+        bits[i] = bits[i] + swap
+        bits[j] = bits[j] - swap
+
+
+@instrumented
+def compact_nada_array(
+        argument: Union[List[secret_int], NadaArray],
+        keep: List[secret_int],
+        limit: int = None
+) -> Tuple[NadaArray, secret_int]:
+    """
+    Move the values of **argument** whose 0/1 **keep** bit is set to the front, zero the
+    others, and return the result along with the secret number of kept values. When the
+    number of kept values is known to be at most **limit**, only the first **limit**
+    values are returned.
+
+    The values are passed through a sorting network that orders them by their keep bits
+    (or a selection network, when **limit** is given). A comparator must swap its two
+    values exactly when the first is dropped and the second is kept, so the swap bit is
+    the product of the two keep bits, (1 - k_i) * k_j: compaction needs no secure
+    comparisons at all, and costs two multiplications per comparator. The order of the
+    kept values is not preserved.
+
+    :param argument: Input array
+    :param keep: 0/1 secret integers, one per value of **argument**
+    :param limit: Public upper bound on the number of kept values
+    """
+
+    if len(keep) != len(argument):
+        raise ValueError("there must be one keep bit per value")
+    if len(argument) == 0:
+        raise ValueError("cannot compact an empty array")
+
+    values = list(argument)
+    bits = list(keep)
+
+    compaction = network.compaction_network(len(values), limit)
+    for i, j, swap in _compaction_swaps(compaction, bits):
+        d = swap * (values[i] - values[j])
+        values[i] = values[i] - d
+        values[j] = values[j] + d
+
+    size = len(values) if limit is None else compaction.k
+    count = utils.tree_reduce(keep, lambda x, y: x + y)
+    return NadaArray.from_values([bits[i] * values[i] for i in range(size)], True), count
+
+
+@instrumented
+def filter_compact_nada_array(
+        argument: Union[List[secret_int], NadaArray],
+        op: Callable[[secret_int, secret_int], secret_int],
+        cmp: secret_int,
+        limit: int = None
+) -> Tuple[NadaArray, secret_int]:
+    """
+    Filter a NadaArray as :obj:`filter_nada_array` does, but move the matching values to
+    the front with :obj:`compact_nada_array` and return them along with their secret
+    count, so that the output can be truncated to a public upper bound **limit**
+
+    :param argument: Input array
+    :param op: One of nada_lt, nada_lteq, nada_gt, nada_gteq and nada_eq
+    :param cmp: A SecretInteger to compare against each element of the input NadaArray
+    :param limit: Public upper bound on the number of matching values
+    """
+
+    predicate = PREDICATES.get(op, None)
+    if predicate is None:
+        raise ValueError(f"no predicate exists for {op}")
+    if len(argument) == 0:
+        raise ValueError("cannot compact an empty array")
+
+    one = utils.literal(1, argument[0])
+    zero = utils.literal(0, argument[0])
+    keep = [predicate(item, cmp).if_else(one, zero) for item in argument]
+    return compact_nada_array(argument, keep, limit)
@@ -6,6 +6,8 @@ from nada_dsl import (
     SecretInteger, audit
 )
 from nada_data.array.nada_array import NadaArray
+from nada_data import utils
+from nada_data.instrument import instrumented
 
 
 secret_int_types = {SecretInteger, audit.SecretInteger}
@@ -62,6 +64,16 @@ def nada_eq(item: secret_int, cmp: secret_int) -> secret_int:
     return (item == cmp).if_else(item, item - item)
 
 
+PREDICATES = {
+    nada_lt: lambda x, y: x < y,
+    nada_lteq: lambda x, y: x <= y,
+    nada_gt: lambda x, y: x > y,
+    nada_gteq: lambda x, y: x >= y,
+    nada_eq: lambda x, y: x == y
+}
+
+
+@instrumented
 def filter_nada_array(
         argument: Union[List[secret_int], NadaArray],
         op: Callable[[secret_int, secret_int], secret_int],
@@ -77,33 +89,50 @@ def filter_nada_array(
     :param cmp: A SecretInteger to compare against each element of the input NadaArray
     """
 
-    output = NadaArray()
-    for item in argument:
-        output.append(op(item, cmp))
-    return output
+    return NadaArray.from_values([op(item, cmp) for item in argument])
+
+
+def _max(x: secret_int, y: secret_int) -> secret_int:
+    return (x > y).if_else(x, y)
 
 
-def nada_max(argument: Union[List[secret_int], NadaArray]) -> secret_int:
+def _min(x: secret_int, y: secret_int) -> secret_int:
+    return (x < y).if_else(x, y)
+
+
+@instrumented
+def nada_max(argument: Union[List[secret_int], NadaArray], tree: bool = True) -> secret_int:
     """
     Return the maximum value in the input array
 
     :param argument: Input array
+    :param tree: Find the maximum with a tournament of depth ceil(log2(n)) rather than
+        a left-to-right chain of n - 1 dependent comparisons
     """
 
+    if tree:
+        return utils.tree_reduce(argument, _max)
+
     output = argument[0]
     for i in range(1, len(argument)):
-        output = (output > argument[i]).if_else(output, argument[i])
+        output = _max(output, argument[i])
     return output
 
 
-def nada_min(argument: Union[List[secret_int], NadaArray]) -> secret_int:
+@instrumented
+def nada_min(argument: Union[List[secret_int], NadaArray], tree: bool = True) -> secret_int:
     """
     Return the minimum value in the input array
 
     :param argument: Input array
+    :param tree: Find the minimum with a tournament of depth ceil(log2(n)) rather than
+        a left-to-right chain of n - 1 dependent comparisons
     """
 
+    if tree:
+        return utils.tree_reduce(argument, _min)
+
     output = argument[0]
     for i in range(1, len(argument)):
-        output = (output < argument[i]).if_else(output, argument[i])
+        output = _min(output, argument[i])
     return output
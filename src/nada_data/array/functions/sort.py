@@ -5,7 +5,9 @@ from typing import List, Union
 from nada_dsl import (
     SecretInteger, audit
 )
-from nada_data import utils
+from nada_data.array.nada_array import NadaArray
+from nada_data import network
+from nada_data.instrument import instrumented
 
 secret_int_types = {SecretInteger, audit.SecretInteger}
 secret_int = Union[*secret_int_types]
@@ -13,14 +15,12 @@ secret_int = Union[*secret_int_types]
 
 def _compare_exchange(values: List[secret_int], ascending: bool, i: int, j: int):
 
-    if i >= len(values) or j >= len(values):
-        return
-
     x = values[i]
     y = values[j]
 
+    # a single secure comparison yields the min; the max follows arithmetically
     c = (x < y).if_else(x, y)
-    d = (x > y).if_else(x, y)
+    d = x + y - c
 
     if ascending:
         values[i] = c
@@ -30,38 +30,42 @@ def _compare_exchange(values: List[secret_int], ascending: bool, i: int, j: int)
         values[j] = c
 
 
-def _odd_even_merge(values: List[secret_int], ascending: bool, lo: int, n: int, r: int):
-
-    m = r * 2
-    if m < n:
-
-        _odd_even_merge(values, ascending, lo, n, m)
-        _odd_even_merge(values, ascending, lo + r, n, m)
-
-        i = lo + r
-        while (i + r) < (lo + n):
-            _compare_exchange(values, ascending, i, i + r)
-            i += m
-    else:
-        _compare_exchange(values, ascending, lo, lo + r)
-
-
-def _odd_even_sort(values: List[secret_int], ascending: bool, lo: int, n: int):
-    if n > 1:
-        m = int(n / 2)
-        _odd_even_sort(values, ascending, lo, m)
-        _odd_even_sort(values, ascending, lo + m, m)
-        _odd_even_merge(values, ascending, lo, n, 1)
-
-
+@instrumented
 def sort_nada_array(
-        values: List[secret_int], ascending: bool = True
+        values: List[secret_int],
+        ascending: bool = True,
+        algorithm: str = "odd_even",
+        layered: bool = False
 ) -> List[secret_int]:
     """
-    Sort the contents of **values** in either ascending or descending order
+    Sort the contents of **values** in either ascending or descending order. The depth
+    of the resulting circuit is reported by ``SortingNetwork(len(values), algorithm).depth``.
 
     :param values: Input array
     :param ascending: Control ordering on sorted output
+    :param algorithm: Sorting network to apply, one of "odd_even", "bitonic" or "optimal"
+    :param layered: Emit comparators layer by layer rather than in recursive order
     """
-    _odd_even_sort(values, ascending, 0, utils.next_power_of_two(len(values)))
+    sorting_network = network.SortingNetwork(len(values), algorithm)
+    for i, j in sorting_network.schedule(layered):
+        _compare_exchange(values, ascending, i, j)
     return values
+
+
+@instrumented
+def top_k_nada_array(
+        values: Union[List[secret_int], NadaArray], k: int, largest: bool = True
+) -> NadaArray:
+    """
+    Return the **k** largest (or smallest) values of **values** in sorted order, using a
+    selection network rather than a full sort
+
+    :param values: Input array
+    :param k: Number of values to return
+    :param largest: Return the largest values in descending order if set, and the
+        smallest values in ascending order otherwise
+    """
+    output = list(values)
+    for i, j in network.SelectionNetwork(len(output), k):
+        _compare_exchange(output, not largest, i, j)
+    return NadaArray.from_values(output[:k], True)
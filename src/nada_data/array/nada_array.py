@@ -3,7 +3,8 @@ Defines the NadaArray class
 """
 from __future__ import annotations
 import inspect
-from typing import List, Union, Set
+from collections import Counter
+from typing import List, Union, Set, Dict, Optional, FrozenSet
 from nada_dsl import (
     SecretInteger, audit, Input, Literal
 )
@@ -13,27 +14,92 @@ secret_int_types = {SecretInteger, audit.SecretInteger}
 secret_int = Union[*secret_int_types]
 
 
-def _gather_parties(node):
-    party_attributes = set()
+# Attributes through which nada_dsl expression nodes reference their operands
+_OPERAND_ATTRIBUTES = ['inner', 'child', 'left', 'right', 'arg_0', 'arg_1', 'this']
 
-    def traverse(n):
+# Attribute under which the party set of a nada_dsl expression node is memoized on the
+# node itself, so that it is released along with the node
+_PARTIES_ATTRIBUTE = '_nada_data_parties'
+
+# Interned party sets, so that all the arrays and values with the same parties share a
+# single frozenset, and equal party sets can usually be recognized by identity
+_PARTY_SETS: Dict[FrozenSet[str], FrozenSet[str]] = {}
+_NO_PARTIES: FrozenSet[str] = frozenset()
+
+# Party set of the last list of parties seen on an audit value, along with the list and
+# its length: audit values all refer to the same list, which only grows
+_AUDIT_PARTIES: list = [None, 0, _NO_PARTIES]
+
+
+def clear_party_cache():
+    """
+    Release the interned party sets, and the party set of the last list of parties seen
+    on an audit value. Party sets memoized on expression nodes are released along with
+    the nodes.
+    """
+    _PARTY_SETS.clear()
+    _AUDIT_PARTIES[:] = [None, 0, _NO_PARTIES]
+
+
+def _intern(parties: FrozenSet[str]) -> FrozenSet[str]:
+    """
+    Return the interned party set equal to **parties**
+    """
+    return _PARTY_SETS.setdefault(parties, parties)
+
+
+def _memoize(node, parties: FrozenSet[str]):
+    """
+    Store **parties** on **node**, unless the node does not accept new attributes
+    """
+    try:
+        object.__setattr__(node, _PARTIES_ATTRIBUTE, parties)
+    except (AttributeError, TypeError):
+        pass
+
+
+def _gather_parties(node) -> FrozenSet[str]:
+    """
+    Return the names of all parties providing inputs to the expression graph rooted at
+    **node**. The graph is walked iteratively and the result for every node is memoized
+    on the node, so shared subgraphs, and graphs extended by later operations, are only
+    walked once.
+    """
+
+    # party sets found during this walk, including those of nodes that cannot be memoized
+    found: Dict[int, FrozenSet[str]] = {}
+
+    def known(n) -> Optional[FrozenSet[str]]:
+        parties = getattr(n, _PARTIES_ATTRIBUTE, None)
+        return found.get(id(n)) if parties is None else parties
+
+    stack = [(node, False)]
+    while stack:
+        n, expanded = stack.pop()
+        if known(n) is not None:
+            continue
 
         if isinstance(n, Input):
             party = getattr(n, 'party')
-            if party is not None:
-                party_attributes.add(party.name)
-            return
-
-        if isinstance(n, Literal):
+            parties = frozenset() if party is None else frozenset([party.name])
+        elif isinstance(n, Literal):
             # no parties associated with Literal instances
-            return
+            parties = frozenset()
+        else:
+            operands = [
+                getattr(n, attr) for attr in _OPERAND_ATTRIBUTES
+                if getattr(n, attr, None) is not None
+            ]
+            if not expanded:
+                stack.append((n, True))
+                stack.extend((o, False) for o in operands if known(o) is None)
+                continue
+            parties = frozenset().union(*(known(o) for o in operands))
 
-        for attr in ['inner', 'left', 'right', 'arg_0', 'arg_1', 'this']:
-            if hasattr(n, attr):
-                traverse(getattr(n, attr))
+        parties = found[id(n)] = _intern(parties)
+        _memoize(n, parties)
 
-    traverse(node)
-    return party_attributes
+    return known(node)
 
 
 class NadaArray:
@@ -41,10 +107,16 @@ class NadaArray:
     Data structure for representing arrays of SecretIntegers. The constructor accepts
     tuples, lists, and generators and parses them accordingly.
     """
+    __slots__ = ("_data", "_parties", "_party_counts", "_shared")
+
     def __init__(self: NadaArray, *args):
 
         self._data = []
-        self._parties = set()
+        self._parties = _NO_PARTIES
+        # number of elements each party provides inputs to, only counted once an
+        # element is removed or replaced by one with other parties
+        self._party_counts = None
+        self._shared = False
 
         if len(args) == 1:
             if isinstance(args[0], list):
@@ -52,8 +124,53 @@ class NadaArray:
             if inspect.isgenerator(args[0]):
                 args = list(args[0])
 
-        for item in args:
-            self.append(item)
+        if len(args) > 0:
+            self._adopt(list(args), False)
+
+    @classmethod
+    def from_values(cls, values: List[secret_int], trusted: bool = False) -> NadaArray:
+        """
+        Construct a NadaArray that adopts the list **values** rather than copying it, so
+        the list must not be modified afterwards. Values are validated and their parties
+        gathered in a single pass, unlike the constructor, which appends them one at a
+        time. Values known to be SecretInteger instances, such as the results of
+        operations on other array values, can be adopted without validation.
+
+        >>> NadaArray.from_values([])
+        NadaArray | len=0 | parties=[]
+        >>> NadaArray.from_values([1])
+        Traceback (most recent call last):
+          ...
+        TypeError: all array values must be of type SecretInteger
+
+        :param values: List of SecretInteger instances
+        :param trusted: Skip the check that every value is a SecretInteger instance
+        """
+
+        array = cls()
+        array._adopt(values if isinstance(values, list) else list(values), trusted)
+        return array
+
+    def _adopt(self: NadaArray, values: List[secret_int], trusted: bool):
+        """
+        Take **values** as the contents of this empty instance, validating them unless
+        **trusted** is set
+        """
+
+        gather = self._gather_parties
+        distinct = {}
+        if trusted:
+            for item in values:
+                parties = gather(item)
+                distinct[id(parties)] = parties
+        else:
+            for item in values:
+                if type(item) not in secret_int_types:
+                    raise TypeError("all array values must be of type SecretInteger")
+                parties = gather(item)
+                distinct[id(parties)] = parties
+        self._data = values
+        self._parties = _intern(_NO_PARTIES.union(*distinct.values()))
 
     def __len__(self: NadaArray):
         return len(self._data)
@@ -70,20 +187,52 @@ class NadaArray:
         return str(self)
 
     def __add__(self: NadaArray, other: Union[NadaArray, List[secret_int]]):
-        return NadaArray(self._data + other._data)
+        return NadaArray.from_values(self._data + other._data, True)
 
     def __setitem__(self: NadaArray, index: int, item: secret_int):
 
         self._check_type(item)
+        self._own()
+        removed = self._gather_parties(self._data[index])
+        added = self._gather_parties(item)
+        if removed is not added and removed != added:
+            self._remove_parties(removed)
+            self._add_parties(added)
         self._data[index] = item
-        self._update_parties()
 
     def __getitem__(self: NadaArray, index: int) -> secret_int:
         return self._data[index]
 
-    def __delitem__(self: NadaArray, index: int):
+    def __delitem__(self: NadaArray, index: Union[int, slice]):
+        self._own()
+        removed = self._data[index] if isinstance(index, slice) else [self._data[index]]
+        for item in removed:
+            self._remove_parties(self._gather_parties(item))
         del self._data[index]
-        self._update_parties()
+
+    def copy(self: NadaArray) -> NadaArray:
+        """
+        Return a copy of this instance. SecretInteger values are immutable, so the copy
+        shares them, along with the underlying list until either instance is mutated.
+        """
+
+        # the copy is set up directly from the state of this instance, which it shares
+        # pylint: disable=protected-access
+        other = NadaArray()
+        other._data = self._data
+        other._parties = self._parties
+        if self._party_counts is not None:
+            other._party_counts = Counter(self._party_counts)
+        other._shared = self._shared = True
+        return other
+
+    def _own(self: NadaArray):
+        """
+        Take a private copy of the underlying list if it is shared with another instance
+        """
+        if self._shared:
+            self._data = list(self._data)
+            self._shared = False
 
     @staticmethod
     def _check_type(item: secret_int):
@@ -99,18 +248,21 @@ class NadaArray:
         """
 
         self._check_type(item)
+        self._own()
         self._data.append(item)
-        self._add_parties(item)
+        self._add_parties(self._gather_parties(item))
 
     def extend(self: NadaArray, iterable: Union[NadaArray, List[secret_int]]):
         """
         Extend this instance with an iterable
         """
 
-        for item in iterable:
+        items = list(iterable)
+        for item in items:
             self._check_type(item)
-            self._add_parties(item)
-        self._data.extend(iterable)
+            self._add_parties(self._gather_parties(item))
+        self._own()
+        self._data.extend(items)
 
     def insert(self: NadaArray, index: int, item: secret_int):
         """
@@ -118,34 +270,74 @@ class NadaArray:
         """
 
         self._check_type(item)
+        self._own()
         self._data.insert(index, item)
-        self._add_parties(item)
+        self._add_parties(self._gather_parties(item))
 
     @staticmethod
-    def _gather_parties(obj: secret_int) -> Set[str]:
+    def _gather_parties(obj: secret_int) -> FrozenSet[str]:
         if isinstance(obj, audit.SecretInteger):
-            return {p.name for p in obj.parties}
+            parties = obj.parties
+            if parties is not _AUDIT_PARTIES[0] or len(parties) != _AUDIT_PARTIES[1]:
+                _AUDIT_PARTIES[:] = [
+                    parties, len(parties), _intern(frozenset(p.name for p in parties))
+                ]
+            return _AUDIT_PARTIES[2]
         if isinstance(obj, SecretInteger):
             return _gather_parties(obj)
-        return set()
+        return _NO_PARTIES
+
+    def _counts(self: NadaArray) -> Counter:
+        """
+        Return the number of elements each party provides inputs to, counting them on
+        first use
+        """
+
+        if self._party_counts is None:
+            self._party_counts = Counter()
+            for item in self._data:
+                self._party_counts.update(self._gather_parties(item))
+        return self._party_counts
+
+    def _add_parties(self: NadaArray, parties: FrozenSet[str]):
+        """
+        Add the **parties** of an element added to this instance. Each party is reference
+        counted by the number of elements it provides inputs to.
+        """
+
+        if self._party_counts is not None:
+            self._party_counts.update(parties)
+        if parties is not self._parties and not parties <= self._parties:
+            self._parties = _intern(self._parties | parties)
 
-    def _update_parties(self: NadaArray):
+    def _remove_parties(self: NadaArray, parties: FrozenSet[str]):
         """
-        Update the set of all Party values for this instance
+        Release the **parties** of an element about to be removed from this instance
         """
-        self._parties = {party for obj in self for party in self._gather_parties(obj)}
 
-    def _add_parties(self: NadaArray, item: secret_int):
+        if not parties:
+            return
+        counts = self._counts()
+        for party in parties:
+            counts[party] -= 1
+            if counts[party] <= 0:
+                del counts[party]
+        if len(counts) != len(self._parties):
+            self._parties = _intern(frozenset(counts))
+
+    @property
+    def parties(self: NadaArray) -> FrozenSet[str]:
         """
-        Add all Party values for some :item: to this instance
+        Frozen set of all input parties associated with the data stored by this instance,
+        which is shared by all the arrays with the same parties
         """
-        self._parties = self._parties | self._gather_parties(item)
+        return self._parties
 
     def get_parties(self: NadaArray) -> Set[str]:
         """
         Return the set of all input parties associated with the data stored by this instance
         """
-        return self._parties
+        return set(self._parties)
 
 
 def serialize_input_array(
@@ -159,8 +351,8 @@ def serialize_input_array(
     :param party: Party instance to associate with :arr:
     :param prefix: String to add as prefix to input data names
     """
-    return NadaArray(
+    return NadaArray.from_values([
         audit.SecretInteger(
             audit.Input(f"{prefix}{i}", party=party)
         ) for i in range(len(arr))
-    )
+    ], True)
@@ -0,0 +1,436 @@
+"""
+Cost model of NadaArray and NadaTable operations, computed without building any graph.
+
+Each function mirrors the function of the same name in the `array` or `table` module and
+returns the number of operations of each type that it emits, counted as the
+``nada_dsl.audit`` module counts them: additions ("add"), multiplications ("mul"),
+order comparisons ("cmp"), equality and inequality tests ("eq" and "ne") and if_else
+selects ("ife"). Subtractions are not counted. The depth is an estimate of the number
+of rounds of comparisons, equality tests, multiplications and selects along the
+critical path, the additions being local.
+"""
+from __future__ import annotations
+import math
+from typing import Dict, List, Sequence
+from nada_data import network
+
+
+OPERATIONS = ("add", "mul", "cmp", "eq", "ne", "ife")
+
+# operations and depth of one application of each aggregation function
+_FUNCTIONS = {
+    "sum": ({"add": 1}, 0),
+    "max": ({"cmp": 1, "ife": 1}, 2),
+    "min": ({"cmp": 1, "ife": 1}, 2),
+    "count": ({"add": 1}, 0),
+    "count_distinct": ({"add": 1}, 0)
+}
+
+
+class Cost:
+    """
+    Number of operations of each type emitted by an operation, along with the estimated
+    depth of the resulting circuit. Adding two costs composes the operations one after
+    the other.
+
+    >>> sort_nada_array(8)
+    Cost | add=19 | mul=0 | cmp=19 | eq=0 | ne=0 | ife=19 | depth=12
+    >>> (filter_nada_array(8) + sum_nada_array(8)).counts()["add"]
+    7
+
+    :param depth: Estimated depth of the circuit
+    :param counts: Number of operations of each type
+    """
+    def __init__(self: Cost, depth: int = 0, **counts: int):
+        for op in counts:
+            if op not in OPERATIONS:
+                raise ValueError(f"no operation exists with name {op}")
+        self._counts = {op: counts.get(op, 0) for op in OPERATIONS}
+        self.depth = depth
+
+    def __add__(self: Cost, other: Cost) -> Cost:
+        return Cost(
+            self.depth + other.depth,
+            **{op: self._counts[op] + other._counts[op] for op in OPERATIONS}
+        )
+
+    def __eq__(self: Cost, other: object) -> bool:
+        if not isinstance(other, Cost):
+            return NotImplemented
+        return self._counts == other._counts and self.depth == other.depth
+
+    def __str__(self: Cost) -> str:
+        counts_str = " | ".join(f"{op}={self._counts[op]}" for op in OPERATIONS)
+        return f"Cost | {counts_str} | depth={self.depth}"
+
+    def __repr__(self: Cost) -> str:
+        return str(self)
+
+    def counts(self: Cost) -> Dict[str, int]:
+        """
+        Return the number of operations of each type, keyed as in
+        ``nada_dsl.audit.Abstract.analysis``
+        """
+        return dict(self._counts)
+
+    @property
+    def comparisons(self: Cost) -> int:
+        """
+        Number of order comparisons, equality and inequality tests
+        """
+        return self._counts["cmp"] + self._counts["eq"] + self._counts["ne"]
+
+
+def _times(n: int, counts: Dict[str, int]) -> Dict[str, int]:
+    return {op: n * c for op, c in counts.items()}
+
+
+def _sum(*counts: Dict[str, int]) -> Dict[str, int]:
+    total = {}
+    for c in counts:
+        for op, k in c.items():
+            total[op] = total.get(op, 0) + k
+    return total
+
+
+def _log2(n: int) -> int:
+    return math.ceil(math.log2(n)) if n > 1 else 0
+
+
+def _function(agg_type: str):
+    if agg_type not in _FUNCTIONS:
+        raise ValueError(f"no aggregation function exists with name {agg_type}")
+    return _FUNCTIONS[agg_type]
+
+
+def sum_nada_array(n: int, tree: bool = True) -> Cost:
+    """
+    Cost of summing an array of **n** values
+
+    :param n: Number of values
+    :param tree: Sum with a balanced pairwise reduction
+    """
+    del tree  # additions are local, so both reductions have depth 0
+    return Cost(add=max(n - 1, 0))
+
+
+def nada_max(n: int, tree: bool = True) -> Cost:
+    """
+    Cost of finding the maximum of an array of **n** values
+
+    :param n: Number of values
+    :param tree: Find the maximum with a tournament rather than a left-to-right chain
+    """
+    steps = max(n - 1, 0)
+    return Cost(2 * (_log2(n) if tree else steps), cmp=steps, ife=steps)
+
+
+def nada_min(n: int, tree: bool = True) -> Cost:
+    """
+    Cost of finding the minimum of an array of **n** values
+
+    :param n: Number of values
+    :param tree: Find the minimum with a tournament rather than a left-to-right chain
+    """
+    return nada_max(n, tree)
+
+
+def filter_nada_array(n: int, op: str = "<") -> Cost:
+    """
+    Cost of filtering an array of **n** values with one of the array filter functions
+
+    :param n: Number of values
+    :param op: "==" for nada_eq, or any order comparison for the other filter functions
+    """
+    return Cost(2 if n > 0 else 0, **{_test(op): n, "ife": n})
+
+
+def _test(op: str) -> str:
+    return {"==": "eq", "!=": "ne"}.get(op, "cmp")
+
+
+def sort_nada_array(n: int, algorithm: str = "odd_even") -> Cost:
+    """
+    Cost of sorting an array of **n** values
+
+    :param n: Number of values
+    :param algorithm: Sorting network to apply, one of "odd_even", "bitonic" or "optimal"
+    """
+    sorting_network = network.SortingNetwork(n, algorithm)
+    c = len(sorting_network)
+    return Cost(2 * sorting_network.depth, add=c, cmp=c, ife=c)
+
+
+def top_k_nada_array(n: int, k: int) -> Cost:
+    """
+    Cost of selecting the **k** largest (or smallest) of **n** values
+
+    :param n: Number of values
+    :param k: Number of values to return
+    """
+    selection_network = network.SelectionNetwork(n, k)
+    c = len(selection_network)
+    return Cost(2 * selection_network.depth, add=c, cmp=c, ife=c)
+
+
+def compact_nada_array(n: int, limit: int = None) -> Cost:
+    """
+    Cost of compacting an array of **n** values by their keep bits
+
+    :param n: Number of values
+    :param limit: Public upper bound on the number of kept values
+    """
+    return compact(n, 1, limit)
+
+
+def filter_compact_nada_array(n: int, op: str = "<", limit: int = None) -> Cost:
+    """
+    Cost of filtering an array of **n** values and compacting the matching values
+
+    :param n: Number of values
+    :param op: "==" for nada_eq, or any order comparison for the other filter functions
+    :param limit: Public upper bound on the number of matching values
+    """
+    return filter_nada_array(n, op) + compact_nada_array(n, limit)
+
+
+def _comparator(width: int, keys: int, swap: str) -> Dict[str, int]:
+    """
+    Operations of one compare-exchange of two rows of **width** columns
+    """
+
+    if swap not in ("masked", "select"):
+        raise ValueError(f"no swap primitive exists with name {swap}")
+    if keys > 1:
+        if swap != "masked":
+            raise ValueError("sorting on several key columns requires the masked swap")
+        return {"cmp": keys, "eq": keys - 1, "ife": 2 * keys - 1, "mul": width, "add": width}
+    if swap == "select":
+        return {"cmp": 1, "ife": 2 * width}
+    return {"cmp": 1, "ife": 1, "mul": width, "add": width}
+
+
+def _comparator_depth(keys: int, swap: str) -> int:
+    return 2 if swap == "select" else 2 * keys + 1
+
+
+def _network(
+        sorting_network: network.SortingNetwork, width: int, keys: int, swap: str
+) -> Cost:
+    return Cost(
+        _comparator_depth(keys, swap) * sorting_network.depth,
+        **_times(len(sorting_network), _comparator(width, keys, swap))
+    )
+
+
+def odd_even_sort(
+        n: int, width: int, keys: int = 1, swap: str = "masked", algorithm: str = "odd_even"
+) -> Cost:
+    """
+    Cost of sorting a table of **n** rows of **width** columns
+
+    :param n: Number of rows
+    :param width: Number of columns
+    :param keys: Number of key columns
+    :param swap: Row swap primitive, either "masked" or "select"
+    :param algorithm: Sorting network to apply, one of "odd_even", "bitonic" or "optimal"
+    """
+    return _network(network.SortingNetwork(n, algorithm), width, keys, swap)
+
+
+def top_k(n: int, width: int, k: int, keys: int = 1, swap: str = "masked") -> Cost:
+    """
+    Cost of selecting the **k** rows with the largest (or smallest) keys of a table of
+    **n** rows of **width** columns
+
+    :param n: Number of rows
+    :param width: Number of columns
+    :param k: Number of rows to return
+    :param keys: Number of key columns
+    :param swap: Row swap primitive, either "masked" or "select"
+    """
+    return _network(network.SelectionNetwork(n, k), width, keys, swap)
+
+
+def _same_key(keys: int) -> Dict[str, int]:
+    """
+    Operations of one test of whether two rows agree on **keys** columns
+    """
+    if keys == 1:
+        return {"eq": 1}
+    return {"eq": keys + 1, "ife": keys}
+
+
+def _same_key_depth(keys: int) -> int:
+    return 1 if keys == 1 else keys + 2
+
+
+def _shift_agg(n: int, keys: int, aggs: Sequence[str]) -> Cost:
+    """
+    Cost of combining the runs of equal keys of **n** sorted rows in a sequential pass
+
+    :param n: Number of rows
+    :param keys: Number of key columns
+    :param aggs: Aggregation function name of each aggregated column
+    """
+
+    pairs = max(n - 1, 0)
+    per_pair = _sum(_same_key(keys), *(_sum({"ife": 2}, _function(a)[0]) for a in aggs))
+    depth = max((_function(a)[1] for a in aggs), default=0) + 1
+    return Cost(_same_key_depth(keys) + pairs * depth if pairs else 0, **_times(pairs, per_pair))
+
+
+def _scan_agg(n: int, keys: int, aggs: Sequence[str]) -> Cost:
+    """
+    Cost of combining the runs of equal keys of **n** sorted rows with a segmented scan
+
+    :param n: Number of rows
+    :param keys: Number of key columns
+    :param aggs: Aggregation function name of each aggregated column
+    """
+
+    if n < 2:
+        return Cost()
+    counts = _sum(
+        _times(n - 1, _same_key(keys)),
+        {"ife": n - 1},
+        _times(len(aggs) * (n - 1), {"ife": 1}),
+        _scan(n, [_function(a)[0] for a in aggs])
+    )
+    depth = max((_function(a)[1] for a in aggs), default=0) + 1
+    return Cost(_same_key_depth(keys) + 2 + _log2(n) * depth, **counts)
+
+
+def _scan(n: int, functions: List[Dict[str, int]]) -> Dict[str, int]:
+    """
+    Operations of a segmented scan of **n** rows combining one column with each of
+    **functions**, not counting the flags
+    """
+
+    counts = {}
+    d = 1
+    while d < n:
+        active = n - d
+        for function in functions:
+            counts = _sum(counts, _times(active, _sum(function, {"mul": 1, "add": 1})))
+        counts = _sum(counts, {"mul": max(n - 2 * d, 0)})
+        d *= 2
+    return counts
+
+
+METHODS = {
+    "shift": _shift_agg,
+    "scan": _scan_agg
+}
+
+
+def aggregate(
+        n: int, width: int, aggs: Sequence[str], keys: int = 1, method: str = "shift"
+) -> Cost:
+    """
+    Cost of aggregating several columns of a table of **n** rows of **width** columns
+    with a single sort
+
+    :param n: Number of rows
+    :param width: Number of columns, including the key columns
+    :param aggs: Aggregation function name of each aggregated column
+    :param keys: Number of key columns
+    :param method: Combine rows with a sequential pass ("shift") or with a log-depth
+        segmented scan ("scan")
+    """
+
+    combine = METHODS.get(method, None)
+    if combine is None:
+        raise ValueError(f"no aggregation method exists with name {method}")
+    distinct = sum(1 for a in aggs if a == "count_distinct")
+    if distinct > 1:
+        raise ValueError("at most one column can be aggregated with count_distinct")
+
+    cost = odd_even_sort(n, width, keys + distinct)
+    for a in aggs:
+        _function(a)
+        if a == "count":
+            cost = cost + Cost(add=n)
+        elif a == "count_distinct" and n > 0:
+            pairs = _times(n - 1, _sum(_same_key(keys + 1), {"ife": 1}))
+            cost = cost + Cost(_same_key_depth(keys + 1) + 1, **_sum({"add": 1}, pairs))
+    return cost + combine(n, keys, aggs)
+
+
+def where(n: int, predicates: Sequence[str]) -> Cost:
+    """
+    Cost of evaluating the conjunction of **predicates** over a table of **n** rows
+
+    :param n: Number of rows
+    :param predicates: Operator of each distinct predicate, such as "<" or "!="
+    """
+    counts = _sum({"ife": len(predicates)}, *({_test(op): 1} for op in predicates))
+    return Cost(1 + len(predicates) if n > 0 else 0, **_times(n, counts))
+
+
+def compact(n: int, width: int, limit: int = None) -> Cost:
+    """
+    Cost of compacting a table of **n** rows of **width** columns by their keep bits
+
+    :param n: Number of rows
+    :param width: Number of columns
+    :param limit: Public upper bound on the number of kept rows
+    """
+
+    compaction = network.compaction_network(n, limit)
+    size = n if limit is None else compaction.k
+    counts = _sum(
+        _times(len(compaction), {"mul": width + 1, "add": width + 1}),
+        {"mul": size * width, "add": max(n - 1, 0)}
+    )
+    return Cost(2 * compaction.depth + 1, **counts)
+
+
+def join(
+        primary: int,
+        foreign: int,
+        primary_width: int,
+        foreign_width: int,
+        keys: int = 1,
+        method: str = "shift",
+        foreign_valid: bool = False
+) -> Cost:
+    """
+    Cost of equi-joining a table of **foreign** rows with a table of **primary** rows
+
+    :param primary: Number of rows of the primary table
+    :param foreign: Number of rows of the foreign table
+    :param primary_width: Number of columns of the primary table, including the keys
+    :param foreign_width: Number of columns of the foreign table, including the keys
+    :param keys: Number of key columns
+    :param method: Copy columns down with a sequential pass ("shift") or with a
+        log-depth segmented scan ("scan")
+    :param foreign_valid: Whether the foreign table carries validity bits
+    """
+
+    if method not in ("shift", "scan"):
+        raise ValueError(f"no propagation method exists with name {method}")
+    if foreign == 0 or primary == 0:
+        return Cost()
+
+    n = primary + foreign
+    copied = primary_width - keys + 1
+    tag = primary_width + foreign_width - keys
+    cost = Cost(add=n) + odd_even_sort(n, tag + 2 + int(foreign_valid), keys + 1)
+
+    pairs = max(n - 1, 0)
+    if method == "shift":
+        counts = _times(pairs, _sum(_same_key(keys), {"ife": copied}))
+        cost = cost + Cost(_same_key_depth(keys) + pairs if pairs else 0, **counts)
+    elif n > 1:
+        counts = _sum(
+            _times(pairs, _same_key(keys)), {"ife": pairs}, _scan(n, [{}] * copied)
+        )
+        cost = cost + Cost(_same_key_depth(keys) + 1 + _log2(n), **counts)
+
+    return cost + Cost(1, mul=n) + compact(n, tag, foreign)
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
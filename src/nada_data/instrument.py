@@ -0,0 +1,220 @@
+"""
+Opt-in instrumentation of the sort, filter, aggregate and reduction entry points of the
+`array` and `table` modules.
+
+Entry points are decorated with :obj:`instrumented`, which costs a single check per call
+unless a :obj:`profile` context is active. Within one, every call records the operations
+it emits by type, the number of graph nodes it creates and the time spent building them.
+Calls made by other entry points are recorded too, one level deeper, and their counts are
+included in those of the calls that made them.
+
+Operations on ``nada_dsl`` values are counted as they are created, by symbol ("+", "-",
+"*", "<", "<=", ">", ">=", "==", "!=" and "if_else"). Operations on ``nada_dsl.audit``
+values are taken from ``audit.Abstract.analysis``, which does not count subtractions and
+reports every order comparison as "<".
+"""
+from __future__ import annotations
+import contextlib
+import functools
+import json
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Iterator, List
+from nada_dsl import audit, operations
+from nada_dsl.ast_util import OperationId
+
+
+SYMBOLS = {
+    "Addition": "+",
+    "Subtraction": "-",
+    "Multiplication": "*",
+    "Division": "/",
+    "Modulo": "%",
+    "LessThan": "<",
+    "LessOrEqualThan": "<=",
+    "GreaterThan": ">",
+    "GreaterOrEqualThan": ">=",
+    "Equals": "==",
+    "NotEquals": "!=",
+    "IfElse": "if_else"
+}
+
+AUDIT_SYMBOLS = {
+    "add": "+",
+    "mul": "*",
+    "cmp": "<",
+    "eq": "==",
+    "ne": "!=",
+    "ife": "if_else"
+}
+
+# operation classes whose constructors are counted while a profile is active
+_OPERATIONS = (operations.BinaryOperation, operations.UnaryOperation, operations.IfElse)
+
+_profilers: List[Profiler] = []
+_counts: Counter = Counter()
+_depth = [0]
+_originals: Dict[type, Callable] = {}
+
+
+class CallRecord:
+    """
+    Operations emitted by a single call of an instrumented function
+
+    :param name: Qualified name of the function
+    :param depth: Number of instrumented calls that this call is nested in
+    """
+    __slots__ = ("name", "depth", "ops", "nodes", "seconds")
+
+    def __init__(self: CallRecord, name: str, depth: int):
+        self.name = name
+        self.depth = depth
+        self.ops: Dict[str, int] = {}
+        self.nodes = 0
+        self.seconds = 0.0
+
+    def __repr__(self: CallRecord) -> str:
+        return f"CallRecord | name='{self.name}' | depth={self.depth} | nodes={self.nodes}"
+
+    def to_dict(self: CallRecord) -> Dict[str, Any]:
+        """
+        Return this record as a dictionary
+        """
+        return {
+            "name": self.name, "depth": self.depth, "ops": dict(self.ops),
+            "nodes": self.nodes, "seconds": self.seconds
+        }
+
+
+class Profiler:
+    """
+    Collection of the records of the instrumented calls made within a :obj:`profile`
+    context
+    """
+    def __init__(self: Profiler):
+        self.records: List[CallRecord] = []
+
+    def __len__(self: Profiler) -> int:
+        return len(self.records)
+
+    def totals(self: Profiler) -> Dict[str, Dict[str, Any]]:
+        """
+        Return, for each instrumented function, its number of calls and the sum of its
+        operations, nodes and time over those calls
+        """
+
+        totals: Dict[str, Dict[str, Any]] = {}
+        for record in self.records:
+            total = totals.setdefault(
+                record.name, {"calls": 0, "ops": Counter(), "nodes": 0, "seconds": 0.0}
+            )
+            total["calls"] += 1
+            total["ops"].update(record.ops)
+            total["nodes"] += record.nodes
+            total["seconds"] += record.seconds
+        for total in totals.values():
+            total["ops"] = dict(total["ops"])
+        return totals
+
+    def report(self: Profiler) -> Dict[str, Any]:
+        """
+        Return every call in the order it was made, along with the totals per function
+        """
+        return {
+            "calls": [record.to_dict() for record in self.records],
+            "totals": self.totals()
+        }
+
+    def to_json(self: Profiler, **kwargs) -> str:
+        """
+        Return :obj:`report` as a JSON string
+
+        :param kwargs: Keyword arguments passed on to ``json.dumps``
+        """
+        return json.dumps(self.report(), **kwargs)
+
+
+def _counting(init: Callable) -> Callable:
+
+    @functools.wraps(init)
+    def wrapper(self, *args, **kwargs):
+        name = type(self).__name__
+        _counts[SYMBOLS.get(name, name)] += 1
+        init(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _snapshot() -> tuple:
+    analysis = audit.Abstract.analysis or {}
+    return Counter(_counts), dict(analysis), OperationId.current, time.perf_counter()
+
+
+def _delta(start: tuple, end: tuple, record: CallRecord):
+    ops = end[0]
+    ops.subtract(start[0])
+    for op, symbol in AUDIT_SYMBOLS.items():
+        ops[symbol] += end[1].get(op, 0) - start[1].get(op, 0)
+    record.ops = {op: k for op, k in ops.items() if k != 0}
+    record.nodes = end[2] - start[2]
+    record.seconds = end[3] - start[3]
+
+
+def instrumented(func: Callable) -> Callable:
+    """
+    Record every call of **func** made within a :obj:`profile` context
+
+    :param func: Function to instrument
+    """
+
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _profilers:
+            return func(*args, **kwargs)
+
+        record = CallRecord(name, _depth[0])
+        for profiler in _profilers:
+            profiler.records.append(record)
+        _depth[0] += 1
+        start = _snapshot()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _delta(start, _snapshot(), record)
+            _depth[0] -= 1
+
+    return wrapper
+
+
+@contextlib.contextmanager
+def profile() -> Iterator[Profiler]:
+    """
+    Record the instrumented calls made within this context
+
+    >>> with profile() as profiler:
+    ...     pass
+    >>> profiler.report()
+    {'calls': [], 'totals': {}}
+    """
+
+    profiler = Profiler()
+    if not _profilers:
+        for cls in _OPERATIONS:
+            _originals[cls] = cls.__init__
+            cls.__init__ = _counting(cls.__init__)
+    _profilers.append(profiler)
+    try:
+        yield profiler
+    finally:
+        _profilers.remove(profiler)
+        if not _profilers:
+            for cls, init in _originals.items():
+                cls.__init__ = init
+            _originals.clear()
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
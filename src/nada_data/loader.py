@@ -0,0 +1,550 @@
+"""
+Bulk construction of ``nada_dsl.audit`` test inputs from NumPy arrays, and from CSV,
+NPY, Parquet and Arrow files.
+
+``utils.initialize_table_data`` builds a dictionary with one name per input value, and
+``serialize_input_table`` then builds the same names again for the inputs themselves.
+:obj:`InputContext` binds the values of whole arrays instead: it resolves the name of an
+input to a row and column of the array it was bound with when the value is looked up, so
+no dictionary is built. :obj:`input_rows` streams the rows of inputs bound to an array,
+and :obj:`load_table` reads an array, binds it and builds a NadaTable of inputs in one
+pass. Large NPY and Arrow IPC files are memory-mapped rather than read, and
+:obj:`stream_table` builds their rows in chunks, decoding Parquet files one batch at a
+time, so that neither nested lists of all the values nor rows other than those of the
+current chunk are held in memory. Input names follow the conventions of the
+``utils`` and ``serialize_input_*`` functions, so the two approaches can be used
+interchangeably.
+
+This module requires NumPy, and reading Parquet and Arrow files requires pyarrow. Both
+can be installed with the ``loader`` optional dependencies.
+"""
+from __future__ import annotations
+import os
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from nada_dsl import audit
+from nada_data.array.nada_array import NadaArray
+from nada_data.table.nada_table import NadaTable
+
+
+Source = Union[np.ndarray, str, os.PathLike]
+
+
+def _as_values(data: Any) -> Union[np.ndarray, Columns]:
+    """
+    Convert **data** into a one- or two-dimensional array of integers
+    """
+
+    if isinstance(data, Columns):
+        return data
+    values = np.asanyarray(data)
+    if values.ndim not in (1, 2):
+        raise ValueError("input values must be a one- or two-dimensional array")
+    if values.size > 0 and not (
+            np.issubdtype(values.dtype, np.integer) or np.issubdtype(values.dtype, np.bool_)
+    ):
+        raise TypeError("input values must be integers")
+    return values
+
+
+def _shape(data: Any) -> tuple:
+    return data.shape if isinstance(data, (np.ndarray, Columns)) else np.shape(data)
+
+
+class Columns:
+    """
+    Two-dimensional, read-only view of equally long one-dimensional arrays, one per
+    column, such as the columns of an Arrow table. It can be bound and read like a
+    two-dimensional array, without copying the columns into one.
+
+    >>> values = Columns([np.array([1, 2, 3]), np.array([4, 5, 6])])
+    >>> values.shape, int(values[1, 0]), values[2].tolist(), values[1:].tolist()
+    ((3, 2), 2, [3, 6], [[2, 5], [3, 6]])
+
+    :param columns: One-dimensional arrays of integers, one per column
+    """
+    ndim = 2
+
+    def __init__(self: Columns, columns: Sequence[Any]):
+        self.columns = [_as_values(column) for column in columns]
+        if len(self.columns) == 0:
+            raise ValueError("at least one column is required")
+        if any(column.ndim != 1 for column in self.columns):
+            raise ValueError("columns must be one-dimensional arrays")
+        if len({len(column) for column in self.columns}) > 1:
+            raise ValueError("columns must have the same length")
+        self.shape = (len(self.columns[0]), len(self.columns))
+        self.size = self.shape[0] * self.shape[1]
+
+    def __len__(self: Columns) -> int:
+        return self.shape[0]
+
+    def __getitem__(self: Columns, index: Union[int, slice, Tuple[int, int]]) -> Any:
+        if isinstance(index, tuple):
+            return self.columns[index[1]][index[0]]
+        return np.stack([column[index] for column in self.columns], axis=-1)
+
+
+def _index(digits: str) -> Optional[int]:
+    """
+    Parse **digits** as a non-negative integer written without leading zeros
+    """
+
+    if digits.isascii() and digits.isdigit() and (digits == "0" or digits[0] != "0"):
+        return int(digits)
+    return None
+
+
+class InputContext(Mapping):
+    """
+    Read-only mapping from input names to the values of one or more arrays, which can be
+    bound with ``audit.Abstract.initialize`` in place of the dictionaries built by the
+    ``utils`` functions. For each **prefix**, the input named "{prefix}{i}_{j}" is bound
+    to row i and column j of a two-dimensional array, as by ``initialize_table_data``,
+    and the input named "{prefix}{i}" to element i of a one-dimensional array, as by
+    ``initialize_array_data``. Names are resolved when they are looked up, and are only
+    generated when the mapping is iterated over.
+
+    >>> context = InputContext({"p1_input_": [[1, 2], [3, 4]], "p2_": [5, 6]})
+    >>> context["p1_input_1_0"], context.get("p2_1"), context.get("p1_input_2_0")
+    (3, 6, None)
+    >>> len(context), list(context)[:3]
+    (6, ['p1_input_0_0', 'p1_input_0_1', 'p1_input_1_0'])
+
+    :param tables: Mapping from name prefix to array of values
+    """
+
+    def __init__(self: InputContext, tables: Mapping[str, Any]):
+        self._tables = {prefix: _as_values(data) for prefix, data in tables.items()}
+        # longest prefixes first, so that a prefix that starts another one does not hide it
+        self._prefixes = sorted(self._tables, key=len, reverse=True)
+        # inputs are usually looked up row by row, so the row of the last two-dimensional
+        # lookup is kept, unless a name could match several prefixes
+        self._cached = not any(
+            p != q and q.startswith(p) for p in self._prefixes for q in self._prefixes
+        )
+        self._row_name = None
+        self._row: List[int] = []
+
+    def __repr__(self: InputContext) -> str:
+        tables = ",".join(f"'{p}':{self._tables[p].shape}" for p in self._tables)
+        return f"InputContext | tables=[{tables}]"
+
+    def _locate(self: InputContext, name: Any) -> Optional[Tuple[np.ndarray, tuple]]:
+        """
+        Return the array that **name** is bound to and its position in that array
+        """
+
+        if not isinstance(name, str):
+            return None
+        for prefix in self._prefixes:
+            if not name.startswith(prefix):
+                continue
+            values = self._tables[prefix]
+            if values.ndim == 1:
+                i = _index(name[len(prefix):])
+                if i is not None and i < values.shape[0]:
+                    return values, (i,)
+            else:
+                i, _, j = name[len(prefix):].partition("_")
+                i, j = _index(i), _index(j)
+                if i is not None and j is not None and i < values.shape[0] and j < values.shape[1]:
+                    return values, (i, j)
+        return None
+
+    def __getitem__(self: InputContext, name: str) -> int:
+        value = self.get(name, self)
+        if value is self:
+            raise KeyError(name)
+        return value
+
+    def get(self: InputContext, key: str, default: Any = None) -> Any:
+        if self._row_name is not None and isinstance(key, str):
+            row_name, _, j = key.rpartition("_")
+            if row_name == self._row_name:
+                j = _index(j)
+                if j is not None and j < len(self._row):
+                    return self._row[j]
+
+        location = self._locate(key)
+        if location is None:
+            return default
+        values, position = location
+        if self._cached and values.ndim == 2:
+            self._row_name = key[:key.rindex("_")]
+            self._row = [int(v) for v in values[position[0]].tolist()]
+        return int(values[position])
+
+    def __contains__(self: InputContext, name: object) -> bool:
+        return self._locate(name) is not None
+
+    def __iter__(self: InputContext) -> Iterator[str]:
+        for prefix, values in self._tables.items():
+            if values.ndim == 1:
+                yield from (f"{prefix}{i}" for i in range(values.shape[0]))
+            else:
+                for i in range(values.shape[0]):
+                    yield from (f"{prefix}{i}_{j}" for j in range(values.shape[1]))
+
+    def __len__(self: InputContext) -> int:
+        return sum(values.size for values in self._tables.values())
+
+
+def bind_table_data(prefix: str, data: Any):
+    """
+    Bind the values of the one- or two-dimensional array **data** for some prefix, as
+    ``initialize_array_data`` and ``initialize_table_data`` do for lists
+
+    :param prefix: Prefix string to assign for each input value
+    :param data: Array of integers, or :obj:`Columns`
+    """
+    audit.Abstract.initialize(InputContext({prefix: data}))
+
+
+def bind_table_data_multi(inputs: Dict[str, Any]):
+    """
+    Bind multiple arrays of input data for some mapping of input party -> array values,
+    as ``initialize_array_data_multi`` and ``initialize_table_data_multi`` do for lists
+
+    :param inputs: A dictionary mapping of party names to arrays of integers
+    """
+    audit.Abstract.initialize(
+        InputContext({f"{party}_": data for party, data in inputs.items()})
+    )
+
+
+def input_rows(
+        data: Any,
+        party: audit.Party,
+        prefix: str,
+        start: int = 0,
+        stop: int = None
+) -> Iterator[NadaArray]:
+    """
+    Yield, one at a time, rows of SecretInteger inputs of **party** named as by
+    ``serialize_input_table`` for the rows **start** to **stop** of the two-dimensional
+    array **data**. Only the shape of **data** is used: the values of the inputs are
+    those bound when each row is built.
+
+    :param data: Array of integers
+    :param party: Party instance to associate with the inputs
+    :param prefix: String to add as prefix to input data names
+    :param start: Index of the first row
+    :param stop: Index after the last row, or None for the last row of **data**
+    """
+
+    shape = _shape(data)
+    if len(shape) != 2:
+        raise ValueError("input rows require a two-dimensional array")
+    suffixes = [f"_{j}" for j in range(shape[1])]
+    for i in range(*slice(start, stop).indices(shape[0])):
+        row = f"{prefix}{i}"
+        yield NadaArray.from_values([
+            audit.SecretInteger(audit.Input(row + suffix, party=party)) for suffix in suffixes
+        ], True)
+
+
+def input_bindings(data: Any, prefix: str, start: int = 0, stop: int = None) -> Dict[str, int]:
+    """
+    Return, for the rows **start** to **stop** of the two-dimensional array **data**,
+    the dictionary of input values that ``initialize_table_data`` builds for a list
+
+    >>> input_bindings(np.array([[1, 2], [3, 4], [5, 6]]), "p_", 1)
+    {'p_1_0': 3, 'p_1_1': 4, 'p_2_0': 5, 'p_2_1': 6}
+
+    :param data: Array of integers
+    :param prefix: Prefix string to assign for each input value
+    :param start: Index of the first row
+    :param stop: Index after the last row, or None for the last row of **data**
+    """
+
+    values = _as_values(data)
+    if values.ndim != 2:
+        raise ValueError("input bindings require a two-dimensional array")
+    start, stop, _ = slice(start, stop).indices(values.shape[0])
+    return {
+        f"{prefix}{i}_{j}": int(v)
+        for i, row in enumerate(values[start:stop].tolist(), start)
+        for j, v in enumerate(row)
+    }
+
+
+def _is_integer(field: str) -> bool:
+    try:
+        int(field)
+    except ValueError:
+        return False
+    return True
+
+
+def _extension(path: Union[str, os.PathLike]) -> str:
+    return os.path.splitext(os.fspath(path))[1].lower()
+
+
+def _read_csv(path: Union[str, os.PathLike], delimiter: str) -> Tuple[np.ndarray, List[str]]:
+    """
+    Read a CSV file of integers, whose first line is taken as a header if any of its
+    fields is not an integer
+    """
+
+    with open(path, encoding="utf-8") as f:
+        first = f.readline().strip()
+    if first == "":
+        raise ValueError("a CSV file of input values cannot be empty")
+    fields = [field.strip() for field in first.split(delimiter)]
+    header = None if all(_is_integer(field) for field in fields) else fields
+    values = np.loadtxt(
+        path, dtype=np.int64, delimiter=delimiter, skiprows=int(header is not None), ndmin=2
+    )
+    if header is not None and values.size > 0 and values.shape[1] != len(header):
+        raise ValueError("the header and the rows of a CSV file must have the same length")
+    return values.reshape(-1, len(fields)), header
+
+
+def _pyarrow() -> tuple:
+    """
+    Return the ``pyarrow.feather`` and ``pyarrow.parquet`` modules
+    """
+
+    try:
+        # pylint: disable=import-outside-toplevel
+        from pyarrow import feather, parquet
+    except ImportError as e:
+        raise ImportError("reading Arrow and Parquet files requires pyarrow") from e
+    return feather, parquet
+
+
+def _arrow_columns(names: List[str], columns: List[Any]) -> Columns:
+    """
+    Convert the Arrow arrays or chunked arrays **columns** into :obj:`Columns`
+    """
+
+    for name, column in zip(names, columns):
+        if column.null_count > 0:
+            raise ValueError(f"column '{name}' has missing values")
+    return Columns([column.to_numpy(zero_copy_only=False) for column in columns])
+
+
+def _read_arrow(path: Union[str, os.PathLike], extension: str) -> Tuple[Columns, List[str]]:
+    """
+    Read the columns of a Parquet file, which are decoded into memory, or of an Arrow
+    IPC (Feather) file, which is memory-mapped
+    """
+
+    feather, parquet = _pyarrow()
+    if extension == ".parquet":
+        table = parquet.read_table(path, memory_map=True)
+    else:
+        table = feather.read_table(path, memory_map=True)
+    return _arrow_columns(table.column_names, table.columns), list(table.column_names)
+
+
+class _ParquetColumns(Columns):
+    """
+    :obj:`Columns` of a whole Parquet file, of which a single batch of rows is decoded
+    at a time. Rows outside the decoded batch are read again from their row group when
+    they are looked up, so that every row of the file stays bound while only one batch
+    is held in memory.
+
+    :param file: ``pyarrow.parquet.ParquetFile`` to read the rows from
+    """
+
+    def __init__(self: _ParquetColumns, file: Any):
+        metadata = file.metadata
+        super().__init__([np.zeros(0, dtype=np.int64)] * metadata.num_columns)
+        self.shape = (metadata.num_rows, metadata.num_columns)
+        self.size = self.shape[0] * self.shape[1]
+        self._file = file
+        self._start = 0
+        # first row of each row group, followed by the number of rows
+        self._groups = np.cumsum(
+            [0] + [metadata.row_group(g).num_rows for g in range(metadata.num_row_groups)]
+        )
+
+    def load(self: _ParquetColumns, start: int, batch: Columns):
+        """
+        Hold the decoded rows **batch**, the first of which is row **start** of the file
+        """
+        self.columns = batch.columns
+        self._start = start
+
+    def _position(self: _ParquetColumns, i: int) -> int:
+        """
+        Return the position of row **i** in the decoded batch, decoding its row group
+        first if the batch does not hold it
+        """
+
+        if not self._start <= i < self._start + len(self.columns[0]):
+            group = int(np.searchsorted(self._groups, i, side="right")) - 1
+            table = self._file.read_row_group(group)
+            self.load(int(self._groups[group]), _arrow_columns(table.column_names, table.columns))
+        return i - self._start
+
+    def __getitem__(self: _ParquetColumns, index: Union[int, Tuple[int, int]]) -> Any:
+        if isinstance(index, tuple):
+            return self.columns[index[1]][self._position(index[0])]
+        i = self._position(index)
+        return np.stack([column[i] for column in self.columns], axis=-1)
+
+
+def _stream_parquet(
+        path: Union[str, os.PathLike], party: Union[str, audit.Party], prefix: str,
+        chunk_rows: int, bind: bool
+) -> Iterator[List[NadaArray]]:
+    """
+    Yield the rows of inputs for a Parquet file as :obj:`stream_table` does, decoding
+    one batch of at most **chunk_rows** rows at a time. Unless **bind** is unset, the
+    whole file is bound as :obj:`_ParquetColumns`, which holds the batch whose rows are
+    being built, and otherwise only the shape of the file is read.
+    """
+
+    file = _pyarrow()[1].ParquetFile(path, memory_map=True)
+    values = _ParquetColumns(file)
+    party = _bind(values, party, prefix, bind)
+    if not bind:
+        for start in range(0, values.shape[0], chunk_rows):
+            yield list(input_rows(values, party, prefix, start, start + chunk_rows))
+        return
+
+    start = 0
+    for batch in file.iter_batches(batch_size=chunk_rows):
+        values.load(start, _arrow_columns(batch.schema.names, batch.columns))
+        yield list(input_rows(values, party, prefix, start, start + batch.num_rows))
+        start += batch.num_rows
+
+
+def read_table(
+        source: Source, delimiter: str = ",", mmap: bool = True
+) -> Tuple[Union[np.ndarray, Columns], Optional[List[str]]]:
+    """
+    Return the two-dimensional array of integers held by **source**, along with the
+    column names given by its header, if any. NPY files are memory-mapped unless
+    **mmap** is unset. Parquet and Arrow IPC (".arrow", ".feather") files, which
+    require pyarrow, are read as :obj:`Columns`: the values of Arrow IPC files are only
+    read from the file when they are used, while Parquet files are decoded into memory,
+    as are columns split into several chunks, which are copied into one array. Use
+    :obj:`stream_table` to build the inputs of a large Parquet file in batches.
+
+    :param source: Array, or path of a ".npy", ".csv", ".parquet", ".arrow" or
+        ".feather" file
+    :param delimiter: Field delimiter of CSV files
+    :param mmap: Memory-map NPY files rather than reading them
+    """
+
+    if isinstance(source, (str, os.PathLike)):
+        extension = _extension(source)
+        if extension == ".npy":
+            values, header = np.load(source, mmap_mode="r" if mmap else None), None
+        elif extension == ".csv":
+            values, header = _read_csv(source, delimiter)
+        elif extension in (".parquet", ".arrow", ".feather"):
+            values, header = _read_arrow(source, extension)
+        else:
+            raise ValueError(f"cannot read input values from a file of type '{extension}'")
+    else:
+        values, header = source, None
+
+    values = _as_values(values)
+    if values.ndim != 2:
+        raise ValueError("a table requires a two-dimensional array")
+    return values, header
+
+
+def load_table(
+        source: Source,
+        party: Union[str, audit.Party],
+        prefix: str = "input_",
+        columns: Sequence[str] = None,
+        bind: bool = True
+) -> NadaTable:
+    """
+    Build a NadaTable of SecretInteger inputs of **party** for the values held by
+    **source**, named as by ``serialize_input_table``. Unless **bind** is unset, the
+    values are first bound with :obj:`bind_table_data`, which replaces any values bound
+    before.
+
+    >>> nt = load_table(np.array([[1, 2], [3, 4], [5, 6]]), "party", columns=["a", "b"])
+    >>> nt
+    NadaTable | cols=['a','b'] | rows=3 | parties=['party']
+    >>> [v.value for v in nt[2]]
+    [5, 6]
+
+    :param source: Array, or path of a file read by :obj:`read_table`
+    :param party: Party instance to associate with the inputs, or the name of a new one,
+        which is created after the values are bound
+    :param prefix: String to add as prefix to input data names
+    :param columns: Column names, which are taken from the header of the file if not given
+    :param bind: Bind the values of **source** to the inputs
+    """
+
+    values, columns = _open(source, columns)
+    party = _bind(values, party, prefix, bind)
+    return NadaTable(*columns, rows=list(input_rows(values, party, prefix)))
+
+
+def stream_table(
+        source: Source,
+        party: Union[str, audit.Party],
+        prefix: str = "input_",
+        chunk_rows: int = 4096,
+        bind: bool = True
+) -> Iterator[List[NadaArray]]:
+    """
+    Yield the rows of SecretInteger inputs of **party** for the values held by
+    **source**, named as by ``serialize_input_table``, in lists of at most
+    **chunk_rows** rows. As for :obj:`load_table`, the values are first bound with
+    :obj:`bind_table_data` unless **bind** is unset, which happens when the first chunk
+    is requested. NPY and Arrow IPC files are memory-mapped, and Parquet files are
+    decoded one batch of **chunk_rows** rows at a time, of which only the values are
+    bound, so that only the chunk being built, rather than the whole table, is held in
+    memory, apart from the inputs that ``nada_dsl.audit`` records in
+    ``audit.Abstract.inputs`` for the program signature.
+
+    >>> chunks = stream_table(np.arange(10).reshape(5, 2), "party", chunk_rows=2)
+    >>> [[[v.value for v in row] for row in chunk] for chunk in chunks]
+    [[[0, 1], [2, 3]], [[4, 5], [6, 7]], [[8, 9]]]
+
+    :param source: Array, or path of a file read by :obj:`read_table`
+    :param party: Party instance to associate with the inputs, or the name of a new one,
+        which is created after the values are bound
+    :param prefix: String to add as prefix to input data names
+    :param chunk_rows: Largest number of rows per chunk
+    :param bind: Bind the values of **source** to the inputs
+    """
+
+    if chunk_rows < 1:
+        raise ValueError("chunks must have at least one row")
+    if isinstance(source, (str, os.PathLike)) and _extension(source) == ".parquet":
+        yield from _stream_parquet(source, party, prefix, chunk_rows, bind)
+        return
+    values, _ = read_table(source)
+    party = _bind(values, party, prefix, bind)
+    for start in range(0, values.shape[0], chunk_rows):
+        yield list(input_rows(values, party, prefix, start, start + chunk_rows))
+
+
+def _open(
+        source: Source, columns: Optional[Sequence[str]]
+) -> Tuple[Union[np.ndarray, Columns], List[str]]:
+    values, header = read_table(source)
+    columns = header if columns is None else list(columns)
+    if columns is None:
+        raise ValueError("column names are required unless they are read from the file")
+    if len(columns) != values.shape[1]:
+        raise ValueError("there must be one column name per column of input values")
+    return values, columns
+
+
+def _bind(
+        values: Union[np.ndarray, Columns], party: Union[str, audit.Party], prefix: str,
+        bind: bool
+) -> audit.Party:
+    if bind:
+        bind_table_data(prefix, values)
+    return audit.Party(name=party) if isinstance(party, str) else party
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
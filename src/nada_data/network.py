@@ -0,0 +1,334 @@
+"""
+Sorting network schedules shared by both the `array` and `table` modules.
+"""
+from __future__ import annotations
+import functools
+from typing import List, Tuple, Iterator
+from nada_data import utils
+
+
+Comparator = Tuple[int, int]
+
+# Size-optimal sorting networks for up to 12 inputs (Knuth, TAOCP Vol. 3, Section 5.3.4)
+_OPTIMAL = {
+    1: [],
+    2: [(0, 1)],
+    3: [(0, 2), (0, 1), (1, 2)],
+    4: [(0, 1), (2, 3), (0, 2), (1, 3), (1, 2)],
+    5: [
+        (0, 3), (1, 4), (0, 2), (1, 3), (0, 1), (2, 4), (1, 2), (3, 4), (2, 3)
+    ],
+    6: [
+        (0, 5), (1, 3), (2, 4), (1, 2), (3, 4), (0, 3), (2, 5), (0, 1), (2, 3), (4, 5),
+        (1, 2), (3, 4)
+    ],
+    7: [
+        (0, 6), (2, 3), (4, 5), (0, 2), (1, 4), (3, 6), (0, 1), (2, 5), (3, 4), (1, 2),
+        (4, 6), (2, 3), (4, 5), (1, 2), (3, 4), (5, 6)
+    ],
+    8: [
+        (0, 2), (1, 3), (4, 6), (5, 7), (0, 4), (1, 5), (2, 6), (3, 7), (0, 1), (2, 3),
+        (4, 5), (6, 7), (2, 4), (3, 5), (1, 4), (3, 6), (1, 2), (3, 4), (5, 6)
+    ],
+    9: [
+        (0, 3), (1, 7), (2, 5), (4, 8), (0, 7), (2, 4), (3, 8), (5, 6), (0, 2), (1, 3),
+        (4, 5), (7, 8), (1, 4), (3, 6), (5, 7), (0, 1), (2, 4), (3, 5), (6, 8), (2, 3),
+        (4, 5), (6, 7), (1, 2), (3, 4), (5, 6)
+    ],
+    10: [
+        (0, 8), (1, 9), (2, 7), (3, 5), (4, 6), (0, 2), (1, 4), (5, 8), (7, 9), (0, 3),
+        (2, 4), (5, 7), (6, 9), (0, 1), (3, 6), (8, 9), (1, 5), (2, 3), (4, 8), (6, 7),
+        (1, 2), (3, 5), (4, 6), (7, 8), (2, 3), (4, 5), (6, 7), (3, 4), (5, 6)
+    ],
+    11: [
+        (0, 9), (1, 6), (2, 4), (3, 7), (5, 8), (0, 1), (3, 5), (4, 10), (6, 9), (7, 8),
+        (1, 3), (2, 5), (4, 7), (8, 10), (0, 4), (1, 2), (3, 7), (5, 9), (6, 8), (0, 1),
+        (2, 6), (4, 5), (7, 8), (9, 10), (2, 4), (3, 6), (5, 7), (8, 9), (1, 2), (3, 4),
+        (5, 6), (7, 8), (2, 3), (4, 5), (6, 7)
+    ],
+    12: [
+        (0, 8), (1, 7), (2, 6), (3, 11), (4, 10), (5, 9), (0, 1), (2, 5), (3, 4), (6, 9),
+        (7, 8), (10, 11), (0, 2), (1, 6), (5, 10), (9, 11), (0, 3), (1, 2), (4, 6), (5, 7),
+        (8, 11), (9, 10), (1, 4), (3, 5), (6, 8), (7, 10), (1, 3), (2, 5), (6, 9), (8, 10),
+        (2, 3), (4, 5), (6, 7), (8, 9), (4, 6), (5, 7), (3, 4), (5, 6), (7, 8)
+    ]
+}
+
+
+def _odd_even_merge(comparators: List[Comparator], lo: int, n: int, r: int):
+
+    m = r * 2
+    if m < n:
+
+        _odd_even_merge(comparators, lo, n, m)
+        _odd_even_merge(comparators, lo + r, n, m)
+
+        i = lo + r
+        while (i + r) < (lo + n):
+            comparators.append((i, i + r))
+            i += m
+    else:
+        comparators.append((lo, lo + r))
+
+
+def _odd_even_sort(comparators: List[Comparator], lo: int, n: int):
+    if n > 1:
+        m = int(n / 2)
+        _odd_even_sort(comparators, lo, m)
+        _odd_even_sort(comparators, lo + m, m)
+        _odd_even_merge(comparators, lo, n, 1)
+
+
+def _odd_even(n: int) -> List[Comparator]:
+    """
+    Batcher's odd-even merge sort over the next power of two at or above **n**
+    """
+
+    comparators = []
+    _odd_even_sort(comparators, 0, utils.next_power_of_two(n))
+    return comparators
+
+
+def _bitonic(n: int) -> List[Comparator]:
+    """
+    Bitonic sort over the next power of two at or above **n**. The first stage of each
+    merge compares mirrored positions, so that every comparator moves the smaller value
+    to the lower index and no comparator needs a direction of its own.
+    """
+
+    p = utils.next_power_of_two(n)
+    comparators = []
+
+    k = 2
+    while k <= p:
+        for block in range(0, p, k):
+            for t in range(k // 2):
+                comparators.append((block + t, block + k - 1 - t))
+        j = k // 4
+        while j > 0:
+            for block in range(0, p, 2 * j):
+                for t in range(j):
+                    comparators.append((block + t, block + t + j))
+            j //= 2
+        k *= 2
+
+    return comparators
+
+
+def _optimal(n: int) -> List[Comparator]:
+    """
+    Size-optimal network for **n** of at most 12
+    """
+
+    if n not in _OPTIMAL:
+        raise ValueError(
+            f"optimal networks are only available for at most {max(_OPTIMAL)} values"
+        )
+    return _OPTIMAL[n]
+
+
+ALGORITHMS = {
+    "odd_even": _odd_even,
+    "bitonic": _bitonic,
+    "optimal": _optimal
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _build(n: int, algorithm: str) -> Tuple[Comparator, ...]:
+    """
+    Generate the comparators for **n** values once per (**n**, **algorithm**). Every
+    generator places the smaller value at the lower index, so the values it would pad
+    up to a power of two act as trailing maxima that never move; comparators that
+    touch them are dropped rather than skipped when the network is applied.
+    """
+
+    generator = ALGORITHMS.get(algorithm, None)
+    if generator is None:
+        raise ValueError(f"no sorting network exists with name {algorithm}")
+    if n <= 1:
+        return ()
+    return tuple((i, j) for (i, j) in generator(n) if j < n)
+
+
+def _layer(n: int, comparators: Tuple[Comparator, ...]) -> Tuple[Tuple[Comparator, ...], ...]:
+    """
+    Group **comparators** over **n** values into layers by scheduling each one as soon as
+    both of its inputs are ready. Comparators within a layer touch disjoint indices and
+    can be evaluated in the same communication round.
+    """
+
+    ready = [0] * n
+    layers = []
+    for i, j in comparators:
+        d = max(ready[i], ready[j])
+        if d == len(layers):
+            layers.append([])
+        layers[d].append((i, j))
+        ready[i] = ready[j] = d + 1
+
+    return tuple(tuple(layer) for layer in layers)
+
+
+@functools.lru_cache(maxsize=None)
+def _build_layers(n: int, algorithm: str) -> Tuple[Tuple[Comparator, ...], ...]:
+    return _layer(n, _build(n, algorithm))
+
+
+@functools.lru_cache(maxsize=None)
+def _build_selection(n: int, k: int) -> Tuple[Comparator, ...]:
+    """
+    Generate a network that moves the first **k** of **n** values, in sorted order, to
+    indices 0 to k - 1. The values are split into blocks of the next power of two at or
+    above k, and each block is sorted. Pairs of blocks are then merged in a balanced
+    tree: comparing each position of one block with the mirrored position of the other
+    keeps the first half of their union as a bitonic sequence, which a half-cleaner
+    cascade sorts. Padding is handled as in :obj:`_build`.
+    """
+
+    if k >= n:
+        return _build(n, "odd_even")
+
+    width = utils.next_power_of_two(k)
+    block_sort = _odd_even(width)
+    comparators = []
+
+    blocks = list(range(0, width * -(-n // width), width))
+    for b in blocks:
+        comparators.extend((b + i, b + j) for (i, j) in block_sort)
+
+    while len(blocks) > 1:
+        merged = []
+        for a, b in zip(blocks[::2], blocks[1::2]):
+            comparators.extend((a + t, b + width - 1 - t) for t in range(width))
+            j = width // 2
+            while j > 0:
+                for block in range(a, a + width, 2 * j):
+                    comparators.extend((block + t, block + t + j) for t in range(j))
+                j //= 2
+            merged.append(a)
+        if len(blocks) % 2 == 1:
+            merged.append(blocks[-1])
+        blocks = merged
+
+    return tuple((i, j) for (i, j) in comparators if j < n)
+
+
+@functools.lru_cache(maxsize=None)
+def _build_selection_layers(n: int, k: int) -> Tuple[Tuple[Comparator, ...], ...]:
+    return _layer(n, _build_selection(n, k))
+
+
+class SortingNetwork:
+    """
+    Fixed schedule of compare-exchange operations that sorts **n** values. Each
+    comparator (i, j) has i < j and, in ascending order, places the smaller of the
+    two values at index i. Schedules are generated once per size and algorithm
+    and cached.
+
+    The comparators are also available grouped into layers of mutually independent
+    comparators. The number of layers is the depth of the network: every layer costs
+    one round of secure comparisons followed by one round of selects or
+    multiplications, however many comparators it holds.
+
+    >>> SortingNetwork(4)
+    SortingNetwork | n=4 | algorithm='odd_even' | comparators=5 | depth=3
+    >>> len(SortingNetwork(6, "bitonic"))
+    15
+    >>> SortingNetwork(4).layers
+    (((0, 1), (2, 3)), ((0, 2), (1, 3)), ((1, 2),))
+
+    :param n: Number of values to sort
+    :param algorithm: One of "odd_even", "bitonic" or "optimal" (for at most 12 values)
+    """
+    def __init__(self: SortingNetwork, n: int, algorithm: str = "odd_even"):
+        self.n = n
+        self.algorithm = algorithm
+        self.comparators = _build(n, algorithm)
+        self.layers = _build_layers(n, algorithm)
+
+    def __len__(self: SortingNetwork) -> int:
+        return len(self.comparators)
+
+    def __iter__(self: SortingNetwork) -> Iterator[Comparator]:
+        return iter(self.comparators)
+
+    def __str__(self: SortingNetwork) -> str:
+        return (
+            f"SortingNetwork | n={self.n} | algorithm='{self.algorithm}' "
+            f"| comparators={len(self.comparators)} | depth={self.depth}"
+        )
+
+    def __repr__(self: SortingNetwork) -> str:
+        return str(self)
+
+    @property
+    def depth(self: SortingNetwork) -> int:
+        """
+        Number of layers of independent comparators in this network
+        """
+        return len(self.layers)
+
+    def schedule(self: SortingNetwork, layered: bool = False) -> Iterator[Comparator]:
+        """
+        Iterate over the comparators of this network, either in generation order or,
+        if **layered** is set, layer by layer so that independent comparators are
+        emitted together
+
+        :param layered: Emit comparators grouped by layer
+        """
+        if layered:
+            return (c for layer in self.layers for c in layer)
+        return iter(self.comparators)
+
+
+class SelectionNetwork(SortingNetwork):
+    """
+    Fixed schedule of compare-exchange operations that moves the first **k** of **n**
+    values, in sorted order, to indices 0 to k - 1 without sorting the remainder. For
+    k much smaller than n this needs O(n log^2 k) rather than O(n log^2 n) comparators.
+
+    >>> SelectionNetwork(64, 4)
+    SelectionNetwork | n=64 | k=4 | comparators=200 | depth=15
+    >>> len(SortingNetwork(64))
+    543
+
+    :param n: Number of input values
+    :param k: Number of values to select
+    """
+    def __init__(self: SelectionNetwork, n: int, k: int):
+        # pylint: disable=super-init-not-called
+        if k < 1:
+            raise ValueError("number of values to select must be positive")
+        self.n = n
+        self.k = min(k, n)
+        self.algorithm = "selection"
+        self.comparators = _build_selection(n, self.k)
+        self.layers = _build_selection_layers(n, self.k)
+
+    def __str__(self: SelectionNetwork) -> str:
+        return (
+            f"SelectionNetwork | n={self.n} | k={self.k} "
+            f"| comparators={len(self.comparators)} | depth={self.depth}"
+        )
+
+
+def compaction_network(n: int, limit: int = None) -> SortingNetwork:
+    """
+    Return the network used to compact **n** values by their keep bits: a sorting
+    network, or a selection network for the first **limit** values if given
+
+    :param n: Number of values to compact
+    :param limit: Public upper bound on the number of kept values
+    """
+    if limit is None:
+        return SortingNetwork(n)
+    return SelectionNetwork(n, limit)
+
+
+__all__ = ["SortingNetwork", "SelectionNetwork"]
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,305 @@
+"""
+Vectorized simulation of NadaArray and NadaTable operations over NumPy int64 arrays.
+
+Each function mirrors the function of the same name in the `array` or `table` module, and
+applies the same comparator schedules and tie-breaking, so that its output matches the
+output obtained by evaluating the per-element graph with the ``nada_dsl.audit`` module.
+Values must fit in a signed 64-bit integer. This module requires NumPy, which can be
+installed with the ``simulation`` optional dependencies.
+"""
+import functools
+from typing import Callable, Dict, Sequence, Tuple, Union
+import numpy as np
+from nada_data import network
+from nada_data.array.functions import filter as array_filter
+
+
+COMPARISONS = {
+    array_filter.nada_lt: np.less,
+    array_filter.nada_lteq: np.less_equal,
+    array_filter.nada_gt: np.greater,
+    array_filter.nada_gteq: np.greater_equal,
+    array_filter.nada_eq: np.equal
+}
+
+REDUCTIONS = {
+    "sum": np.add,
+    "max": np.maximum,
+    "min": np.minimum
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _layer_indices(n: int, algorithm: str, k: int = None) -> Tuple[Tuple[np.ndarray, ...]]:
+    """
+    Convert each layer of the sorting network for **n** values (or of the selection
+    network for the first **k** of them) into a pair of index arrays
+    """
+
+    if k is None:
+        sorting_network = network.SortingNetwork(n, algorithm)
+    else:
+        sorting_network = network.SelectionNetwork(n, k)
+    return tuple(
+        (np.array([c[0] for c in layer]), np.array([c[1] for c in layer]))
+        for layer in sorting_network.layers
+    )
+
+
+def _apply_array(values: np.ndarray, layers: Tuple[Tuple[np.ndarray, ...]], ascending: bool):
+
+    for i, j in layers:
+        x = values[i]
+        y = values[j]
+        low = np.minimum(x, y)
+        high = np.maximum(x, y)
+        values[i] = low if ascending else high
+        values[j] = high if ascending else low
+
+
+def _apply_table(
+        values: np.ndarray,
+        layers: Tuple[Tuple[np.ndarray, ...]],
+        key_col: Union[int, Sequence[int]],
+        ascending: bool
+):
+
+    key_cols = [key_col] if isinstance(key_col, int) else list(key_col)
+    for i, j in layers:
+        x = values[i]
+        y = values[j]
+        less = np.zeros(len(i), dtype=bool)
+        equal = np.ones(len(i), dtype=bool)
+        for k in key_cols:
+            less |= equal & (x[:, k] < y[:, k])
+            equal &= x[:, k] == y[:, k]
+        # rows are swapped unless x < y in ascending order, as in the table sort functions
+        swap = less != ascending
+        values[i] = np.where(swap[:, None], y, x)
+        values[j] = np.where(swap[:, None], x, y)
+
+
+def sum_nada_array(values: np.ndarray) -> np.int64:
+    """
+    Sum an array of values
+
+    :param values: Input array
+    """
+    return np.add.reduce(values, dtype=np.int64)
+
+
+def nada_max(values: np.ndarray) -> np.int64:
+    """
+    Return the maximum value in the input array
+
+    :param values: Input array
+    """
+    return np.max(values)
+
+
+def nada_min(values: np.ndarray) -> np.int64:
+    """
+    Return the minimum value in the input array
+
+    :param values: Input array
+    """
+    return np.min(values)
+
+
+def filter_nada_array(
+        values: np.ndarray, op: Callable, cmp: int
+) -> np.ndarray:
+    """
+    Filter an array against one of the comparison functions accepted by
+    ``filter_nada_array``, replacing values that do not match with 0
+
+    :param values: Input array
+    :param op: One of nada_lt, nada_lteq, nada_gt, nada_gteq and nada_eq
+    :param cmp: Value to compare against each element of the input array
+    """
+
+    comparison = COMPARISONS.get(op, None)
+    if comparison is None:
+        raise ValueError(f"no vectorized comparison exists for {op}")
+    return np.where(comparison(values, cmp), values, 0)
+
+
+def sort_nada_array(
+        values: np.ndarray, ascending: bool = True, algorithm: str = "odd_even"
+) -> np.ndarray:
+    """
+    Sort the contents of **values** in place in either ascending or descending order
+
+    :param values: Input array
+    :param ascending: Control ordering on sorted output
+    :param algorithm: Sorting network to apply, one of "odd_even", "bitonic" or "optimal"
+    """
+    _apply_array(values, _layer_indices(len(values), algorithm), ascending)
+    return values
+
+
+def top_k_nada_array(values: np.ndarray, k: int, largest: bool = True) -> np.ndarray:
+    """
+    Return the **k** largest (or smallest) values of **values** in sorted order
+
+    :param values: Input array
+    :param k: Number of values to return
+    :param largest: Return the largest values in descending order if set, and the
+        smallest values in ascending order otherwise
+    """
+    output = values.copy()
+    _apply_array(output, _layer_indices(len(output), "selection", k), not largest)
+    return output[:k]
+
+
+def compact_nada_array(
+        values: np.ndarray, keep: np.ndarray, limit: int = None
+) -> Tuple[np.ndarray, np.int64]:
+    """
+    Move the values whose 0/1 **keep** bit is set to the front, zero the others, and
+    return the first **limit** values (or all of them) along with the number of kept
+    values
+
+    :param values: Input array
+    :param keep: Array of 0/1 keep bits
+    :param limit: Public upper bound on the number of kept values
+    """
+
+    output = values.copy()
+    bits = keep.copy()
+    compaction = network.compaction_network(len(values), limit)
+    for layer in compaction.layers:
+        i = np.array([c[0] for c in layer])
+        j = np.array([c[1] for c in layer])
+        swap = (1 - bits[i]) * bits[j]
+        d = swap * (output[i] - output[j])
+        output[i] -= d
+        output[j] += d
+        bits[i] += swap
+        bits[j] -= swap
+    size = len(values) if limit is None else compaction.k
+    return (bits * output)[:size], np.add.reduce(keep, dtype=np.int64)
+
+
+def odd_even_sort(
+        values: np.ndarray,
+        key_col: Union[int, Sequence[int]],
+        ascending: bool,
+        algorithm: str = "odd_even"
+):
+    """
+    Sort the rows of the two-dimensional array **values** in place by **key_col**
+
+    :param values: Input table
+    :param key_col: Column to key sorting on, or a sequence of columns to sort on
+        lexicographically
+    :param ascending: Control ordering on sorted output
+    :param algorithm: Sorting network to apply, one of "odd_even", "bitonic" or "optimal"
+    """
+    _apply_table(values, _layer_indices(len(values), algorithm), key_col, ascending)
+
+
+def top_k(
+        values: np.ndarray, key_col: Union[int, Sequence[int]], k: int, largest: bool = True
+) -> np.ndarray:
+    """
+    Return the **k** rows of **values** with the largest (or smallest) **key_col** in
+    sorted order. The rows of **values** are reordered in place.
+
+    :param values: Input table
+    :param key_col: Column to key selection on, or a sequence of columns
+    :param k: Number of rows to return
+    :param largest: Return the rows with the largest keys in descending order if set,
+        and those with the smallest keys in ascending order otherwise
+    """
+    _apply_table(values, _layer_indices(len(values), "selection", k), key_col, not largest)
+    return values[:k]
+
+
+def _shift_agg(
+        values: np.ndarray, key_col: Union[int, Sequence[int]], agg_col: int, agg_type: str
+):
+    """
+    Leave the aggregate of each run of equal keys in the last row of the run, and zero
+    in the other rows of the run
+    """
+
+    if len(values) == 0:
+        return
+    keys = values[:, np.atleast_1d(key_col)]
+    starts = np.flatnonzero(np.r_[True, np.any(keys[1:] != keys[:-1], axis=1)])
+    ends = np.r_[starts[1:], len(values)] - 1
+    aggregates = REDUCTIONS[agg_type].reduceat(values[:, agg_col], starts)
+    values[:, agg_col] = 0
+    values[ends, agg_col] = aggregates
+
+
+def _aggregate(values: np.ndarray, key_col: int, agg_col: int, agg_type: str):
+
+    if agg_type not in REDUCTIONS:
+        raise ValueError(f"no aggregation function exists with name {agg_type}")
+    odd_even_sort(values, key_col, True)
+    _shift_agg(values, key_col, agg_col, agg_type)
+
+
+def aggregate(values: np.ndarray, key_col: Union[int, Sequence[int]], aggs: Dict[int, str]):
+    """
+    Aggregate several columns of table **values** grouped by **key_col** in place,
+    sorting it only once
+
+    :param values: Input table
+    :param key_col: Column to group by, or a sequence of columns to group by
+    :param aggs: Mapping from column index to aggregation function name, as accepted by
+        the ``aggregate`` table function
+    """
+
+    for agg_type in aggs.values():
+        if agg_type not in REDUCTIONS and agg_type not in ("count", "count_distinct"):
+            raise ValueError(f"no aggregation function exists with name {agg_type}")
+    key_cols = [key_col] if isinstance(key_col, int) else list(key_col)
+    distinct = [col for col, agg_type in aggs.items() if agg_type == "count_distinct"]
+    if len(distinct) > 1:
+        raise ValueError("at most one column can be aggregated with count_distinct")
+    odd_even_sort(values, key_cols + distinct, True)
+    for agg_col, agg_type in aggs.items():
+        if agg_type == "count":
+            values[:, agg_col] = 1
+        elif agg_type == "count_distinct":
+            full = values[:, key_cols + [agg_col]]
+            values[:, agg_col] = np.r_[True, np.any(full[1:] != full[:-1], axis=1)]
+        _shift_agg(values, key_cols, agg_col, agg_type if agg_type in REDUCTIONS else "sum")
+
+
+def aggregate_sum(values: np.ndarray, key_col: int, agg_col: int):
+    """
+    Sum the contents of **agg_col** grouped by **key_col** for table **values** in place
+
+    :param values: Input table
+    :param key_col: Column to group by
+    :param agg_col: Column to sum over
+    """
+    _aggregate(values, key_col, agg_col, "sum")
+
+
+def aggregate_max(values: np.ndarray, key_col: int, agg_col: int):
+    """
+    Determine the max value of **agg_col** grouped by **key_col** for table **values**
+    in place
+
+    :param values: Input table
+    :param key_col: Column to group by
+    :param agg_col: Column to calculate max over
+    """
+    _aggregate(values, key_col, agg_col, "max")
+
+
+def aggregate_min(values: np.ndarray, key_col: int, agg_col: int):
+    """
+    Determine the min value of **agg_col** grouped by **key_col** for table **values**
+    in place
+
+    :param values: Input table
+    :param key_col: Column to group by
+    :param agg_col: Column to calculate min over
+    """
+    _aggregate(values, key_col, agg_col, "min")
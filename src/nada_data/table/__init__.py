@@ -3,3 +3,5 @@ Control which resources are directly exported from this module
 """
 from nada_data.table.functions import *
 from nada_data.table.nada_table import NadaTable, serialize_input_table
+from nada_data.table.columnar_table import ColumnarNadaTable
+from nada_data.table.query import Query, collect
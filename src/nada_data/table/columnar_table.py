@@ -0,0 +1,375 @@
+"""
+Defines the ColumnarNadaTable class
+"""
+from __future__ import annotations
+from typing import Dict, List, Set, Union, Callable
+from nada_dsl import audit, Party, SecretInteger
+from nada_data.array.nada_array import NadaArray
+from nada_data.table import functions
+from nada_data.table.nada_table import (
+    NadaTable, KeyColumns, _AggregateMixin, _key_names, _aggregate_plan, _check_row
+)
+
+
+secret_int_types = {SecretInteger, audit.SecretInteger}
+secret_int = Union[*secret_int_types]
+
+
+class _RowView:
+    """
+    Row of a list of columns, indexed by column position
+    """
+    __slots__ = ("_columns", "_index")
+
+    def __init__(self: _RowView, columns: List[List[secret_int]], index: int):
+        self._columns = columns
+        self._index = index
+
+    def __len__(self: _RowView) -> int:
+        return len(self._columns)
+
+    def __getitem__(self: _RowView, col: int) -> secret_int:
+        return self._columns[col][self._index]
+
+    def __setitem__(self: _RowView, col: int, item: secret_int):
+        self._columns[col][self._index] = item
+
+    def __iter__(self: _RowView):
+        return (column[self._index] for column in self._columns)
+
+
+class _ColumnView:
+    """
+    Presents a list of columns as the list of rows expected by the table functions, so
+    that they can run directly on columnar storage
+    """
+    __slots__ = ("_columns",)
+
+    def __init__(self: _ColumnView, columns: List[List[secret_int]]):
+        self._columns = columns
+
+    def __len__(self: _ColumnView) -> int:
+        return len(self._columns[0]) if self._columns else 0
+
+    def __getitem__(self: _ColumnView, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [_RowView(self._columns, i) for i in range(*index.indices(len(self)))]
+        return _RowView(self._columns, index)
+
+    def __iter__(self: _ColumnView):
+        return (_RowView(self._columns, i) for i in range(len(self)))
+
+
+class ColumnarNadaTable(_AggregateMixin):
+    """
+    Data structure for representing tables as one NadaArray per column. It provides the
+    row mutations and the selections, sorts, aggregations and joins of NadaTable, but
+    projections reuse the existing columns and sorts and aggregations only touch the
+    columns that they need. The constructor accepts a comma-separated list of column
+    names along with a list of NadaArray columns.
+
+    Rows carry no validity bits, so :obj:`NadaTable.where` and :obj:`NadaTable.query`
+    are not provided: convert with :obj:`to_rows` to use them.
+    """
+    __slots__ = ("columns", "_cols")
+
+    def __init__(
+            self: ColumnarNadaTable,
+            *columns: str,
+            cols: List[NadaArray] = None
+    ):
+        self.columns = list(columns)
+        self._cols = [NadaArray() for _ in self.columns]
+        if cols is not None:
+            self.set_data(cols)
+
+    def __len__(self: ColumnarNadaTable):
+        return len(self._cols[0]) if self._cols else 0
+
+    def __str__(self: ColumnarNadaTable) -> str:
+
+        cols_str = ",".join(f"'{c}'" for c in self.columns)
+        parties_str = ",".join(sorted([f"'{p}'" for p in self.get_parties()]))
+        return (
+            f"ColumnarNadaTable | cols=[{cols_str}] | rows={len(self)} "
+            f"| parties=[{parties_str}]"
+        )
+
+    def __repr__(self: ColumnarNadaTable) -> str:
+        return str(self)
+
+    def __getitem__(self: ColumnarNadaTable, index: int) -> NadaArray:
+        return NadaArray.from_values([col[index] for col in self._cols], True)
+
+    def __setitem__(self: ColumnarNadaTable, index: int, row: NadaArray):
+
+        self._check_input(row)
+        for col, item in zip(self._cols, row):
+            col[index] = item
+
+    def __delitem__(self: ColumnarNadaTable, index: Union[int, slice]):
+        for col in self._cols:
+            del col[index]
+
+    def __iter__(self: ColumnarNadaTable):
+        return (self[i] for i in range(len(self)))
+
+    # column lookups only depend on the column names, which are held in the same way
+    get_col_idx = NadaTable.get_col_idx
+
+    def _get_key_idxs(self: ColumnarNadaTable, key_col: KeyColumns) -> List[int]:
+        """
+        Get the integer indices of the key column or list of key columns **key_col**
+        """
+        return [self.get_col_idx(c) for c in _key_names(key_col)]
+
+    def _check_input(self: ColumnarNadaTable, row: NadaArray):
+        """
+        Determine whether **row** is (1) of NadaArray type, and (2) matches length of self.columns
+        """
+        _check_row(self.columns, row)
+
+    def append(self: ColumnarNadaTable, row: NadaArray):
+        """
+        Add a single row to this ColumnarNadaTable instance
+        """
+
+        self._check_input(row)
+        for col, item in zip(self._cols, row):
+            col.append(item)
+
+    def extend(self: ColumnarNadaTable, rows: List[NadaArray]):
+        """
+        Add a list of rows to this ColumnarNadaTable instance
+        """
+
+        for row in rows:
+            self._check_input(row)
+        for i, col in enumerate(self._cols):
+            col.extend(row[i] for row in rows)
+
+    def insert(self: ColumnarNadaTable, index: int, row: NadaArray):
+        """
+        Insert **row** at **index** of this instance
+        """
+
+        self._check_input(row)
+        for col, item in zip(self._cols, row):
+            col.insert(index, item)
+
+    def set_data(self: ColumnarNadaTable, cols: List[NadaArray]) -> ColumnarNadaTable:
+        """
+        Set the columns for this ColumnarNadaTable instance, which holds copies of them, so
+        that mutating either the table or the arrays leaves the other unchanged
+
+        :param cols: List of NadaArray instances, one per column
+        """
+
+        if len(cols) != len(self.columns):
+            raise ValueError("number of columns must match length of table columns")
+        for col in cols:
+            if not isinstance(col, NadaArray):
+                raise TypeError("columns must be NadaArray instances")
+            if len(col) != len(cols[0]):
+                raise ValueError("all columns must have the same length")
+        self._cols = [col.copy() for col in cols]
+        return self
+
+    def get_data(self: ColumnarNadaTable) -> List[NadaArray]:
+        """
+        Get the rows from this instance
+        """
+        return list(self)
+
+    def get_column(self: ColumnarNadaTable, col_name: str) -> NadaArray:
+        """
+        Get a copy of the NadaArray holding the column with name **col_name**, which
+        shares its values with the table until either is mutated
+
+        :param col_name: The name of the column
+        """
+        return self._cols[self.get_col_idx(col_name)].copy()
+
+    def get_parties(self: ColumnarNadaTable) -> Set[Union[Party, audit.Party]]:
+        """
+        Return the set of all input parties associated with the data stored by this instance
+        """
+        return set().union(*(col.parties for col in self._cols))
+
+    @staticmethod
+    def from_rows(table: NadaTable) -> ColumnarNadaTable:
+        """
+        Construct a ColumnarNadaTable holding the same data as the NadaTable **table**
+
+        :param table: Row-oriented table to convert
+        """
+        rows = table.get_data()
+        return ColumnarNadaTable(
+            *table.columns,
+            cols=[
+                NadaArray.from_values([row[i] for row in rows], True)
+                for i in range(len(table.columns))
+            ]
+        )
+
+    def to_rows(self: ColumnarNadaTable) -> NadaTable:
+        """
+        Construct a NadaTable holding the same data as this instance
+        """
+        return NadaTable(*self.columns, rows=self.get_data())
+
+    def select(self: ColumnarNadaTable, *cols: str) -> ColumnarNadaTable:
+        """
+        Perform basic select operation on this table, returning a new ColumnarNadaTable
+        that shares the specified **cols** with this one
+
+        :param cols: Variadic argument that indicates the names of the columns that will
+        be used to construct the output table
+        """
+        return ColumnarNadaTable(*cols, cols=[self.get_column(c) for c in cols])
+
+    def rename(self: ColumnarNadaTable, *columns: str) -> ColumnarNadaTable:
+        """
+        Return a new ColumnarNadaTable that shares the columns of this table, renamed to
+        **columns**
+
+        :param columns: Variadic argument for the new names of this table's columns
+        """
+
+        if len(columns) != len(self.columns):
+            raise ValueError("there must be one new name per column")
+        return ColumnarNadaTable(*columns, cols=self._cols)
+
+    def concat(self: ColumnarNadaTable, other: ColumnarNadaTable) -> ColumnarNadaTable:
+        """
+        Return a new ColumnarNadaTable that is the result of concatenating this instance
+        with another
+
+        :param other: ColumnarNadaTable instance to concatenate with this instance
+        """
+
+        if self.columns != other.columns:
+            raise ValueError("columns between tables must match to do concat")
+
+        return ColumnarNadaTable(
+            *self.columns,
+            cols=[a + other.get_column(c) for a, c in zip(self._cols, self.columns)]
+        )
+
+    def join(
+            self: ColumnarNadaTable,
+            other: ColumnarNadaTable,
+            on: KeyColumns,
+            method: str = "shift"
+    ) -> ColumnarNadaTable:
+        """
+        Equi-join **other** with this table on the columns **on**, where the keys of this
+        table must be unique, as :obj:`NadaTable.join` does. A join touches every column
+        of both tables, so it runs on their rows.
+
+        :param other: ColumnarNadaTable whose rows are each matched with at most one row
+            of this table
+        :param on: Name of the column to join on, or a list of names
+        :param method: Copy columns down with a sequential pass ("shift") or with a
+            log-depth segmented scan ("scan")
+        """
+        return ColumnarNadaTable.from_rows(self.to_rows().join(other.to_rows(), on, method))
+
+    def _apply(
+            self: ColumnarNadaTable,
+            cols: List[str],
+            func: Callable[[_ColumnView], None],
+            rows: int = None,
+            names: List[str] = None
+    ) -> ColumnarNadaTable:
+        """
+        Run the table function **func** over a view of copies of **cols**, and return
+        the first **rows** rows of the result as a new table, with columns renamed to
+        **names** if given
+        """
+
+        data = [list(self.get_column(c)) for c in cols]
+        func(_ColumnView(data))
+        return ColumnarNadaTable(
+            *(cols if names is None else names),
+            cols=[NadaArray.from_values(col[:rows], True) for col in data]
+        )
+
+    def sort_by(
+            self: ColumnarNadaTable,
+            key_col: KeyColumns,
+            ascending: bool,
+            algorithm: str = "odd_even",
+            layered: bool = False
+    ) -> ColumnarNadaTable:
+        """
+        Sort the rows of this table by **key_col** in either ascending or descending order.
+        Given a list of columns, the rows are ordered lexicographically with a single
+        sorting network, whose comparators each compare all the key columns at once.
+
+        :param key_col: Name of the column to key sorting on, or a list of names
+        :param ascending: Control ordering on output sort
+        :param algorithm: Sorting network to apply, one of "odd_even", "bitonic" or "optimal"
+        :param layered: Emit comparators layer by layer rather than in recursive order
+        """
+
+        key_idxs = self._get_key_idxs(key_col)
+        return self._apply(
+            self.columns,
+            lambda view: functions.odd_even_sort(
+                view, key_idxs, ascending, algorithm=algorithm, layered=layered
+            )
+        )
+
+    def top_k(
+            self: ColumnarNadaTable, key_col: KeyColumns, k: int, largest: bool = True
+    ) -> ColumnarNadaTable:
+        """
+        Return a new ColumnarNadaTable with the **k** rows that have the largest (or
+        smallest) values in **key_col**, in sorted order
+
+        :param key_col: Name of the column to key selection on, or a list of names
+        :param k: Number of rows to return
+        :param largest: Return the rows with the largest keys in descending order if set,
+            and those with the smallest keys in ascending order otherwise
+        """
+
+        key_idxs = self._get_key_idxs(key_col)
+        return self._apply(
+            self.columns, lambda view: functions.top_k(view, key_idxs, k, largest), rows=k
+        )
+
+    def aggregate(
+            self: ColumnarNadaTable,
+            key_col: KeyColumns,
+            aggs: Dict[str, str],
+            method: str = "shift"
+    ) -> ColumnarNadaTable:
+        """
+        Aggregate several columns grouped by **key_col** with a single sort. **aggs** maps
+        the name of each column to aggregate to the name of an aggregation function, one
+        of "sum", "max", "min", "count", "count_distinct" or "avg". The output table has
+        the key columns followed by the aggregated columns in the order of **aggs**. An
+        "avg" column holds the sum of the column and is followed by a column named
+        "<col>_count" holding the number of rows, so that the average is their quotient.
+
+        :param key_col: Column to group by, or a list of columns to group by
+        :param aggs: Mapping from column name to aggregation function name
+        :param method: Combine rows with a sequential pass ("shift") or with a log-depth
+            segmented scan ("scan")
+        """
+
+        key_cols, expanded, agg_types = _aggregate_plan(key_col, aggs)
+
+        return self._apply(
+            [*key_cols, *(agg[1] for agg in expanded)],
+            lambda view: functions.aggregate(
+                view, list(range(len(key_cols))), agg_types, method
+            ),
+            names=[*key_cols, *(agg[0] for agg in expanded)]
+        )
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -3,4 +3,10 @@ Control which resources are directly exported from this module
 """
 from nada_data.table.functions.agg import *
 from nada_data.table.functions.sort import *
-__all__ = ["aggregate_sum", "aggregate_max", "aggregate_min", "odd_even_sort"]
+from nada_data.table.functions.compact import *
+from nada_data.table.functions.filter import *
+from nada_data.table.functions.join import *
+__all__ = [
+    "aggregate", "aggregate_sum", "aggregate_max", "aggregate_min", "aggregate_count",
+    "aggregate_count_distinct", "odd_even_sort", "top_k", "compact", "join", "where"
+]
@@ -1,11 +1,13 @@
 """
 Aggregation functions for use with NadaTable instances
 """
-from typing import List, Union, Callable
+from typing import Dict, List, Sequence, Tuple, Union, Callable
 from nada_dsl import (
     SecretInteger, audit
 )
-from nada_data.table.functions.sort import odd_even_sort
+from nada_data import utils
+from nada_data.table.functions.sort import odd_even_sort, _key_cols
+from nada_data.instrument import instrumented
 
 secret_int_types = {SecretInteger, audit.SecretInteger}
 secret_int = Union[*secret_int_types]
@@ -13,62 +15,305 @@ secret_int = Union[*secret_int_types]
 FUNCTIONS = {
     "sum": lambda x, y: x + y,
     "max": lambda x, y: (x > y).if_else(x, y),
-    "min": lambda x, y: (x < y).if_else(x, y)
+    "min": lambda x, y: (x < y).if_else(x, y),
+    "count": lambda x, y: x + y,
+    "count_distinct": lambda x, y: x + y
 }
 
 
-def _shift_agg(values: List[List[secret_int]], key_col: int, agg_col: int, agg_func: Callable):
+def _same_key(values: List[List[secret_int]], key_cols: List[int], i: int, j: int):
+    """
+    Test whether rows **i** and **j** agree on every column in **key_cols**. For several
+    keys, the equality tests are folded into a 0/1 integer with if_else selects, which
+    is then compared against 1 to obtain a boolean.
+    """
+
+    x = values[i]
+    y = values[j]
+    if len(key_cols) == 1:
+        return x[key_cols[0]] == y[key_cols[0]]
+
+    one = utils.literal(1, x[0])
+    zero = utils.literal(0, x[0])
+    bit = (x[key_cols[-1]] == y[key_cols[-1]]).if_else(one, zero)
+    for k in reversed(key_cols[:-1]):
+        bit = (x[k] == y[k]).if_else(bit, zero)
+    return bit == one
+
+
+def _shift_agg(
+        values: List[List[secret_int]], key_cols: List[int], aggs: List[Tuple[int, Callable]]
+):
+    """
+    Combine adjacent rows with equal keys in a single sequential pass, leaving the
+    aggregate of each run of equal keys in the last row of the run and zero in the
+    other rows of the run, for every (column, function) pair in **aggs**. Each step
+    depends on the previous one, so the depth of the resulting circuit is linear in
+    the number of rows.
+    """
 
     for i in range(len(values) - 1):
 
-        cond = values[i][key_col] == values[i + 1][key_col]
-        temp_one = cond.if_else(values[i][agg_col] - values[i][agg_col], values[i][agg_col])
-        temp_two = cond.if_else(
-            agg_func(values[i][agg_col], values[i + 1][agg_col]),
-            values[i + 1][agg_col]
-        )
+        cond = _same_key(values, key_cols, i, i + 1)
+        for agg_col, agg_func in aggs:
+            temp_one = cond.if_else(values[i][agg_col] - values[i][agg_col], values[i][agg_col])
+            temp_two = cond.if_else(
+                agg_func(values[i][agg_col], values[i + 1][agg_col]),
+                values[i + 1][agg_col]
+            )
+
+            values[i][agg_col] = temp_one
+            values[i + 1][agg_col] = temp_two
+
+
+def _segmented_scan(
+        same: list, columns: List[List[secret_int]], agg_funcs: List[Callable]
+) -> List[List[secret_int]]:
+    """
+    Segmented Hillis-Steele scan of each of **columns** with the matching function of
+    **agg_funcs**, where **same** holds, for each row after the first, whether it belongs
+    to the same segment as the row above. Each row carries a 0/1 flag that is 1 while the
+    rows combined into it so far are in its segment. In the round with offset d, every
+    row whose flag is set combines the value d rows above it into its own and multiplies
+    its flag by that row's flag. The first row has a public zero flag, so rows whose
+    window reaches it are left untouched from then on. After the last round, every row
+    holds the combination of its segment up to and including itself. The flags are
+    shared by all the columns, and the depth is logarithmic in the number of rows.
+    """
+
+    n = len(same) + 1
+    if n < 2 or len(columns) == 0:
+        return [list(column) for column in columns]
+
+    one = utils.literal(1, columns[0][0])
+    zero = utils.literal(0, columns[0][0])
+
+    accs = [list(column) for column in columns]
+    flags = [None] + [cond.if_else(one, zero) for cond in same]
+
+    d = 1
+    while d < n:
+        new_accs = [acc[:d] for acc in accs]
+        for i in range(d, n):
+            for acc, new_acc, agg_func in zip(accs, new_accs, agg_funcs):
+                # a flag of None is a public zero: the row already holds its final value
+                if flags[i] is None:
+                    new_acc.append(acc[i])
+                else:
+                    new_acc.append(acc[i] + flags[i] * (agg_func(acc[i - d], acc[i]) - acc[i]))
+        flags = flags[:d] + [
+            None if flags[i] is None or flags[i - d] is None else flags[i] * flags[i - d]
+            for i in range(d, n)
+        ]
+        accs = new_accs
+        d *= 2
 
-        values[i][agg_col] = temp_one
-        values[i + 1][agg_col] = temp_two
+    return accs
 
 
-def _aggregate(values: List[List[secret_int]], key_col: int, agg_col: int, agg_type: str):
+def _scan_agg(
+        values: List[List[secret_int]], key_cols: List[int], aggs: List[Tuple[int, Callable]]
+):
+    """
+    Produce the same output as :obj:`_shift_agg` with :obj:`_segmented_scan`, whose
+    depth is logarithmic in the number of rows, over the runs of equal keys. All rows
+    but the last of each run are then zeroed.
+    """
+
+    n = len(values)
+    if n < 2:
+        return
+
+    same = [_same_key(values, key_cols, i - 1, i) for i in range(1, n)]
+    accs = _segmented_scan(
+        same,
+        [[values[i][agg_col] for i in range(n)] for agg_col, _ in aggs],
+        [agg_func for _, agg_func in aggs]
+    )
+
+    for acc, (agg_col, _) in zip(accs, aggs):
+        for i in range(n - 1):
+            values[i][agg_col] = same[i].if_else(acc[i] - acc[i], acc[i])
+        values[n - 1][agg_col] = acc[n - 1]
+
+
+# pylint: disable=unused-argument
+# takes the key columns like the other PREPARE functions, although it does not use them
+def _count_ones(values: List[List[secret_int]], key_cols: List[int], agg_col: int):
+    """
+    Replace **agg_col** with ones, so that summing it counts the rows of each group
+    """
 
-    agg_func = FUNCTIONS.get(agg_type, None)
-    if agg_func is None:
-        raise ValueError(f"no aggregation function exists with name {agg_type}")
-    odd_even_sort(values, key_col, True)
-    _shift_agg(values, key_col, agg_col, agg_func)
+    for row in values:
+        row[agg_col] = row[agg_col] - row[agg_col] + utils.literal(1, row[agg_col])
+# pylint: enable=unused-argument
 
 
-def aggregate_sum(values: List[List[secret_int]], key_col: int, agg_col: int):
+def _distinct_flags(values: List[List[secret_int]], key_cols: List[int], agg_col: int):
+    """
+    Replace **agg_col** with 0/1 flags that are set on the first row of each run of equal
+    values within a group, so that summing it counts the distinct values of each group.
+    The rows must already be sorted by **key_cols** followed by **agg_col**.
+    """
+
+    if len(values) == 0:
+        return
+
+    one = utils.literal(1, values[0][agg_col])
+    zero = utils.literal(0, values[0][agg_col])
+    flags = [values[0][agg_col] - values[0][agg_col] + one] + [
+        _same_key(values, key_cols + [agg_col], i - 1, i).if_else(zero, one)
+        for i in range(1, len(values))
+    ]
+    for row, flag in zip(values, flags):
+        row[agg_col] = flag
+
+
+PREPARE = {
+    "count": _count_ones,
+    "count_distinct": _distinct_flags
+}
+
+
+METHODS = {
+    "shift": _shift_agg,
+    "scan": _scan_agg
+}
+
+
+def _check_aggs(key_cols: List[int], aggs: Dict[int, str]) -> List[int]:
+    """
+    Check that **aggs** only names known aggregation functions, for columns other than
+    **key_cols**, and return the column aggregated with "count_distinct", if any, in a
+    list
+    """
+
+    if any(k in aggs for k in key_cols):
+        raise ValueError("a key column cannot also be aggregated")
+    for agg_type in aggs.values():
+        if agg_type not in FUNCTIONS:
+            raise ValueError(f"no aggregation function exists with name {agg_type}")
+    distinct = [col for col, agg_type in aggs.items() if agg_type == "count_distinct"]
+    if len(distinct) > 1:
+        raise ValueError("at most one column can be aggregated with count_distinct")
+    return distinct
+
+
+@instrumented
+def aggregate(
+        values: List[List[secret_int]],
+        key_col: Union[int, Sequence[int]],
+        aggs: Dict[int, str],
+        method: str = "shift"
+):
+    """
+    Aggregate several columns of table **values** grouped by **key_col** with a single
+    sort. **aggs** maps each column to aggregate to the name of an aggregation function,
+    one of "sum", "max", "min", "count" or "count_distinct". The rows are sorted once by
+    **key_col**, carrying every other column along, and all the columns are then
+    combined in the same pass, with one equality test per pair of rows.
+
+    A "count" column is replaced by ones before it is summed. At most one column can be
+    aggregated with "count_distinct": it is appended to the sort keys, so that equal
+    values are adjacent within each group, and is replaced by flags marking the first
+    row of each distinct value before it is summed.
+
+    :param values: Input table
+    :param key_col: Column to group by, or a sequence of columns to group by
+    :param aggs: Mapping from column index to aggregation function name
+    :param method: Combine rows with a sequential pass ("shift") or with a log-depth
+        segmented scan ("scan")
+    """
+
+    key_cols = _key_cols(key_col)
+    distinct = _check_aggs(key_cols, aggs)
+    combine = METHODS.get(method, None)
+    if combine is None:
+        raise ValueError(f"no aggregation method exists with name {method}")
+    odd_even_sort(values, key_cols + distinct, True)
+    for col, agg_type in aggs.items():
+        if agg_type in PREPARE:
+            PREPARE[agg_type](values, key_cols, col)
+    combine(values, key_cols, [(col, FUNCTIONS[agg_type]) for col, agg_type in aggs.items()])
+
+
+def _aggregate(
+        values: List[List[secret_int]], key_col: int, agg_col: int, agg_type: str,
+        method: str
+):
+    aggregate(values, key_col, {agg_col: agg_type}, method)
+
+
+def aggregate_sum(
+        values: List[List[secret_int]], key_col: int, agg_col: int, method: str = "shift"
+):
     """
     Sum the contents of **agg_col** grouped by **key_col** for table **values**
 
     :param values: Input table
     :param key_col: Column to group by
     :param agg_col: Column to sum over
+    :param method: Combine rows with a sequential pass ("shift") or with a log-depth
+        segmented scan ("scan")
     """
-    _aggregate(values, key_col, agg_col, "sum")
+    _aggregate(values, key_col, agg_col, "sum", method)
 
 
-def aggregate_max(values: List[List[secret_int]], key_col: int, agg_col: int):
+def aggregate_max(
+        values: List[List[secret_int]], key_col: int, agg_col: int, method: str = "shift"
+):
     """
     Determine the max value of **agg_col** grouped by **key_col** for table **values**
 
     :param values: Input table
     :param key_col: Column to group by
     :param agg_col: Column to calculate max over
+    :param method: Combine rows with a sequential pass ("shift") or with a log-depth
+        segmented scan ("scan")
     """
-    _aggregate(values, key_col, agg_col, "max")
+    _aggregate(values, key_col, agg_col, "max", method)
 
 
-def aggregate_min(values: List[List[secret_int]], key_col: int, agg_col: int):
+def aggregate_min(
+        values: List[List[secret_int]], key_col: int, agg_col: int, method: str = "shift"
+):
     """
     Determine the min value of **agg_col** grouped by **key_col** for table **values**
 
     :param values: Input table
     :param key_col: Column to group by
     :param agg_col: Column to calculate min over
+    :param method: Combine rows with a sequential pass ("shift") or with a log-depth
+        segmented scan ("scan")
+    """
+    _aggregate(values, key_col, agg_col, "min", method)
+
+
+def aggregate_count(
+        values: List[List[secret_int]], key_col: int, agg_col: int, method: str = "shift"
+):
+    """
+    Count the rows of each group of **key_col** into **agg_col** for table **values**
+
+    :param values: Input table
+    :param key_col: Column to group by
+    :param agg_col: Column to hold the counts
+    :param method: Combine rows with a sequential pass ("shift") or with a log-depth
+        segmented scan ("scan")
+    """
+    _aggregate(values, key_col, agg_col, "count", method)
+
+
+def aggregate_count_distinct(
+        values: List[List[secret_int]], key_col: int, agg_col: int, method: str = "shift"
+):
+    """
+    Count the distinct values of **agg_col** grouped by **key_col** for table **values**
+
+    :param values: Input table
+    :param key_col: Column to group by
+    :param agg_col: Column to count distinct values of
+    :param method: Combine rows with a sequential pass ("shift") or with a log-depth
+        segmented scan ("scan")
     """
-    _aggregate(values, key_col, agg_col, "min")
+    _aggregate(values, key_col, agg_col, "count_distinct", method)
@@ -0,0 +1,55 @@
+"""
+Compaction functions for use with NadaTable instances
+"""
+from typing import List, Tuple, Union
+from nada_dsl import (
+    SecretInteger, audit
+)
+from nada_data import utils, network
+from nada_data.array.functions.compact import _compaction_swaps
+from nada_data.table.functions.sort import _bit_swap
+from nada_data.instrument import instrumented
+
+secret_int_types = {SecretInteger, audit.SecretInteger}
+secret_int = Union[*secret_int_types]
+
+
+@instrumented
+def compact(
+        values: List[List[secret_int]],
+        keep: List[secret_int],
+        limit: int = None
+) -> Tuple[List[List[secret_int]], secret_int]:
+    """
+    Move the rows of **values** whose 0/1 **keep** bit is set to the front, zero the
+    others, and return the result along with the secret number of kept rows. When the
+    number of kept rows is known to be at most **limit**, only the first **limit** rows
+    are returned. The rows of **values** are reordered in place.
+
+    As for ``compact_nada_array``, every comparator of the sorting (or selection)
+    network swaps its rows with the masked swap, using (1 - k_i) * k_j as the swap bit,
+    so compaction needs no secure comparisons. The order of the kept rows is not
+    preserved.
+
+    :param values: Input table
+    :param keep: 0/1 secret integers, one per row of **values**
+    :param limit: Public upper bound on the number of kept rows
+    """
+
+    if len(keep) != len(values):
+        raise ValueError("there must be one keep bit per row")
+    if len(values) == 0:
+        raise ValueError("cannot compact an empty table")
+
+    bits = list(keep)
+
+    compaction = network.compaction_network(len(values), limit)
+    for i, j, swap in _compaction_swaps(compaction, bits):
+        _bit_swap(values, swap, i, j)
+
+    size = len(values) if limit is None else compaction.k
+    for i in range(size):
+        for k in range(len(values[i])):
+            values[i][k] = bits[i] * values[i][k]
+
+    return values[:size], utils.tree_reduce(keep, lambda x, y: x + y)
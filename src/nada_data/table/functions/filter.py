@@ -0,0 +1,116 @@
+"""
+Filter functions for use with NadaTable instances
+"""
+from typing import Dict, List, Tuple, Union, Callable
+from nada_dsl import (
+    SecretInteger, audit
+)
+from nada_data import utils
+from nada_data.array.functions.filter import PREDICATES
+from nada_data.instrument import instrumented
+
+secret_int_types = {SecretInteger, audit.SecretInteger}
+secret_int = Union[*secret_int_types]
+
+OPERATORS = {
+    "<": lambda x, y: x < y,
+    "<=": lambda x, y: x <= y,
+    ">": lambda x, y: x > y,
+    ">=": lambda x, y: x >= y,
+    "==": lambda x, y: x == y,
+    "!=": lambda x, y: x != y
+}
+
+
+def predicate(op: Union[str, Callable]) -> Callable:
+    """
+    Return the comparison for **op**, which is either one of the operators "<", "<=",
+    ">", ">=", "==" and "!=", or one of the array filter functions nada_lt, nada_lteq,
+    nada_gt, nada_gteq and nada_eq
+
+    :param op: Comparison operator or array filter function
+    """
+
+    comparison = OPERATORS.get(op, None) if isinstance(op, str) else PREDICATES.get(op, None)
+    if comparison is None:
+        raise ValueError(f"no comparison exists for {op}")
+    return comparison
+
+
+def _operand(value: Union[int, secret_int], like: secret_int):
+    return utils.literal(value, like) if isinstance(value, int) else value
+
+
+def _group(
+        predicates: List[Tuple[int, Union[str, Callable], Union[int, secret_int]]]
+) -> Dict[int, List[Tuple[Callable, Union[int, secret_int]]]]:
+    """
+    Group the (comparison, value) pairs of **predicates** by column, dropping duplicates
+    """
+
+    by_col: Dict[int, list] = {}
+    seen = set()
+    for col, op, value in predicates:
+        key = (col, op, value if isinstance(value, int) else id(value))
+        if key not in seen:
+            seen.add(key)
+            by_col.setdefault(col, []).append((predicate(op), value))
+    return by_col
+
+
+def _fold(
+        row: List[secret_int],
+        by_col: Dict[int, List[Tuple[Callable, Union[int, secret_int]]]],
+        one: secret_int,
+        zero: secret_int
+) -> secret_int:
+    """
+    Evaluate the comparisons **by_col** over **row**, and fold them into a bit that is
+    **one** if all of them hold and **zero** otherwise
+    """
+
+    conds = [
+        comparison(row[col], _operand(value, row[col]))
+        for col, comparisons in by_col.items() for comparison, value in comparisons
+    ]
+    bit = conds[-1].if_else(one, zero)
+    for cond in reversed(conds[:-1]):
+        bit = cond.if_else(bit, zero)
+    return bit
+
+
+@instrumented
+def where(
+        values: List[List[secret_int]],
+        predicates: List[Tuple[int, Union[str, Callable], Union[int, secret_int]]],
+        valid: List[secret_int] = None
+) -> List[secret_int]:
+    """
+    Evaluate the conjunction of **predicates** over every row of **values**, returning a
+    0/1 validity bit per row. Each predicate is a (column, operator, value) triple, where
+    the value is either a secret or a public integer. The predicates are grouped by
+    column and duplicates are dropped, every comparison is evaluated directly on the
+    input rows, and the results are folded into the bit with one if_else select per
+    predicate, so that no intermediate table is produced. Existing 0/1 validity bits
+    **valid** are folded in at no extra cost.
+
+    :param values: Input table
+    :param predicates: List of (column index, operator, value) triples
+    :param valid: 0/1 validity bits of the rows of **values**, if any
+    """
+
+    if len(predicates) == 0:
+        raise ValueError("at least one predicate is required")
+    if valid is not None and len(valid) != len(values):
+        raise ValueError("there must be one validity bit per row")
+
+    by_col = _group(predicates)
+    return [
+        _fold(
+            row,
+            by_col,
+            utils.literal(1, row[0]) if valid is None else valid[i],
+            utils.literal(0, row[0])
+        )
+        for i, row in enumerate(values)
+    ]
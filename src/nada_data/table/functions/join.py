@@ -0,0 +1,171 @@
+"""
+Join functions for use with NadaTable instances
+"""
+from typing import List, Optional, Sequence, Tuple, Union
+from nada_dsl import (
+    SecretInteger, audit
+)
+from nada_data import utils
+from nada_data.table.functions.sort import odd_even_sort, _key_cols
+from nada_data.table.functions.agg import _same_key, _segmented_scan
+from nada_data.table.functions.compact import compact
+from nada_data.instrument import instrumented
+
+secret_int_types = {SecretInteger, audit.SecretInteger}
+secret_int = Union[*secret_int_types]
+
+
+def _propagate_shift(values: List[List[secret_int]], key_cols: List[int], cols: List[int]):
+    """
+    Copy **cols** down each run of equal keys in a single sequential pass
+    """
+
+    for i in range(1, len(values)):
+        cond = _same_key(values, key_cols, i - 1, i)
+        for col in cols:
+            values[i][col] = cond.if_else(values[i - 1][col], values[i][col])
+
+
+def _propagate_scan(values: List[List[secret_int]], key_cols: List[int], cols: List[int]):
+    """
+    Copy **cols** down each run of equal keys with a log-depth segmented scan that keeps
+    the first value of each run
+    """
+
+    n = len(values)
+    same = [_same_key(values, key_cols, i - 1, i) for i in range(1, n)]
+    accs = _segmented_scan(
+        same, [[values[i][col] for i in range(n)] for col in cols], [lambda x, y: x] * len(cols)
+    )
+    for acc, col in zip(accs, cols):
+        for i in range(n):
+            values[i][col] = acc[i]
+
+
+PROPAGATIONS = {
+    "shift": _propagate_shift,
+    "scan": _propagate_scan
+}
+
+
+def _tagged_rows(
+        primary: List[List[secret_int]],
+        foreign: List[List[secret_int]],
+        keys: Tuple[List[int], List[int]],
+        valid: Tuple[Optional[List[secret_int]], Optional[List[secret_int]]]
+) -> Tuple[List[List[secret_int]], int]:
+    """
+    Concatenate the rows of **primary** and **foreign** for :obj:`join`, along with the
+    number of non-key columns of **primary**. Each row holds the **keys**, the primary
+    columns, the foreign columns, then the tag, a flag that is 1 on rows holding valid
+    primary columns and, if needed, the **valid** bit of foreign rows.
+    """
+
+    primary_keys, foreign_keys = keys
+    primary_valid, foreign_valid = valid
+    primary_cols = [c for c in range(len(primary[0])) if c not in primary_keys]
+    foreign_cols = [c for c in range(len(foreign[0])) if c not in foreign_keys]
+
+    rows = []
+    for i, row in enumerate(primary):
+        zero = row[primary_keys[0]] - row[primary_keys[0]]
+        one = zero + utils.literal(1, zero)
+        rows.append(
+            [row[c] for c in primary_keys] + [row[c] for c in primary_cols]
+            + [zero] * len(foreign_cols)
+            + [zero, one if primary_valid is None else primary_valid[i]]
+            + ([] if foreign_valid is None else [zero])
+        )
+    for i, row in enumerate(foreign):
+        zero = row[foreign_keys[0]] - row[foreign_keys[0]]
+        one = zero + utils.literal(1, zero)
+        rows.append(
+            [row[c] for c in foreign_keys] + [zero] * len(primary_cols)
+            + [row[c] for c in foreign_cols] + [one, zero]
+            + ([] if foreign_valid is None else [foreign_valid[i]])
+        )
+    return rows, len(primary_cols)
+
+
+def _unmatched(
+        foreign: List[List[secret_int]], key: int, primary_cols: int
+) -> List[List[secret_int]]:
+    """
+    Return the output of :obj:`join` when the primary table, with **primary_cols**
+    non-key columns, is empty: no row of **foreign** has a match, so all are zeroed
+    """
+    width = len(foreign[0]) + primary_cols
+    return [[row[key] - row[key]] * width for row in foreign]
+
+
+@instrumented
+def join(
+        primary: List[List[secret_int]],
+        foreign: List[List[secret_int]],
+        primary_key: Union[int, Sequence[int]],
+        foreign_key: Union[int, Sequence[int]],
+        method: str = "shift",
+        primary_valid: List[secret_int] = None,
+        foreign_valid: List[secret_int] = None,
+        primary_width: int = None
+) -> List[List[secret_int]]:
+    """
+    Equi-join table **foreign** with table **primary**, whose keys must be unique. Each
+    output row holds the key columns, the other columns of **primary** and the other
+    columns of **foreign**, in that order. There are as many output rows as rows in
+    **foreign**: rows with a matching key in **primary** come first, and the remaining
+    rows are zeroed, so that the number of matches is not revealed.
+
+    Both tables are concatenated with a tag column that is 0 for rows of **primary** and
+    1 for rows of **foreign**, and are sorted by key and tag, so that each primary row
+    directly precedes the foreign rows that match it. Its columns are then copied down
+    to those rows, and the matched rows are moved to the front with ``compact``, which
+    needs no comparisons, for O((n + m) log^2 (n + m)) comparisons in total.
+
+    :param primary: Table with unique keys
+    :param foreign: Table whose rows are each matched with at most one row of **primary**
+    :param primary_key: Key column of **primary**, or a sequence of key columns
+    :param foreign_key: Key column of **foreign**, or a sequence of key columns
+    :param method: Copy columns down with a sequential pass ("shift") or with a
+        log-depth segmented scan ("scan")
+    :param primary_valid: 0/1 validity bits of the rows of **primary**, whose invalid
+        rows match nothing
+    :param foreign_valid: 0/1 validity bits of the rows of **foreign**, whose invalid
+        rows are dropped
+    :param primary_width: Number of columns of **primary**, including the keys, which
+        is only needed when **primary** has no rows
+    """
+
+    primary_keys = _key_cols(primary_key)
+    foreign_keys = _key_cols(foreign_key)
+    if len(primary_keys) != len(foreign_keys):
+        raise ValueError("both tables must be joined on the same number of key columns")
+    propagate = PROPAGATIONS.get(method, None)
+    if propagate is None:
+        raise ValueError(f"no propagation method exists with name {method}")
+    if primary_valid is not None and len(primary_valid) != len(primary):
+        raise ValueError("there must be one validity bit per row of the primary table")
+    if foreign_valid is not None and len(foreign_valid) != len(foreign):
+        raise ValueError("there must be one validity bit per row of the foreign table")
+    if len(foreign) == 0:
+        return []
+    if len(primary) == 0:
+        if primary_width is None:
+            raise ValueError("the width of an empty primary table must be given")
+        return _unmatched(foreign, foreign_keys[0], primary_width - len(primary_keys))
+
+    rows, n_primary = _tagged_rows(
+        primary, foreign, (primary_keys, foreign_keys), (primary_valid, foreign_valid)
+    )
+    key_cols = list(range(len(primary_keys)))
+    tag = len(rows[0]) - (2 if foreign_valid is None else 3)
+    odd_even_sort(rows, key_cols + [tag], True)
+    propagate(rows, key_cols, list(range(len(key_cols), len(key_cols) + n_primary)) + [tag + 1])
+
+    # valid foreign rows that received valid primary columns are kept, and there are at
+    # most as many of them as foreign rows
+    return compact(
+        [row[:tag] for row in rows],
+        [row[tag if foreign_valid is None else tag + 2] * row[tag + 1] for row in rows],
+        limit=len(foreign)
+    )[0]
@@ -1,27 +1,24 @@
 """
 Sorting functions for use with NadaTable instances
 """
-from typing import List, Union
+from typing import List, Sequence, Tuple, Union, Callable
 from nada_dsl import (
     SecretInteger, audit
 )
-from nada_data import utils
+from nada_data import utils, network
+from nada_data.instrument import instrumented
 
 secret_int_types = {SecretInteger, audit.SecretInteger}
 secret_int = Union[*secret_int_types]
 
 
-def _compare_exchange(
-        values: List[List[secret_int]], key_col: int, ascending: bool, i: int, j: int
+def _select_swap(
+        values: List[List[secret_int]], cond, ascending: bool, i: int, j: int
 ):
+    """
+    Swap rows **i** and **j** with two if_else selects per column
+    """
 
-    if i >= len(values) or j >= len(values):
-        return
-
-    x = values[i][key_col]
-    y = values[j][key_col]
-
-    cond = x < y
     for k in range(len(values[i])):
         temp_one = cond.if_else(values[i][k], values[j][k])
         temp_two = cond.if_else(values[j][k], values[i][k])
@@ -34,41 +31,152 @@ def _compare_exchange(
             values[j][k] = temp_one
 
 
-def _odd_even_merge(
-        values: List[List[secret_int]], key_col: int, ascending: bool, lo: int, n: int, r: int
+def _masked_swap(
+        values: List[List[secret_int]], cond, ascending: bool, i: int, j: int
 ):
+    """
+    Swap rows **i** and **j** with a single masked difference per column. The condition
+    is converted once into a 0/1 swap bit, after which each pair of cells (u, v) is
+    updated from d = bit * (u - v) as u - d and v + d.
+    """
+
+    one = utils.literal(1, values[i][0])
+    zero = utils.literal(0, values[i][0])
+    bit = cond.if_else(zero, one) if ascending else cond.if_else(one, zero)
+    _bit_swap(values, bit, i, j)
+
+
+def _bit_swap(values: List[List[secret_int]], bit: secret_int, i: int, j: int):
+    """
+    Swap rows **i** and **j** if the 0/1 integer **bit** is set
+    """
+
+    for k in range(len(values[i])):
+        d = bit * (values[i][k] - values[j][k])
+        values[i][k] = values[i][k] - d
+        values[j][k] = values[j][k] + d
+
+
+def _lex_swap_bit(
+        values: List[List[secret_int]], key_cols: List[int], ascending: bool, i: int, j: int
+) -> secret_int:
+    """
+    Compute the 0/1 bit that is set when rows **i** and **j** must be swapped to order
+    them lexicographically by **key_cols**. All the comparisons are independent, and the
+    bit is folded from the last key to the first with two if_else selects per key: the
+    first key decides unless its values are equal, in which case the later keys decide.
+    As for a single key, rows whose keys are all equal are swapped in ascending order.
+    """
+
+    x = values[i]
+    y = values[j]
+    one = utils.literal(1, x[0])
+    zero = utils.literal(0, x[0])
+
+    # set unless x < y, i.e. the ascending swap bit
+    bit = (x[key_cols[-1]] < y[key_cols[-1]]).if_else(zero, one)
+    for k in reversed(key_cols[:-1]):
+        bit = (x[k] < y[k]).if_else(zero, (x[k] == y[k]).if_else(bit, one))
 
-    m = r * 2
-    if m < n:
+    return bit if ascending else one - bit
 
-        _odd_even_merge(values, key_col, ascending, lo, n, m)
-        _odd_even_merge(values, key_col, ascending, lo + r, n, m)
 
-        i = lo + r
-        while (i + r) < (lo + n):
-            _compare_exchange(values, key_col, ascending, i, i + r)
-            i += m
-    else:
-        _compare_exchange(values, key_col, ascending, lo, lo + r)
+SWAPS = {
+    "masked": _masked_swap,
+    "select": _select_swap
+}
 
 
-def _odd_even_sort(
-        values: List[List[secret_int]], key_col: int, ascending: bool, lo: int, n: int
+def _key_cols(key_col: Union[int, Sequence[int]]) -> List[int]:
+    """
+    Normalize **key_col** into a non-empty list of key column indices
+    """
+
+    key_cols = [key_col] if isinstance(key_col, int) else list(key_col)
+    if len(key_cols) == 0:
+        raise ValueError("at least one key column is required")
+    return key_cols
+
+
+def _resolve(key_col: Union[int, Sequence[int]], swap: str) -> Tuple[List[int], Callable]:
+
+    key_cols = _key_cols(key_col)
+    swap_func = SWAPS.get(swap, None)
+    if swap_func is None:
+        raise ValueError(f"no swap primitive exists with name {swap}")
+    if len(key_cols) > 1 and swap_func is not _masked_swap:
+        raise ValueError("sorting on several key columns requires the masked swap")
+    return key_cols, swap_func
+
+
+def _compare_exchange(
+        values: List[List[secret_int]], key_cols: List[int], ascending: bool, swap: Callable,
+        i: int, j: int
 ):
-    if n > 1:
-        m = int(n / 2)
-        _odd_even_sort(values, key_col, ascending, lo, m)
-        _odd_even_sort(values, key_col, ascending, lo + m, m)
-        _odd_even_merge(values, key_col, ascending, lo, n, 1)
 
+    if len(key_cols) > 1:
+        _bit_swap(values, _lex_swap_bit(values, key_cols, ascending, i, j), i, j)
+        return
+
+    x = values[i][key_cols[0]]
+    y = values[j][key_cols[0]]
 
+    swap(values, x < y, ascending, i, j)
+
+
+@instrumented
 def odd_even_sort(
-        values: List[List[secret_int]], key_col: int, ascending: bool
+        values: List[List[secret_int]],
+        key_col: Union[int, Sequence[int]],
+        ascending: bool,
+        swap: str = "masked",
+        algorithm: str = "odd_even",
+        layered: bool = False
 ):
     """
-    Sort the contents of **values** in either ascending or descending order
+    Sort the contents of **values** in either ascending or descending order. The depth
+    of the resulting circuit is reported by ``SortingNetwork(len(values), algorithm).depth``.
 
     :param values: Input table
+    :param key_col: Column to key sorting on, or a sequence of columns to sort on
+        lexicographically
     :param ascending: Control ordering on sorted output
+    :param swap: Row swap primitive, either "masked" (one multiplication per column)
+        or "select" (two if_else selects per column). Sorting on several key columns
+        requires "masked".
+    :param algorithm: Sorting network to apply, one of "odd_even", "bitonic" or "optimal"
+    :param layered: Emit comparators layer by layer rather than in recursive order
+    """
+
+    key_cols, swap_func = _resolve(key_col, swap)
+    sorting_network = network.SortingNetwork(len(values), algorithm)
+    for i, j in sorting_network.schedule(layered):
+        _compare_exchange(values, key_cols, ascending, swap_func, i, j)
+
+
+@instrumented
+def top_k(
+        values: List[List[secret_int]],
+        key_col: Union[int, Sequence[int]],
+        k: int,
+        largest: bool = True,
+        swap: str = "masked"
+) -> List[List[secret_int]]:
     """
-    _odd_even_sort(values, key_col, ascending, 0, utils.next_power_of_two(len(values)))
+    Return the **k** rows of **values** with the largest (or smallest) **key_col** in
+    sorted order, using a selection network rather than a full sort. The rows of
+    **values** are reordered in place.
+
+    :param values: Input table
+    :param key_col: Column to key selection on, or a sequence of columns to order
+        lexicographically
+    :param k: Number of rows to return
+    :param largest: Return the rows with the largest keys in descending order if set,
+        and those with the smallest keys in ascending order otherwise
+    :param swap: Row swap primitive, either "masked" or "select"
+    """
+
+    key_cols, swap_func = _resolve(key_col, swap)
+    for i, j in network.SelectionNetwork(len(values), k):
+        _compare_exchange(values, key_cols, not largest, swap_func, i, j)
+    return values[:k]
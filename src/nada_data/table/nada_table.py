@@ -2,29 +2,215 @@
 Defines the NadaTable class
 """
 from __future__ import annotations
-import copy
-from typing import List, Set, Union, Callable
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple, TypeVar, Union
 from nada_dsl import audit, Party, SecretInteger
+from nada_data import utils
 from nada_data.array.nada_array import NadaArray
 from nada_data.table import functions
+from nada_data.instrument import instrumented
+
+if TYPE_CHECKING:
+    from nada_data.table.query import Query
 
 
 secret_int_types = {SecretInteger, audit.SecretInteger}
 secret_int = Union[*secret_int_types]
+KeyColumns = Union[str, List[str]]
+Predicate = Tuple[str, Union[str, Callable], Union[int, secret_int]]
+Table = TypeVar("Table")
+
+
+def _key_names(key_col: KeyColumns) -> List[str]:
+    """
+    Normalize **key_col** into a non-empty list of key column names
+    """
+
+    key_cols = [key_col] if isinstance(key_col, str) else list(key_col)
+    if len(key_cols) == 0:
+        raise ValueError("at least one key column is required")
+    return key_cols
+
+
+def _expand_aggs(aggs: Dict[str, str]) -> List[Tuple[str, str, str]]:
+    """
+    Expand **aggs** into (output column, input column, aggregation function) triples,
+    splitting each "avg" into a sum and a count of the same column
+    """
+
+    expanded = []
+    for col, agg_type in aggs.items():
+        if agg_type == "avg":
+            expanded.extend([(col, col, "sum"), (f"{col}_count", col, "count")])
+        else:
+            expanded.append((col, col, agg_type))
+    return expanded
+
+
+def _aggregate_plan(
+        key_col: KeyColumns, aggs: Dict[str, str]
+) -> Tuple[List[str], List[Tuple[str, str, str]], Dict[int, str]]:
+    """
+    Return the key columns, the expanded aggregations of :obj:`_expand_aggs` and the
+    aggregation function of each output column position for an aggregation of **aggs**
+    grouped by **key_col**, checking that the output columns have distinct names
+    """
+
+    key_cols = _key_names(key_col)
+    if any(k in aggs for k in key_cols):
+        raise ValueError("a key column cannot also be aggregated")
+    expanded = _expand_aggs(aggs)
+    names = [*key_cols, *(agg[0] for agg in expanded)]
+    if len(set(names)) != len(names):
+        raise ValueError(f"aggregated columns {names} must have distinct names")
+    return key_cols, expanded, {len(key_cols) + i: agg[2] for i, agg in enumerate(expanded)}
+
+
+def _check_row(columns: List[str], row: NadaArray):
+    """
+    Determine whether **row** is (1) of NadaArray type, and (2) matches length of **columns**
+    """
+
+    if not isinstance(row, NadaArray):
+        raise TypeError("rows must be NadaArray instances")
+    if len(columns) != len(row):
+        raise ValueError("input row length must match length of table columns")
+
+
+def _one(like: secret_int) -> secret_int:
+    """
+    Return a secret 1 derived from **like**
+    """
+    return like - like + utils.literal(1, like)
+
+
+def _with_validity(rows: List[NadaArray], valid: List[secret_int], invert: bool) -> List[list]:
+    """
+    Append to each of **rows** its validity bit, or one minus the bit if **invert** is set,
+    so that sorting on the appended column moves invalid rows to the end
+    """
+    return [
+        list(row) + [utils.literal(1, v) - v if invert else v] for row, v in zip(rows, valid)
+    ]
+
+
+def _split_validity(
+        rows: List[list], invert: bool
+) -> Tuple[List[NadaArray], List[secret_int]]:
+    """
+    Undo :obj:`_with_validity`, returning the rows and their validity bits
+    """
+    return (
+        [NadaArray(row[:-1]) for row in rows],
+        [utils.literal(1, row[-1]) - row[-1] if invert else row[-1] for row in rows]
+    )
+
+
+class _AggregateMixin:
+    """
+    Single-column aggregations shared by the table classes and Query, each of which is a
+    call to the **aggregate** method of the class
+    """
+    __slots__ = ()
+
+    def aggregate_sum(
+            self: Table, key_col: KeyColumns, agg_col: str, method: str = "shift"
+    ) -> Table:
+        """
+        Sum the contents of **agg_col** grouped by **key_col**
+
+        :param key_col: Column to group by, or a list of columns to group by
+        :param agg_col: Column to sum over
+        :param method: Combine rows with a sequential pass ("shift") or with a log-depth
+            segmented scan ("scan")
+        """
+        return self.aggregate(key_col, {agg_col: "sum"}, method)
+
+    def aggregate_max(
+            self: Table, key_col: KeyColumns, agg_col: str, method: str = "shift"
+    ) -> Table:
+        """
+        Determine the max value of **agg_col** grouped by **key_col**
+
+        :param key_col: Column to group by, or a list of columns to group by
+        :param agg_col: Column to calculate max over
+        :param method: Combine rows with a sequential pass ("shift") or with a log-depth
+            segmented scan ("scan")
+        """
+        return self.aggregate(key_col, {agg_col: "max"}, method)
+
+    def aggregate_min(
+            self: Table, key_col: KeyColumns, agg_col: str, method: str = "shift"
+    ) -> Table:
+        """
+        Determine the min value of **agg_col** grouped by **key_col**
+
+        :param key_col: Column to group by, or a list of columns to group by
+        :param agg_col: Column to calculate min over
+        :param method: Combine rows with a sequential pass ("shift") or with a log-depth
+            segmented scan ("scan")
+        """
+        return self.aggregate(key_col, {agg_col: "min"}, method)
+
+    def aggregate_count(
+            self: Table, key_col: KeyColumns, agg_col: str, method: str = "shift"
+    ) -> Table:
+        """
+        Count the rows of **agg_col** grouped by **key_col**
+
+        :param key_col: Column to group by, or a list of columns to group by
+        :param agg_col: Column to count
+        :param method: Combine rows with a sequential pass ("shift") or with a log-depth
+            segmented scan ("scan")
+        """
+        return self.aggregate(key_col, {agg_col: "count"}, method)
+
+    def aggregate_avg(
+            self: Table, key_col: KeyColumns, agg_col: str, method: str = "shift"
+    ) -> Table:
+        """
+        Average **agg_col** grouped by **key_col**, as the sum of **agg_col** followed by
+        a column named "<agg_col>_count" holding the number of rows of each group
+
+        :param key_col: Column to group by, or a list of columns to group by
+        :param agg_col: Column to average
+        :param method: Combine rows with a sequential pass ("shift") or with a log-depth
+            segmented scan ("scan")
+        """
+        return self.aggregate(key_col, {agg_col: "avg"}, method)
+
+    def aggregate_count_distinct(
+            self: Table, key_col: KeyColumns, agg_col: str, method: str = "shift"
+    ) -> Table:
+        """
+        Count the distinct values of **agg_col** grouped by **key_col**
+
+        :param key_col: Column to group by, or a list of columns to group by
+        :param agg_col: Column to count distinct values of
+        :param method: Combine rows with a sequential pass ("shift") or with a log-depth
+            segmented scan ("scan")
+        """
+        return self.aggregate(key_col, {agg_col: "count_distinct"}, method)
 
 
-class NadaTable:
+class NadaTable(_AggregateMixin):
     """
     Data structure for representing tables of NadaArray instances. The constructor accepts
     a comma-separated list of column names along with a list of NadaArray instances.
+
+    Rows filtered out by :obj:`where` are not removed, which would reveal how many rows
+    match. Each row instead carries a secret 0/1 validity bit, which sorts, aggregates and
+    joins honour without revealing it.
     """
+    __slots__ = ("columns", "_rows", "_valid", "_pending")
+
     def __init__(
             self: NadaTable,
             *columns: str,
             rows: List[NadaArray] = None
     ):
         self._rows = []
-        self._parties = set()
+        self._valid = None
+        self._pending = []
         self.columns = list(columns)
         if rows is not None:
             self.set_data(rows)
@@ -35,7 +221,7 @@ class NadaTable:
     def __str__(self: NadaTable) -> str:
 
         cols_str = ",".join(f"'{c}'" for c in self.columns)
-        parties_str = ",".join(sorted([f"'{p}'" for p in self._parties]))
+        parties_str = ",".join(sorted([f"'{p}'" for p in self.get_parties()]))
         return f"NadaTable | cols=[{cols_str}] | rows={len(self._rows)} | parties=[{parties_str}]"
 
     def __repr__(self: NadaTable) -> str:
@@ -44,25 +230,24 @@ class NadaTable:
     def __setitem__(self: NadaTable, index: int, row: NadaArray):
 
         self._check_input(row)
+        self._settle()
         self._rows[index] = row
-        self._update_parties()
+        if self._valid is not None:
+            self._valid[index] = _one(row[0])
 
     def __getitem__(self: NadaTable, index: int) -> NadaArray:
         return self._rows[index]
 
-    def __delitem__(self: NadaTable, index: int):
+    def __delitem__(self: NadaTable, index: Union[int, slice]):
         del self._rows[index]
-        self._update_parties()
+        if self._valid is not None:
+            del self._valid[index]
 
     def _check_input(self: NadaTable, row: NadaArray):
         """
         Determine whether **row** is (1) of NadaArray type, and (2) matches length of self.columns
         """
-
-        if not isinstance(row, NadaArray):
-            raise TypeError("rows must be NadaArray instances")
-        if len(self.columns) != len(row):
-            raise ValueError("input row length must match length of table columns")
+        _check_row(self.columns, row)
 
     def append(self: NadaTable, row: NadaArray):
         """
@@ -70,8 +255,10 @@ class NadaTable:
         """
 
         self._check_input(row)
+        self._settle()
         self._rows.append(row)
-        self._add_parties(row)
+        if self._valid is not None:
+            self._valid.append(_one(row[0]))
 
     def extend(self: NadaTable, rows: List[NadaArray]):
         """
@@ -80,8 +267,10 @@ class NadaTable:
 
         for row in rows:
             self._check_input(row)
-            self._add_parties(row)
+        self._settle()
         self._rows.extend(rows)
+        if self._valid is not None:
+            self._valid.extend(_one(row[0]) for row in rows)
 
     def insert(self: NadaTable, index: int, row: NadaArray):
         """
@@ -89,26 +278,30 @@ class NadaTable:
         """
 
         self._check_input(row)
+        self._settle()
         self._rows.insert(index, row)
-        self._add_parties(row)
+        if self._valid is not None:
+            self._valid.insert(index, _one(row[0]))
 
-    def _update_parties(self: NadaTable):
+    def _settle(self: NadaTable):
         """
-        Update the set of all Party values for this instance
+        Evaluate the pending predicates before the rows are changed, so that they only
+        apply to the rows that this table held when they were added
         """
-        self._parties = {party for row in self._rows for party in row.get_parties()}
-
-    def _add_parties(self: NadaTable, row: NadaArray):
-        """
-        Add all Party values for some **item** to this instance
-        """
-        self._parties = self._parties | row.get_parties()
+        if self._pending:
+            self.get_valid()
 
     def get_parties(self: NadaTable) -> Set[Union[Party, audit.Party]]:
         """
-        Return the set of all input parties associated with the data stored by this instance
+        Return the set of all input parties associated with the data stored by this instance.
+        The parties are gathered from the rows on each call, so rows mutated in place after
+        they were added are accounted for.
         """
-        return self._parties
+        distinct = {}
+        for row in self._rows:
+            parties = row.parties
+            distinct[id(parties)] = parties
+        return set().union(*distinct.values())
 
     def _set_columns(self: NadaTable, *columns: str):
         for c in columns:
@@ -138,6 +331,8 @@ class NadaTable:
         :param data: List of NadaArray instances
         """
         self._rows = []
+        self._valid = None
+        self._pending = []
         self.extend(data)
         return self
 
@@ -147,6 +342,106 @@ class NadaTable:
         """
         return self._rows
 
+    @classmethod
+    def _derived(
+            cls,
+            columns: List[str],
+            rows: List[NadaArray],
+            valid: Optional[List[secret_int]],
+            pending: list = None
+    ) -> NadaTable:
+        """
+        Construct a new table with **columns** and **rows**, along with the validity bits
+        **valid** and the pending predicates **pending** of its rows
+        """
+        table = cls(*columns, rows=rows)
+        table._valid = valid
+        table._pending = [] if pending is None else pending
+        return table
+
+    @instrumented
+    def get_valid(self: NadaTable) -> Optional[List[secret_int]]:
+        """
+        Return the 0/1 validity bit of each row of this table, or None if no row has been
+        filtered out. Predicates added with :obj:`where` are evaluated here, all at once
+        and only once.
+        """
+
+        if self._pending:
+            self._valid = functions.where(
+                self._rows,
+                [(self.get_col_idx(c), op, value) for c, op, value in self._pending],
+                self._valid
+            )
+            self._pending = []
+        return self._valid
+
+    def get_predicates(self: NadaTable) -> List[Predicate]:
+        """
+        Return the (column, operator, value) predicates added with :obj:`where` that have
+        not been evaluated yet
+        """
+        return list(self._pending)
+
+    def where(
+            self: NadaTable, col: str, op: Union[str, Callable], value: Union[int, secret_int]
+    ) -> NadaTable:
+        """
+        Return a new NadaTable whose rows that do not satisfy **op** against **value** in
+        **col** are marked invalid. No row is removed: predicates are recorded and only
+        evaluated when the validity bits are needed, so that chained calls are fused into
+        a single pass over the rows. They are also evaluated before rows are added or
+        replaced, so that rows added later are valid.
+
+        >>> nt = NadaTable('a', 'b')
+        >>> nt.where('a', '<', 5).where('b', '!=', 0).get_valid()
+        []
+
+        :param col: Name of the column to filter on
+        :param op: One of "<", "<=", ">", ">=", "==" and "!=", or one of the array filter
+            functions nada_lt, nada_lteq, nada_gt, nada_gteq and nada_eq
+        :param value: Public or secret value to compare against
+        """
+
+        functions.predicate(op)
+        self.get_col_idx(col)
+        return NadaTable._derived(
+            self.columns,
+            [row.copy() for row in self._rows],
+            None if self._valid is None else list(self._valid),
+            self._pending + [(col, op, value)]
+        )
+
+    def rename(self: NadaTable, *columns: str) -> NadaTable:
+        """
+        Return a new NadaTable with the rows of this table and its columns renamed to
+        **columns**
+
+        :param columns: Variadic argument for the new names of this table's columns
+        """
+
+        if len(columns) != len(self.columns):
+            raise ValueError("there must be one new name per column")
+        names = dict(zip(self.columns, columns))
+        return NadaTable._derived(
+            columns,
+            [row.copy() for row in self._rows],
+            None if self._valid is None else list(self._valid),
+            [(names[c], op, value) for c, op, value in self._pending]
+        )
+
+    def query(self: NadaTable) -> Query:
+        """
+        Start a lazy query over this table, whose operations are only evaluated, once
+        optimised, by :obj:`Query.collect`
+
+        >>> NadaTable('a', 'b').query().sort_by('a', True).select('b')
+        Query | cols=['b'] | steps=sort_by -> select
+        """
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from nada_data.table.query import Query
+        return Query(self)
+
     def get_col_idx(self: NadaTable, col_name: str) -> int:
         """
         Get the integer idx for the column with name **col_name**
@@ -162,6 +457,12 @@ class NadaTable:
         except ValueError as exc:
             raise ValueError(f"column {col_name} not in {self}") from exc
 
+    def _get_key_idxs(self: NadaTable, key_col: KeyColumns) -> List[int]:
+        """
+        Get the integer indices of the key column or list of key columns **key_col**
+        """
+        return [self.get_col_idx(c) for c in _key_names(key_col)]
+
     def select(self: NadaTable, *cols: str) -> NadaTable:
         """
         Perform basic select operation on this table, returning a new NadaTable with rows
@@ -170,14 +471,18 @@ class NadaTable:
         :param cols: Variadic argument that indicates the names of the columns that will
         be used to construct the output table
         """
-        return NadaTable(
-            *cols,
-            rows=[
-                NadaArray(r[i] for i in [self.columns.index(c) for c in cols])
-                for r in copy.deepcopy(self._rows)
-            ]
-        )
-
+        idxs = [self.get_col_idx(c) for c in cols]
+        rows = [NadaArray.from_values([r[i] for i in idxs], True) for r in self._rows]
+        # predicates on columns that are kept remain pending
+        if all(c in cols for c, _, _ in self._pending):
+            valid = self._valid
+            pending = list(self._pending)
+        else:
+            valid = self.get_valid()
+            pending = []
+        return NadaTable._derived(cols, rows, None if valid is None else list(valid), pending)
+
+    @instrumented
     def concat(self: NadaTable, other: NadaTable) -> NadaTable:
         """
         Return a new NadaTable that is the result of concatenating this instance with another
@@ -188,78 +493,153 @@ class NadaTable:
         if self.columns != other.columns:
             raise ValueError("columns between tables must match to do concat")
 
-        return NadaTable(
-            *self.columns,
-            rows=copy.deepcopy(self.get_data() + other.get_data())
-        )
-
-    def sort_by(self: NadaTable, key_col: str, ascending: bool) -> NadaTable:
+        rows = [row.copy() for row in self.get_data() + other.get_data()]
+        valid, other_valid = self.get_valid(), other.get_valid()
+        if valid is None and other_valid is None:
+            return NadaTable(*self.columns, rows=rows)
+        return NadaTable._derived(self.columns, rows, [
+            v for t, bits in [(self, valid), (other, other_valid)]
+            for v in (bits if bits is not None else [_one(row[0]) for row in t.get_data()])
+        ])
+
+    @instrumented
+    def join(
+            self: NadaTable, other: NadaTable, on: KeyColumns, method: str = "shift"
+    ) -> NadaTable:
         """
-        Sort the rows of this table by **key_col** in either ascending or descending order
+        Equi-join **other** with this table on the columns **on**, where the keys of this
+        table must be unique. The output table has the key columns, the other columns of
+        this table and the other columns of **other**, and as many rows as **other**:
+        rows with a match in this table come first, and the remaining rows are zeroed.
+        Invalid rows of either table match nothing.
 
-        :param key_col: Name of the column to key sorting on
-        :param ascending: Control ordering on output sort
+        :param other: NadaTable whose rows are each matched with at most one row of this table
+        :param on: Name of the column to join on, or a list of names
+        :param method: Copy columns down with a sequential pass ("shift") or with a
+            log-depth segmented scan ("scan")
         """
 
-        new_rows = copy.deepcopy(self._rows)
-        functions.odd_even_sort(new_rows, self.get_col_idx(key_col), ascending)
-
-        return NadaTable(*self.columns, rows=new_rows)
+        key_cols = _key_names(on)
+        cols = [
+            *key_cols,
+            *(c for c in self.columns if c not in key_cols),
+            *(c for c in other.columns if c not in key_cols)
+        ]
+        if len(set(cols)) != len(cols):
+            raise ValueError("columns other than the join keys must not share names")
+
+        rows = functions.join(
+            self.get_data(), other.get_data(),
+            self._get_key_idxs(key_cols), [other.get_col_idx(c) for c in key_cols], method,
+            primary_valid=self.get_valid(), foreign_valid=other.get_valid(),
+            primary_width=len(self.columns)
+        )
+        return NadaTable(*cols, rows=[NadaArray(row) for row in rows])
 
-    def _aggregate(
+    @instrumented
+    def sort_by(
             self: NadaTable,
-            key_col: str,
-            agg_col: str,
-            agg_func: Callable[[List[List[secret_int]], int, int], None]
+            key_col: KeyColumns,
+            ascending: bool,
+            algorithm: str = "odd_even",
+            layered: bool = False
     ) -> NadaTable:
         """
-        Perform aggregation function **agg_func** over **agg_col** grouped by **key_col**
-
-        :param key_col: Column to group by
-        :param agg_col: Column to sum over
-        :param agg_func: aggregation function to perform
-        """
-
-        if key_col == agg_col:
-            raise ValueError(":key_col: and :agg_col: parameters must be distinct")
-
-        new_rows = [
-            NadaArray([
-                copy.deepcopy(row[self.get_col_idx(key_col)]),
-                copy.deepcopy(row[self.get_col_idx(agg_col)])
-            ])
-            for row in self.get_data()
-        ]
-        agg_func(new_rows, 0, 1)
+        Sort the rows of this table by **key_col** in either ascending or descending order.
+        Given a list of columns, the rows are ordered lexicographically with a single
+        sorting network, whose comparators each compare all the key columns at once.
+        Invalid rows are moved to the end.
 
-        return NadaTable(key_col, agg_col, rows=new_rows)
+        :param key_col: Name of the column to key sorting on, or a list of names
+        :param ascending: Control ordering on output sort
+        :param algorithm: Sorting network to apply, one of "odd_even", "bitonic" or "optimal"
+        :param layered: Emit comparators layer by layer rather than in recursive order
+        """
+
+        key_idxs = self._get_key_idxs(key_col)
+        valid = self.get_valid()
+        if valid is None:
+            new_rows = [row.copy() for row in self._rows]
+            functions.odd_even_sort(
+                new_rows, key_idxs, ascending, algorithm=algorithm, layered=layered
+            )
+            return NadaTable(*self.columns, rows=new_rows)
+
+        # the validity bit is the leading sort key, so that invalid rows sort last
+        new_rows = _with_validity(self._rows, valid, ascending)
+        functions.odd_even_sort(
+            new_rows, [len(self.columns)] + key_idxs, ascending,
+            algorithm=algorithm, layered=layered
+        )
+        new_rows, new_valid = _split_validity(new_rows, ascending)
+        return NadaTable._derived(self.columns, new_rows, new_valid)
 
-    def aggregate_sum(self: NadaTable, key_col: str, agg_col: str) -> NadaTable:
+    @instrumented
+    def top_k(self: NadaTable, key_col: KeyColumns, k: int, largest: bool = True) -> NadaTable:
         """
-        Sum the contents of **agg_col** grouped by **key_col**
+        Return a new NadaTable with the **k** rows that have the largest (or smallest)
+        values in **key_col**, in sorted order. This uses a selection network, which needs
+        far fewer comparators than :obj:`sort_by` when **k** is small. Invalid rows are
+        only returned when fewer than **k** rows are valid.
 
-        :param key_col: Column to group by
-        :param agg_col: Column to sum over
+        :param key_col: Name of the column to key selection on, or a list of names
+        :param k: Number of rows to return
+        :param largest: Return the rows with the largest keys in descending order if set,
+            and those with the smallest keys in ascending order otherwise
         """
-        return self._aggregate(key_col, agg_col, functions.aggregate_sum)
 
-    def aggregate_max(self: NadaTable, key_col: str, agg_col: str) -> NadaTable:
-        """
-        Determine the max value of **agg_col** grouped by **key_col**
+        key_idxs = self._get_key_idxs(key_col)
+        valid = self.get_valid()
+        if valid is None:
+            new_rows = [row.copy() for row in self._rows]
+            return NadaTable(*self.columns, rows=functions.top_k(new_rows, key_idxs, k, largest))
 
-        :param key_col: Column to group by
-        :param agg_col: Column to calculate max over
-        """
-        return self._aggregate(key_col, agg_col, functions.aggregate_max)
-
-    def aggregate_min(self: NadaTable, key_col: str, agg_col: str):
-        """
-        Determine the min value of **agg_col** grouped by **key_col**
+        new_rows = _with_validity(self._rows, valid, not largest)
+        new_rows, new_valid = _split_validity(
+            functions.top_k(new_rows, [len(self.columns)] + key_idxs, k, largest), not largest
+        )
+        return NadaTable._derived(self.columns, new_rows, new_valid)
 
-        :param key_col: Column to group by
-        :param agg_col: Column to calculate min over
+    @instrumented
+    def aggregate(
+            self: NadaTable,
+            key_col: KeyColumns,
+            aggs: Dict[str, str],
+            method: str = "shift"
+    ) -> NadaTable:
         """
-        return self._aggregate(key_col, agg_col, functions.aggregate_min)
+        Aggregate several columns grouped by **key_col** with a single sort. **aggs** maps
+        the name of each column to aggregate to the name of an aggregation function, one
+        of "sum", "max", "min", "count", "count_distinct" or "avg". The output table has
+        the key columns followed by the aggregated columns in the order of **aggs**. An
+        "avg" column holds the sum of the column and is followed by a column named
+        "<col>_count" holding the number of rows, so that the average is their quotient,
+        and which must not clash with the name of another output column. Invalid rows are
+        grouped apart from valid ones, so that they are left out of every aggregate, and
+        remain invalid in the output table.
+
+        :param key_col: Column to group by, or a list of columns to group by
+        :param aggs: Mapping from column name to aggregation function name
+        :param method: Combine rows with a sequential pass ("shift") or with a log-depth
+            segmented scan ("scan")
+        """
+
+        key_cols, expanded, agg_types = _aggregate_plan(key_col, aggs)
+
+        idxs = [self.get_col_idx(c) for c in [*key_cols, *(agg[1] for agg in expanded)]]
+        new_rows = [NadaArray.from_values([row[i] for i in idxs], True) for row in self.get_data()]
+        valid = self.get_valid()
+        if valid is None:
+            functions.aggregate(new_rows, list(range(len(key_cols))), agg_types, method)
+            return NadaTable(*key_cols, *(agg[0] for agg in expanded), rows=new_rows)
+
+        # invalid rows form groups of their own, and keep their validity bits
+        new_rows = _with_validity(new_rows, valid, True)
+        functions.aggregate(new_rows, [len(idxs)] + list(range(len(key_cols))), agg_types, method)
+        new_rows, new_valid = _split_validity(new_rows, True)
+        return NadaTable._derived(
+            [*key_cols, *(agg[0] for agg in expanded)], new_rows, new_valid
+        )
 
 
 def serialize_input_table(
@@ -274,11 +654,11 @@ def serialize_input_table(
     :param prefix: String to add as prefix to input data names
     """
     return [
-        NadaArray(
+        NadaArray.from_values([
             audit.SecretInteger(
                 audit.Input(f"{prefix}{i}_{j}", party=party)
             ) for j in range(len(arrs[i]))
-        ) for i in range(len(arrs))
+        ], True) for i in range(len(arrs))
     ]
 
 
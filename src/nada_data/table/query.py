@@ -0,0 +1,637 @@
+"""
+Lazy query plans over NadaTable instances
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+from nada_data import cost
+from nada_data.array.functions.filter import nada_eq
+from nada_data.table.nada_table import (
+    NadaTable, KeyColumns, _AggregateMixin, _key_names, _expand_aggs, _aggregate_plan
+)
+from nada_data.instrument import instrumented
+
+
+class Step(NamedTuple):
+    """
+    Single operation of a query plan, named after the NadaTable method it calls
+    """
+    op: str
+    args: tuple
+
+
+# steps after which the order of the rows no longer matters, as they sort them anew
+REORDERING = {"sort_by", "top_k", "aggregate", "join"}
+# steps that neither depend on nor change the order of the rows
+ORDER_PRESERVING = {"where", "select"}
+
+
+def _output_columns(step: Step, columns: Tuple[str, ...]) -> Tuple[str, ...]:
+    """
+    Return the columns of the table obtained by applying **step** to a table with
+    **columns**
+    """
+
+    if step.op == "select":
+        return step.args[0]
+    if step.op == "aggregate":
+        keys, aggs, _ = step.args
+        return keys + tuple(agg[0] for agg in _expand_aggs(dict(aggs)))
+    if step.op == "join":
+        _, on, _, other_cols = step.args
+        return (
+            on + tuple(c for c in columns if c not in on)
+            + tuple(c for c in other_cols if c not in on)
+        )
+    return columns
+
+
+def _input_columns(step: Step, needed: Tuple[str, ...]) -> set:
+    """
+    Return the columns that **step** reads, given the columns **needed** from its output
+    """
+
+    if step.op == "select":
+        return {c for c in step.args[0] if c in needed}
+    if step.op == "where":
+        return set(needed) | {step.args[0]}
+    if step.op in ("sort_by", "top_k"):
+        return set(needed) | set(step.args[0])
+    if step.op == "aggregate":
+        keys, aggs, _ = step.args
+        return set(keys) | {col for col, _ in aggs}
+    if step.op == "join":
+        return set(needed) | set(step.args[1])
+    return set(needed)
+
+
+def _drop_sorts(steps: List[Step]) -> List[Step]:
+    """
+    Drop every sort whose order is discarded by a later step, and every sort that only
+    repeats the order established by the sort before it
+    """
+
+    steps = list(steps)
+    changed = True
+    while changed:
+        changed = False
+        for i, step in enumerate(steps):
+            if step.op != "sort_by":
+                continue
+            j = i + 1
+            while j < len(steps) and steps[j].op in ORDER_PRESERVING:
+                j += 1
+            if j == len(steps) or steps[j].op not in REORDERING:
+                continue
+            later = steps[j]
+            if (
+                    later.op == "sort_by" and later.args[1] == step.args[1]
+                    and step.args[0][:len(later.args[0])] == later.args[0]
+                    and all(s.op == "select" for s in steps[i + 1:j])
+            ):
+                # the later sort orders by a prefix of the keys of this one
+                del steps[j]
+            else:
+                del steps[i]
+            changed = True
+            break
+    return steps
+
+
+def _prune(steps: List[Step], columns: Tuple[str, ...]) -> List[Step]:
+    """
+    Select the columns that are read by later steps or returned ahead of every sort and
+    join, so that sorting networks do not move unused columns
+    """
+
+    inputs = [columns]
+    for step in steps:
+        inputs.append(_output_columns(step, inputs[-1]))
+
+    needed = inputs[-1]
+    pruned = []
+    for step, cols in zip(reversed(steps), reversed(inputs[:-1])):
+        if step.op == "select":
+            step = Step("select", (tuple(c for c in step.args[0] if c in needed),))
+        elif step.op == "join":
+            other, on, method, other_cols = step.args
+            step = Step("join", (
+                other, on, method, tuple(c for c in other_cols if c in on or c in needed)
+            ))
+        needed = tuple(c for c in cols if c in _input_columns(step, needed))
+        pruned.append(step)
+        if step.op in ("sort_by", "top_k", "join") and needed != cols:
+            pruned.append(Step("select", (needed,)))
+    pruned.reverse()
+
+    # a selection directly followed by another one is redundant, as is one that keeps
+    # every column
+    pruned = [
+        step for i, step in enumerate(pruned)
+        if not (step.op == "select" and i + 1 < len(pruned) and pruned[i + 1].op == "select")
+    ]
+    steps = []
+    for step in pruned:
+        if step.op != "select" or step.args[0] != columns:
+            steps.append(step)
+            columns = _output_columns(step, columns)
+    return steps
+
+
+def _key(arg) -> tuple:
+    """
+    Return a hashable key for a step argument, where secret values and tables are keyed
+    by identity
+    """
+
+    if arg is None or isinstance(arg, (str, int)):
+        return arg
+    if isinstance(arg, tuple):
+        return tuple(_key(a) for a in arg)
+    return ("id", id(arg))
+
+
+def _concat(table: NadaTable, other: NadaTable) -> NadaTable:
+    if other.columns != table.columns:
+        other = other.select(*table.columns)
+    return table.concat(other)
+
+
+def _join(
+        table: NadaTable, other: NadaTable, on: Tuple[str, ...], method: str,
+        other_cols: Tuple[str, ...]
+) -> NadaTable:
+    if list(other_cols) != other.columns:
+        other = other.select(*other_cols)
+    return table.join(other, list(on), method)
+
+
+# table method called by each step, given the table and the arguments of the step
+APPLY: Dict[str, Callable] = {
+    "where": lambda table, col, op, value: table.where(col, op, value),
+    "select": lambda table, cols: table.select(*cols),
+    "sort_by": lambda table, keys, ascending, algorithm: table.sort_by(
+        list(keys), ascending, algorithm
+    ),
+    "top_k": lambda table, keys, k, largest: table.top_k(list(keys), k, largest),
+    "aggregate": lambda table, keys, aggs, method: table.aggregate(
+        list(keys), dict(aggs), method
+    ),
+    "concat": _concat,
+    "join": _join
+}
+
+
+def _apply(table: NadaTable, step: Step) -> NadaTable:
+    """
+    Apply **step** to **table**
+    """
+    return APPLY[step.op](table, *step.args)
+
+
+def _aggregate_merged(table: NadaTable, steps: List[Step]) -> List[NadaTable]:
+    """
+    Evaluate several aggregate **steps** over the same keys of **table** with a single
+    sort, returning the output of each step
+    """
+
+    keys, _, method = steps[0].args
+    sources, aliased = [], {}
+    for i, step in enumerate(steps):
+        for col, agg_type in step.args[1]:
+            sources.append(col)
+            aliased[f"{col}#{i}"] = agg_type
+    merged = table.select(*keys, *sources).rename(*keys, *aliased).aggregate(
+        list(keys), aliased, method
+    )
+
+    outputs = []
+    for i, step in enumerate(steps):
+        names = _expand_aggs(dict(step.args[1]))
+        aliases = _expand_aggs({f"{col}#{i}": agg_type for col, agg_type in step.args[1]})
+        outputs.append(
+            merged.select(*keys, *(agg[0] for agg in aliases)).rename(
+                *keys, *(agg[0] for agg in names)
+            )
+        )
+    return outputs
+
+
+@dataclass
+class _Estimate:
+    """
+    Shape of a table along a plan: its number of rows and columns, whether its rows
+    carry validity bits, and the distinct predicates that remain to be evaluated
+    """
+    n: int
+    columns: Tuple[str, ...]
+    pending: Dict[tuple, Union[str, Callable]]
+    valid: bool
+
+    @staticmethod
+    def of(table: NadaTable) -> _Estimate:
+        """
+        Return the shape of **table**
+        """
+        pending = {
+            (col, _key(op), _key(value)): op for col, op, value in table.get_predicates()
+        }
+        return _Estimate(
+            len(table), tuple(table.columns), pending,
+            len(pending) > 0 or table.get_valid() is not None
+        )
+
+    def evaluate(self: _Estimate) -> cost.Cost:
+        """
+        Cost of evaluating the pending predicates into validity bits
+        """
+        if not self.pending:
+            return cost.Cost()
+        ops = ["==" if op is nada_eq else op for op in self.pending.values()]
+        self.pending = {}
+        return cost.where(self.n, [op if isinstance(op, str) else "<" for op in ops])
+
+
+def _estimate_where(state: _Estimate, col: str, op, value) -> cost.Cost:
+    state.pending[(col, _key(op), _key(value))] = op
+    state.valid = True
+    return cost.Cost()
+
+
+def _estimate_select(state: _Estimate, cols: Tuple[str, ...]) -> cost.Cost:
+    total = cost.Cost()
+    if any(key[0] not in cols for key in state.pending):
+        total = state.evaluate()
+    state.columns = cols
+    return total
+
+
+def _estimate_sort_by(
+        state: _Estimate, keys: Tuple[str, ...], _, algorithm: str
+) -> cost.Cost:
+    total = state.evaluate()
+    valid = int(state.valid)
+    return total + cost.odd_even_sort(
+        state.n, len(state.columns) + valid, len(keys) + valid, algorithm=algorithm
+    )
+
+
+def _estimate_top_k(state: _Estimate, keys: Tuple[str, ...], k: int, _) -> cost.Cost:
+    total = state.evaluate()
+    valid = int(state.valid)
+    total = total + cost.top_k(state.n, len(state.columns) + valid, k, len(keys) + valid)
+    state.n = min(k, state.n)
+    return total
+
+
+def _estimate_aggregate(
+        state: _Estimate, keys: Tuple[str, ...], aggs: tuple, method: str
+) -> cost.Cost:
+    total = state.evaluate()
+    expanded = _expand_aggs(dict(aggs))
+    width = len(keys) + len(expanded)
+    valid = int(state.valid)
+    total = total + cost.aggregate(
+        state.n, width + valid, [agg[2] for agg in expanded], len(keys) + valid, method
+    )
+    state.columns = _output_columns(Step("aggregate", (keys, aggs, method)), state.columns)
+    return total
+
+
+def _estimate_concat(state: _Estimate, other: NadaTable) -> cost.Cost:
+    other_state = _Estimate.of(other)
+    total = state.evaluate() + other_state.evaluate()
+    if state.valid != other_state.valid:
+        total = total + cost.Cost(add=other_state.n if state.valid else state.n)
+    state.n += other_state.n
+    state.valid = state.valid or other_state.valid
+    return total
+
+
+def _estimate_join(
+        state: _Estimate, other: NadaTable, on: Tuple[str, ...], method: str,
+        other_cols: Tuple[str, ...]
+) -> cost.Cost:
+    other_state = _Estimate.of(other)
+    total = state.evaluate() + other_state.evaluate()
+    total = total + cost.join(
+        state.n, other_state.n, len(state.columns), len(other_cols), len(on), method,
+        other_state.valid
+    )
+    state.n = other_state.n
+    state.columns = _output_columns(
+        Step("join", (other, on, method, other_cols)), state.columns
+    )
+    state.valid = False
+    return total
+
+
+# cost of each step, given the shape of its input table, which is updated to the shape of
+# its output, and the arguments of the step
+ESTIMATES: Dict[str, Callable[..., cost.Cost]] = {
+    "where": _estimate_where,
+    "select": _estimate_select,
+    "sort_by": _estimate_sort_by,
+    "top_k": _estimate_top_k,
+    "aggregate": _estimate_aggregate,
+    "concat": _estimate_concat,
+    "join": _estimate_join
+}
+
+
+def _estimate_step(state: _Estimate, step: Step) -> cost.Cost:
+    """
+    Cost of applying **step** to a table with the shape **state**, which is updated to
+    the shape of the output
+    """
+    return ESTIMATES[step.op](state, *step.args)
+
+
+class Query(_AggregateMixin):
+    """
+    Lazily recorded sequence of NadaTable operations over a source table. Each method
+    returns a new Query that extends the plan, and nothing is computed until
+    :obj:`collect` is called. The plan is then optimised: sorts whose order is discarded
+    by a later sort, top-k selection, aggregation or join are dropped, as are sorts that
+    repeat the order of the sort before them, and columns that are not used later are
+    dropped ahead of every sort and join. Several queries collected together evaluate
+    their common steps once, and aggregations of the same table over the same keys share
+    a single sort.
+
+    >>> nt = NadaTable('a', 'b', 'c')
+    >>> q = nt.query().sort_by('a', True).sort_by('b', True).select('b')
+    >>> print(q)
+    Query | cols=['b'] | steps=sort_by -> sort_by -> select
+    >>> print(q.optimize())
+    Query | cols=['b'] | steps=select -> sort_by
+
+    :param source: Table to query
+    """
+    def __init__(self: Query, source: NadaTable, steps: Tuple[Step, ...] = ()):
+        self.source = source
+        self.steps = steps
+        columns = tuple(source.columns)
+        for step in steps:
+            columns = _output_columns(step, columns)
+        self.columns = list(columns)
+
+    def __str__(self: Query) -> str:
+        cols_str = ",".join(f"'{c}'" for c in self.columns)
+        steps_str = " -> ".join(step.op for step in self.steps) or "none"
+        return f"Query | cols=[{cols_str}] | steps={steps_str}"
+
+    def __repr__(self: Query) -> str:
+        return str(self)
+
+    def _then(self: Query, op: str, *args) -> Query:
+        return Query(self.source, self.steps + (Step(op, args),))
+
+    def _check_columns(self: Query, *cols: str):
+        for c in cols:
+            if c not in self.columns:
+                raise ValueError(f"column {c} not in {self}")
+
+    def where(
+            self: Query, col: str, op: Union[str, Callable], value
+    ) -> Query:
+        """
+        Mark the rows that do not satisfy **op** against **value** in **col** invalid, as
+        in :obj:`NadaTable.where`
+
+        :param col: Name of the column to filter on
+        :param op: Comparison operator or array filter function
+        :param value: Public or secret value to compare against
+        """
+        self._check_columns(col)
+        return self._then("where", col, op, value)
+
+    def select(self: Query, *cols: str) -> Query:
+        """
+        Keep only the columns **cols**
+
+        :param cols: Variadic argument for the names of the columns to keep
+        """
+        self._check_columns(*cols)
+        return self._then("select", cols)
+
+    def sort_by(
+            self: Query, key_col: KeyColumns, ascending: bool, algorithm: str = "odd_even"
+    ) -> Query:
+        """
+        Sort the rows by **key_col**, as in :obj:`NadaTable.sort_by`
+
+        :param key_col: Name of the column to key sorting on, or a list of names
+        :param ascending: Control ordering on output sort
+        :param algorithm: Sorting network to apply, one of "odd_even", "bitonic" or "optimal"
+        """
+        keys = tuple(_key_names(key_col))
+        self._check_columns(*keys)
+        return self._then("sort_by", keys, ascending, algorithm)
+
+    def top_k(self: Query, key_col: KeyColumns, k: int, largest: bool = True) -> Query:
+        """
+        Keep the **k** rows with the largest (or smallest) keys, as in :obj:`NadaTable.top_k`
+
+        :param key_col: Name of the column to key selection on, or a list of names
+        :param k: Number of rows to return
+        :param largest: Return the rows with the largest keys if set
+        """
+        keys = tuple(_key_names(key_col))
+        self._check_columns(*keys)
+        return self._then("top_k", keys, k, largest)
+
+    def aggregate(
+            self: Query, key_col: KeyColumns, aggs: Dict[str, str], method: str = "shift"
+    ) -> Query:
+        """
+        Aggregate several columns grouped by **key_col**, as in :obj:`NadaTable.aggregate`
+
+        :param key_col: Column to group by, or a list of columns to group by
+        :param aggs: Mapping from column name to aggregation function name
+        :param method: Combine rows with a sequential pass ("shift") or with a log-depth
+            segmented scan ("scan")
+        """
+        keys = tuple(_key_names(key_col))
+        self._check_columns(*keys, *aggs)
+        _aggregate_plan(keys, aggs)
+        return self._then("aggregate", keys, tuple(aggs.items()), method)
+
+    def concat(self: Query, other: NadaTable) -> Query:
+        """
+        Append the rows of **other**, which must have the same columns
+
+        :param other: NadaTable instance to concatenate
+        """
+        if list(self.columns) != other.columns:
+            raise ValueError("columns between tables must match to do concat")
+        return self._then("concat", other)
+
+    def join(self: Query, other: NadaTable, on: KeyColumns, method: str = "shift") -> Query:
+        """
+        Equi-join **other** on the columns **on**, as in :obj:`NadaTable.join`
+
+        :param other: NadaTable whose rows are each matched with at most one row
+        :param on: Name of the column to join on, or a list of names
+        :param method: Copy columns down with a sequential pass ("shift") or with a
+            log-depth segmented scan ("scan")
+        """
+        keys = tuple(_key_names(on))
+        self._check_columns(*keys)
+        for c in keys:
+            other.get_col_idx(c)
+        query = self._then("join", other, keys, method, tuple(other.columns))
+        if len(set(query.columns)) != len(query.columns):
+            raise ValueError("columns other than the join keys must not share names")
+        return query
+
+    def optimize(self: Query) -> Query:
+        """
+        Return the optimised plan of this query
+        """
+        steps = _drop_sorts(list(self.steps))
+        return Query(self.source, tuple(_prune(steps, tuple(self.source.columns))))
+
+    def estimate(self: Query) -> List[Tuple[Step, cost.Cost]]:
+        """
+        Return each step of the optimised plan of this query along with its estimated
+        cost, without building any graph. Predicates are charged to the first step that
+        needs them evaluated.
+        """
+        plan = self.optimize()
+        state = _Estimate.of(plan.source)
+        return [(step, _estimate_step(state, step)) for step in plan.steps]
+
+    def cost(self: Query) -> cost.Cost:
+        """
+        Return the estimated cost of evaluating this query
+        """
+        total = cost.Cost()
+        for _, step_cost in self.estimate():
+            total = total + step_cost
+        return total
+
+    def explain(self: Query) -> str:
+        """
+        Describe the optimised plan of this query, with the estimated cost of each step
+        and of the whole query
+
+        >>> print(NadaTable('a', 'b').query().sort_by('a', True).explain())
+        Query | cols=['a','b'] | steps=sort_by
+          sort_by | Cost | add=0 | mul=0 | cmp=0 | eq=0 | ne=0 | ife=0 | depth=0
+          total | Cost | add=0 | mul=0 | cmp=0 | eq=0 | ne=0 | ife=0 | depth=0
+        """
+        estimates = self.estimate()
+        total = cost.Cost()
+        lines = [str(self.optimize())]
+        for step, step_cost in estimates:
+            lines.append(f"  {step.op} | {step_cost}")
+            total = total + step_cost
+        lines.append(f"  total | {total}")
+        return "\n".join(lines)
+
+    def collect(self: Query) -> NadaTable:
+        """
+        Optimise and evaluate this query
+        """
+        return collect(self)[0]
+
+
+def _prefix_keys(plans: List[Query]) -> List[List[tuple]]:
+    """
+    Key each prefix of each of **plans** by its source and steps, so that equal prefixes
+    of different plans have equal keys
+    """
+    return [
+        [
+            (id(plan.source),) + tuple(_key(s) for s in plan.steps[:i])
+            for i in range(len(plan.steps) + 1)
+        ]
+        for plan in plans
+    ]
+
+
+def _has_distinct(steps: List[Step]) -> bool:
+    """
+    Determine whether any of the aggregate **steps** counts distinct values
+    """
+    return any(agg_type == "count_distinct" for step in steps for _, agg_type in step.args[1])
+
+
+def _group_aggregates(
+        plans: List[Query], prefixes: List[List[tuple]]
+) -> Dict[tuple, Tuple[tuple, List[Step], int]]:
+    """
+    Group the aggregate steps of **plans** by the table they aggregate and their keys,
+    where each group holds at most one count_distinct. Return, for the prefix ending
+    with each aggregate step, a key of its group, the steps of the group and the
+    position of the step in the group.
+    """
+
+    groups: Dict[tuple, List[List[Step]]] = {}
+    merged: Dict[tuple, Tuple[tuple, List[Step], int]] = {}
+    for plan, prefix in zip(plans, prefixes):
+        for i, step in enumerate(plan.steps):
+            if step.op != "aggregate" or prefix[i + 1] in merged:
+                continue
+            group_key = (prefix[i], step.args[0], step.args[2])
+            members = groups.setdefault(group_key, [])
+            for n, member in enumerate(members):
+                if not _has_distinct([step]) or not _has_distinct(member):
+                    break
+            else:
+                n = len(members)
+                members.append([])
+            members[n].append(step)
+            merged[prefix[i + 1]] = (group_key + (n,), members[n], len(members[n]) - 1)
+    return merged
+
+
+def _evaluate(
+        table: NadaTable,
+        step: Step,
+        group: Optional[Tuple[tuple, List[Step], int]],
+        outputs: Dict[tuple, List[NadaTable]]
+) -> NadaTable:
+    """
+    Apply **step** to **table**, evaluating all the aggregate steps of its **group**
+    together, and keeping their **outputs**, if it is merged with others
+    """
+
+    if group is None or len(group[1]) == 1:
+        return _apply(table, step)
+    group_key, members, index = group
+    if group_key not in outputs:
+        outputs[group_key] = _aggregate_merged(table, members)
+    return outputs[group_key][index]
+
+
+@instrumented
+def collect(*queries: Query) -> List[NadaTable]:
+    """
+    Optimise and evaluate several queries together. Steps common to several queries are
+    evaluated once, and aggregations over the same keys of the same table are merged
+    into a single aggregation, so that the table is sorted only once.
+
+    :param queries: Variadic argument for the queries to evaluate
+    """
+
+    plans = [query.optimize() for query in queries]
+    prefixes = _prefix_keys(plans)
+    merged = _group_aggregates(plans, prefixes)
+
+    tables: Dict[tuple, NadaTable] = {}
+    outputs: Dict[tuple, List[NadaTable]] = {}
+    results = []
+    for plan, prefix in zip(plans, prefixes):
+        table = plan.source
+        for i, step in enumerate(plan.steps):
+            if prefix[i + 1] not in tables:
+                tables[prefix[i + 1]] = _evaluate(table, step, merged.get(prefix[i + 1]), outputs)
+            table = tables[prefix[i + 1]]
+        results.append(table)
+    return results
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -1,8 +1,8 @@
 """
 Utility functions shared by both the `array` and `table` modules.
 """
-from typing import List, Dict
-from nada_dsl import audit
+from typing import List, Dict, Sequence, Callable, Any, Union
+from nada_dsl import audit, Integer
 
 
 def next_power_of_two(n: int) -> int:
@@ -29,6 +29,52 @@ def next_power_of_two(n: int) -> int:
     return p
 
 
+def literal(value: int, like: Any) -> Union[Integer, audit.Integer]:
+    """
+    Return a constant integer **value** of the same flavor (``nada_dsl`` or
+    ``nada_dsl.audit``) as **like**, so that the two can be combined
+
+    >>> literal(1, audit.Integer(value=5)).value
+    1
+
+    :param value: Integer value of the constant
+    :param like: Value whose flavor the constant should match
+    """
+
+    if isinstance(like, audit.Abstract):
+        return audit.Integer(value=value)
+    return Integer(value)
+
+
+def tree_reduce(values: Sequence[Any], func: Callable[[Any, Any], Any]) -> Any:
+    """
+    Combine **values** with the binary function **func** by a balanced pairwise
+    (tournament) reduction. Each round combines adjacent pairs and carries an odd
+    trailing element up unchanged, so the result has depth ceil(log2(n)) rather
+    than the n - 1 of a left-to-right fold.
+
+    >>> tree_reduce([1, 2, 3, 4, 5], lambda x, y: x + y)
+    15
+    >>> tree_reduce(["a", "b", "c"], lambda x, y: f"({x}{y})")
+    '((ab)c)'
+
+    :param values: Non-empty sequence of values to combine
+    :param func: Binary function used to combine two values
+    """
+
+    if len(values) == 0:
+        raise ValueError("cannot reduce an empty sequence")
+
+    level = list(values)
+    while len(level) > 1:
+        paired = [func(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2 == 1:
+            paired.append(level[-1])
+        level = paired
+
+    return level[0]
+
+
 def initialize_array_data(prefix: str, arr: List[int]):
     """
     Initialize an array of data for some prefix
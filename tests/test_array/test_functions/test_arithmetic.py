@@ -9,11 +9,15 @@ from nada_data.array import serialize_input_array
 class TestArrayArithmetic(unittest.TestCase):
 
     @parameterized.expand([
-        ([1, 2, 3], 6),
-        ([5, 6], 11)
+        ([1, 2, 3], True, 6),
+        ([1, 2, 3], False, 6),
+        ([5, 6], True, 11),
+        ([5, 6], False, 11),
+        ([4, 1, 3, 2, 5, 6, 5], True, 26),
+        ([7], True, 7)
     ])
     def test_sum(
-            self, input_arr: List[int], expected: int
+            self, input_arr: List[int], tree: bool, expected: int
     ):
 
         audit.Abstract.initialize(
@@ -23,7 +27,8 @@ class TestArrayArithmetic(unittest.TestCase):
         party = audit.Party(name="party_one")
         output = audit.Output(
             functions.sum_nada_array(
-                serialize_input_array(input_arr, party, "p1_input_")
+                serialize_input_array(input_arr, party, "p1_input_"),
+                tree=tree
             ),
             "output",
             party
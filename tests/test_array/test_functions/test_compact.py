@@ -0,0 +1,83 @@
+import unittest
+import random
+from typing import List, Callable
+from nada_dsl import audit
+from parameterized import parameterized
+from nada_data.array import functions
+from nada_data.array import serialize_input_array
+
+
+def audit_inputs(input_arr: List[int], keep: List[int] = None):
+
+    keep = [] if keep is None else keep
+    audit.Abstract.initialize(
+        {f"p1_input_{i}": input_arr[i] for i in range(len(input_arr))} |
+        {f"p1_keep_{i}": keep[i] for i in range(len(keep))} |
+        {"cmp": 3}
+    )
+    party = audit.Party(name="input_party")
+    return (
+        serialize_input_array(input_arr, party, "p1_input_"),
+        serialize_input_array(keep, party, "p1_keep_")
+    )
+
+
+class TestArrayCompact(unittest.TestCase):
+
+    @parameterized.expand([(None,), (4,), (9,)])
+    def test_compact(self, limit: int):
+
+        rng = random.Random(16)
+        for n in [1, 2, 5, 9, 16]:
+            input_arr = [rng.randint(1, 50) for _ in range(n)]
+            keep = [rng.randint(0, 1) for _ in range(n)]
+            if limit is not None:
+                # the limit is a public upper bound on the number of kept values
+                for i in range(n):
+                    keep[i] = keep[i] if sum(keep[:i + 1]) <= limit else 0
+
+            values, bits = audit_inputs(input_arr, keep)
+            output, count = functions.compact_nada_array(values, bits, limit)
+            output = [v.value for v in output]
+            kept = [v for v, k in zip(input_arr, keep) if k]
+
+            self.assertEqual(sum(keep), count.value)
+            self.assertEqual(n if limit is None else min(limit, n), len(output))
+            self.assertEqual(sorted(kept), sorted(output[:len(kept)]))
+            self.assertTrue(all(v == 0 for v in output[len(kept):]))
+
+    def test_compact_no_comparisons(self):
+
+        values, bits = audit_inputs(list(range(1, 9)), [1, 0, 0, 1, 1, 0, 1, 0])
+        functions.compact_nada_array(values, bits, limit=4)
+        self.assertEqual(0, audit.Abstract.analysis["cmp"])
+        self.assertEqual(0, audit.Abstract.analysis["eq"])
+
+    @parameterized.expand([
+        (functions.nada_lt, [1, 2]),
+        (functions.nada_gteq, [3, 4, 5]),
+        (functions.nada_eq, [3])
+    ])
+    def test_filter_compact(self, op: Callable, expected: List[int]):
+
+        values, _ = audit_inputs([5, 1, 4, 2, 3])
+        cmp = audit.SecretInteger(audit.Input(name="cmp", party=audit.Party(name="cmp_party")))
+        output, count = functions.filter_compact_nada_array(values, op, cmp, limit=3)
+
+        self.assertEqual(len(expected), count.value)
+        self.assertEqual(expected, sorted(v.value for v in output[:len(expected)]))
+        self.assertEqual(3, len(output))
+
+    def test_compact_invalid(self):
+
+        values, bits = audit_inputs([1, 2], [1, 0])
+        with self.assertRaises(ValueError):
+            functions.compact_nada_array(values, bits[:1])
+        with self.assertRaises(ValueError):
+            functions.compact_nada_array([], [])
+        with self.assertRaises(ValueError):
+            functions.filter_compact_nada_array(values, lambda x, y: x, values[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -103,11 +103,14 @@ class TestArrayFilter(unittest.TestCase):
         self.assertEqual(output, expected)
 
     @parameterized.expand([
-        ([1, 2, 3], 3),
-        ([3, 2, 1], 3),
-        ([4, 1, 3, 2, 5, 6, 5], 6)
+        ([1, 2, 3], True, 3),
+        ([3, 2, 1], True, 3),
+        ([4, 1, 3, 2, 5, 6, 5], True, 6),
+        ([1, 2, 3], False, 3),
+        ([3, 2, 1], False, 3),
+        ([4, 1, 3, 2, 5, 6, 5], False, 6)
     ])
-    def test_max(self, input_arr: List[int], expected: int):
+    def test_max(self, input_arr: List[int], tree: bool, expected: int):
 
         audit.Abstract.initialize(
             {f"p1_input_{i}": input_arr[i] for i in range(len(input_arr))}
@@ -115,15 +118,18 @@ class TestArrayFilter(unittest.TestCase):
 
         input_party = audit.Party(name="input_party")
         party_one_input = serialize_input_array(input_arr, input_party, "p1_input_")
-        output = audit.Output(functions.nada_max(party_one_input), "output", input_party).value.value
+        output = audit.Output(functions.nada_max(party_one_input, tree=tree), "output", input_party).value.value
         self.assertEqual(output, expected)
 
     @parameterized.expand([
-        ([1, 2, 3], 1),
-        ([3, 2, 1], 1),
-        ([4, 1, 3, 2, 5, 6, 5], 1)
+        ([1, 2, 3], True, 1),
+        ([3, 2, 1], True, 1),
+        ([4, 1, 3, 2, 5, 6, 5], True, 1),
+        ([1, 2, 3], False, 1),
+        ([3, 2, 1], False, 1),
+        ([4, 1, 3, 2, 5, 6, 5], False, 1)
     ])
-    def test_min(self, input_arr: List[int], expected: int):
+    def test_min(self, input_arr: List[int], tree: bool, expected: int):
 
         audit.Abstract.initialize(
             {f"p1_input_{i}": input_arr[i] for i in range(len(input_arr))}
@@ -131,7 +137,7 @@ class TestArrayFilter(unittest.TestCase):
 
         input_party = audit.Party(name="input_party")
         party_one_input = serialize_input_array(input_arr, input_party, "p1_input_")
-        output = audit.Output(functions.nada_min(party_one_input), "output", input_party).value.value
+        output = audit.Output(functions.nada_min(party_one_input, tree=tree), "output", input_party).value.value
         self.assertEqual(output, expected)
 
 
@@ -9,13 +9,17 @@ from nada_data.array import serialize_input_array
 class TestArraySort(unittest.TestCase):
 
     @parameterized.expand([
-        ([1, 2, 3], True, [1, 2, 3]),
-        ([1, 2, 3], False, [3, 2, 1]),
-        ([5, 6, 4, 1, 3, 2], True, [1, 2, 3, 4, 5, 6]),
-        ([5, 6, 4, 1, 3, 2], False, [6, 5, 4, 3, 2, 1]),
+        (input_arr, ascending, expected, algorithm)
+        for input_arr, ascending, expected in [
+            ([1, 2, 3], True, [1, 2, 3]),
+            ([1, 2, 3], False, [3, 2, 1]),
+            ([5, 6, 4, 1, 3, 2], True, [1, 2, 3, 4, 5, 6]),
+            ([5, 6, 4, 1, 3, 2], False, [6, 5, 4, 3, 2, 1]),
+        ]
+        for algorithm in ["odd_even", "bitonic", "optimal"]
     ])
     def test_sort(
-            self, input_arr: List[int], ascending: bool, expected: List[int]
+            self, input_arr: List[int], ascending: bool, expected: List[int], algorithm: str
     ):
 
         audit.Abstract.initialize(
@@ -29,11 +33,73 @@ class TestArraySort(unittest.TestCase):
             audit.Output(v, "output", party).value.value
             for v in functions.sort_nada_array(
                 party_one_input,
-                ascending=ascending
+                ascending=ascending,
+                algorithm=algorithm
             )
         ]
         self.assertEqual(output, expected)
 
+    @parameterized.expand([
+        ([5, 6, 4, 1, 3, 2, 9, 7, 8], True),
+        ([5, 6, 4, 1, 3, 2, 9, 7, 8], False)
+    ])
+    def test_sort_layered(self, input_arr: List[int], ascending: bool):
+
+        audit.Abstract.initialize(
+            {f"p1_input_{i}": input_arr[i] for i in range(len(input_arr))}
+        )
+
+        party = audit.Party(name="party")
+        party_one_input = serialize_input_array(input_arr, party, "p1_input_")
+        output = functions.sort_nada_array(party_one_input, ascending, layered=True)
+        self.assertEqual(
+            [v.value for v in output], sorted(input_arr, reverse=not ascending)
+        )
+
+    @parameterized.expand([
+        (4, 5),
+        (6, 12),
+        (8, 19),
+        (16, 63)
+    ])
+    def test_sort_comparison_count(self, n: int, expected_comparators: int):
+
+        input_arr = list(range(n, 0, -1))
+        audit.Abstract.initialize(
+            {f"p1_input_{i}": input_arr[i] for i in range(len(input_arr))}
+        )
+
+        party = audit.Party(name="party")
+        party_one_input = serialize_input_array(input_arr, party, "p1_input_")
+        output = functions.sort_nada_array(party_one_input)
+
+        # exactly one secure comparison (and one if_else) per comparator
+        self.assertEqual(audit.Abstract.analysis["cmp"], expected_comparators)
+        self.assertEqual(audit.Abstract.analysis["ife"], expected_comparators)
+        self.assertEqual([v.value for v in output], sorted(input_arr))
+
+    @parameterized.expand([
+        ([5, 6, 4, 1, 3, 2, 9, 7, 8], 1, True),
+        ([5, 6, 4, 1, 3, 2, 9, 7, 8], 3, True),
+        ([5, 6, 4, 1, 3, 2, 9, 7, 8], 3, False),
+        ([5, 6, 4, 1, 3, 2, 9, 7, 8], 9, True),
+        ([5, 6, 4, 1, 3, 2, 9, 7, 8], 12, False),
+        ([3, 3, 1, 2, 3], 2, True)
+    ])
+    def test_top_k(self, input_arr: List[int], k: int, largest: bool):
+
+        audit.Abstract.initialize(
+            {f"p1_input_{i}": input_arr[i] for i in range(len(input_arr))}
+        )
+
+        party = audit.Party(name="party")
+        party_one_input = serialize_input_array(input_arr, party, "p1_input_")
+        output = functions.top_k_nada_array(party_one_input, k, largest)
+        self.assertEqual(
+            [v.value for v in output], sorted(input_arr, reverse=largest)[:k]
+        )
+        self.assertEqual(len(party_one_input), len(input_arr))
+
 
 if __name__ == '__main__':
     unittest.main()
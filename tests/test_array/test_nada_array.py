@@ -1,9 +1,11 @@
+import gc
 import unittest
-from nada_dsl import audit
+import weakref
+from nada_dsl import audit, SecretInteger, Input, Party
 from parameterized import parameterized
 from typing import List, Dict
 from nada_data.utils import initialize_array_data, initialize_array_data_multi
-from nada_data import NadaArray
+from nada_data import NadaArray, sum_nada_array
 from nada_data.array import serialize_input_array
 
 
@@ -48,6 +50,113 @@ class TestNadaArray(unittest.TestCase):
         ]
         self.assertEqual(expected_str, str(sum(arrs, NadaArray())))
 
+    def test_copy(self):
+
+        input_values = [1, 2, 3]
+        initialize_array_data("p1_input_", input_values)
+        arr = serialize_input_array(input_values, audit.Party(name="party"), "p1_input_")
+        other = arr.copy()
+
+        self.assertTrue(all(a is b for a, b in zip(arr, other)))
+        other[0] = other[1]
+        other.append(other[2])
+        del arr[2]
+
+        self.assertEqual([v.value for v in arr], [1, 2])
+        self.assertEqual([v.value for v in other], [2, 2, 3, 3])
+        self.assertEqual(str(other), "NadaArray | len=4 | parties=['party']")
+
+    def test_parties_deep_graph(self):
+
+        parties = [Party(name=f"party_{i % 3}") for i in range(2000)]
+        values = [
+            SecretInteger(Input(name=f"input_{i}", party=parties[i])) for i in range(2000)
+        ]
+        # a left-to-right sum is deeper than the interpreter's recursion limit
+        total = sum_nada_array(values, tree=False)
+        arr = NadaArray(total, total - values[0])
+        self.assertEqual(arr.get_parties(), {"party_0", "party_1", "party_2"})
+
+    def test_parties_mutation(self):
+
+        values = [
+            SecretInteger(Input(name=f"input_{i}", party=Party(name=name)))
+            for i, name in enumerate(["one", "two", "one", "three"])
+        ]
+        arr = NadaArray(values)
+        self.assertEqual(str(arr), "NadaArray | len=4 | parties=['one','three','two']")
+
+        del arr[1]
+        self.assertEqual(str(arr), "NadaArray | len=3 | parties=['one','three']")
+        arr[2] = arr[0] + arr[1]
+        self.assertEqual(str(arr), "NadaArray | len=3 | parties=['one']")
+        arr.insert(0, values[1])
+        del arr[1:]
+        self.assertEqual(str(arr), "NadaArray | len=1 | parties=['two']")
+
+    def test_parties_released(self):
+
+        party = Party(name="party")
+        values = [SecretInteger(Input(name=f"input_{i}", party=party)) for i in range(100)]
+        arr = NadaArray([v + v for v in values])
+        self.assertEqual({"party"}, arr.get_parties())
+
+        # party sets are memoized on the nodes, so they do not keep the graph alive
+        nodes = [weakref.ref(v) for v in arr]
+        del arr
+        gc.collect()
+        self.assertTrue(all(node() is None for node in nodes))
+
+    def test_shared_parties(self):
+
+        one, two = Party(name="one"), Party(name="two")
+        rows = [
+            NadaArray([SecretInteger(Input(name=f"{p.name}_{i}", party=p)) for i in range(3)])
+            for p in [one, one, two]
+        ]
+
+        # arrays with the same parties share a single party set, and hold no counts
+        # until an element is removed or replaced by one with other parties
+        self.assertIs(rows[0].parties, rows[1].parties)
+        self.assertFalse(hasattr(rows[0], "__dict__"))
+        rows[0][0], rows[0][1] = rows[0][1], rows[0][0]
+        self.assertIsNone(rows[0]._party_counts)
+
+        rows[0][2] = rows[2][0]
+        self.assertEqual({"one", "two"}, rows[0].get_parties())
+        rows[0][0] = rows[2][1]
+        rows[0][1] = rows[2][0] + rows[2][1]
+        self.assertIs(rows[2].parties, rows[0].parties)
+        copy = rows[1].copy()
+        copy[1] = rows[2][0]
+        del copy[0], copy[1]
+        self.assertEqual("NadaArray | len=1 | parties=['two']", str(copy))
+        self.assertEqual("NadaArray | len=3 | parties=['one']", str(rows[1]))
+
+    def test_from_values(self):
+
+        one, two = Party(name="one"), Party(name="two")
+        values = [SecretInteger(Input(name=p.name, party=p)) for p in [one, two]]
+
+        # the list is adopted rather than copied, and its parties are gathered in one pass
+        arr = NadaArray.from_values(values)
+        self.assertIs(values, arr._data)
+        self.assertEqual({"one", "two"}, arr.get_parties())
+        self.assertIs(arr.parties, NadaArray(*values).parties)
+
+        # the set returned by get_parties can be modified without affecting the array
+        arr.get_parties().add("three")
+        self.assertEqual(frozenset({"one", "two"}), arr.parties)
+        self.assertEqual(values, list(NadaArray.from_values(iter(values), True)))
+        with self.assertRaises(TypeError):
+            NadaArray.from_values([values[0], 1])
+
+        # an iterable is only walked once
+        arr = NadaArray.from_values(values[:1])
+        arr.extend(v for v in values[1:])
+        self.assertEqual(values, list(arr))
+        self.assertEqual("NadaArray | len=2 | parties=['one','two']", str(arr))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+import doctest
+from typing import Callable, List
+from nada_dsl import audit
+from parameterized import parameterized
+from nada_data import cost, network
+from nada_data.array import functions as array_functions, serialize_input_array
+from nada_data.table import functions as table_functions, serialize_input_table
+from nada_data.utils import initialize_array_data, initialize_table_data
+
+
+def load_tests(loader, tests, ignore):
+    """
+    This is a special function that is recognized by unittest and can be used to add
+    additional tests to a test suite. In this case, we are adding the doctest tests
+    from the cost module to this test suite.
+    """
+    tests.addTests(doctest.DocTestSuite(cost))
+    return tests
+
+
+def audit_array(values: List[int]):
+    initialize_array_data("p1_input_", values)
+    party = audit.Party(name="party")
+    return serialize_input_array(values, party, "p1_input_")
+
+
+def audit_table(rows: List[List[int]]):
+    initialize_table_data("p1_input_", rows)
+    party = audit.Party(name="party")
+    return [list(row) for row in serialize_input_table(rows, party, "p1_input_")]
+
+
+def counts(func: Callable) -> dict:
+    audit.Abstract.initialize(audit.Abstract.context)
+    func()
+    return dict(audit.Abstract.analysis)
+
+
+def table(n: int, width: int) -> List[List[int]]:
+    return [[(3 * i + j) % 4 for j in range(width)] for i in range(n)]
+
+
+class TestCost(unittest.TestCase):
+
+    @parameterized.expand([(n,) for n in [1, 2, 7, 16]])
+    def test_array(self, n: int):
+
+        values = [(5 * i) % 7 for i in range(n)]
+        a = audit_array(values)
+
+        self.assertEqual(
+            cost.sum_nada_array(n).counts(), counts(lambda: array_functions.sum_nada_array(a))
+        )
+        self.assertEqual(cost.nada_max(n).counts(), counts(lambda: array_functions.nada_max(a)))
+        self.assertEqual(
+            cost.nada_min(n, tree=False).counts(),
+            counts(lambda: array_functions.nada_min(a, tree=False))
+        )
+        self.assertEqual(
+            cost.filter_nada_array(n, "==").counts(),
+            counts(lambda: array_functions.filter_nada_array(a, array_functions.nada_eq, a[0]))
+        )
+        self.assertEqual(
+            cost.sort_nada_array(n).counts(),
+            counts(lambda: array_functions.sort_nada_array(list(a)))
+        )
+        self.assertEqual(
+            cost.filter_compact_nada_array(n, "<", 2).counts(),
+            counts(lambda: array_functions.filter_compact_nada_array(
+                a, array_functions.nada_lt, a[0], 2
+            ))
+        )
+
+    @parameterized.expand([(n, width) for n in [1, 5, 12] for width in [4, 5]])
+    def test_table(self, n: int, width: int):
+
+        rows = table(n, width)
+        for keys in [1, 2]:
+            self.assertEqual(
+                cost.odd_even_sort(n, width, keys).counts(),
+                counts(lambda: table_functions.odd_even_sort(audit_table(rows), list(range(keys)), False))
+            )
+            self.assertEqual(
+                cost.top_k(n, width, 3, keys).counts(),
+                counts(lambda: table_functions.top_k(audit_table(rows), list(range(keys)), 3))
+            )
+            for method in ["shift", "scan"]:
+                aggs = {keys: "max", keys + 1: "count_distinct"}
+                self.assertEqual(
+                    cost.aggregate(n, width, list(aggs.values()), keys, method).counts(),
+                    counts(lambda: table_functions.aggregate(
+                        audit_table(rows), list(range(keys)), aggs, method
+                    ))
+                )
+        self.assertEqual(
+            cost.odd_even_sort(n, width, swap="select").counts(),
+            counts(lambda: table_functions.odd_even_sort(audit_table(rows), 0, True, swap="select"))
+        )
+        self.assertEqual(
+            cost.where(n, ["<", "!="]).counts(),
+            counts(lambda: table_functions.where(audit_table(rows), [(0, "<", 2), (1, "!=", 0)]))
+        )
+
+    @parameterized.expand([("shift",), ("scan",)])
+    def test_join(self, method: str):
+
+        primary = [[i, i % 3, 2 * i] for i in range(6)]
+        foreign = table(5, 2)
+        initialize_table_data("p1_input_", primary + foreign)
+        party = audit.Party(name="party")
+        rows = [list(row) for row in serialize_input_table(primary + foreign, party, "p1_input_")]
+
+        self.assertEqual(
+            cost.join(6, 5, 3, 2, 1, method).counts(),
+            counts(lambda: table_functions.join(rows[:6], rows[6:], 0, 0, method))
+        )
+        self.assertEqual(
+            cost.join(0, 5, 3, 2, 1, method).counts(),
+            counts(lambda: table_functions.join([], rows[6:], 0, 0, method, primary_width=3))
+        )
+
+    def test_depth(self):
+
+        self.assertEqual(2 * network.SortingNetwork(16).depth, cost.sort_nada_array(16).depth)
+        self.assertEqual(3 * network.SortingNetwork(16).depth, cost.odd_even_sort(16, 4).depth)
+        self.assertLess(
+            cost.aggregate(64, 2, ["sum"], method="scan").depth,
+            cost.aggregate(64, 2, ["sum"], method="shift").depth
+        )
+        self.assertEqual(cost.sum_nada_array(8) + cost.nada_max(8), cost.nada_max(8) + cost.sum_nada_array(8))
+
+        with self.assertRaises(ValueError):
+            cost.aggregate(4, 2, ["median"])
+        with self.assertRaises(ValueError):
+            cost.odd_even_sort(4, 2, 2, swap="select")
+        with self.assertRaises(ValueError):
+            cost.Cost(div=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import doctest
+import json
+from nada_dsl import audit, operations, SecretInteger, Input, Party
+from nada_data import NadaArray, instrument
+from nada_data.array import functions as array_functions, serialize_input_array
+from nada_data.table import NadaTable
+from nada_data.utils import initialize_array_data
+
+
+def load_tests(loader, tests, ignore):
+    """
+    This is a special function that is recognized by unittest and can be used to add
+    additional tests to a test suite. In this case, we are adding the doctest tests
+    from the instrument module to this test suite.
+    """
+    tests.addTests(doctest.DocTestSuite(instrument))
+    return tests
+
+
+def graph_rows(n: int, width: int):
+    party = Party(name="party")
+    return [
+        NadaArray([SecretInteger(Input(name=f"input_{i}_{j}", party=party)) for j in range(width)])
+        for i in range(n)
+    ]
+
+
+class TestInstrument(unittest.TestCase):
+
+    def test_graph(self):
+
+        nt = NadaTable("a", "b", "c", rows=graph_rows(4, 3))
+        init = operations.BinaryOperation.__init__
+
+        with instrument.profile() as profiler:
+            self.assertIsNot(init, operations.BinaryOperation.__init__)
+            nt.where("b", "<", 3).sort_by("a", True)
+        self.assertIs(init, operations.BinaryOperation.__init__)
+
+        names = [(r.name.rsplit(".", 1)[-1], r.depth) for r in profiler.records]
+        self.assertEqual([("sort_by", 0), ("get_valid", 1), ("where", 2), ("odd_even_sort", 1)], names)
+
+        sort_by, get_valid, where, odd_even_sort = profiler.records
+        self.assertEqual({"<": 4, "if_else": 4}, where.ops)
+        self.assertEqual(get_valid.ops, where.ops)
+        # 5 comparators of rows with two keys and four columns
+        self.assertEqual({"<": 10, "==": 5, "if_else": 15, "*": 20, "+": 20, "-": 40}, odd_even_sort.ops)
+        self.assertLess(odd_even_sort.nodes + where.nodes, sort_by.nodes + 1)
+        self.assertGreater(sort_by.seconds, 0)
+
+        report = json.loads(profiler.to_json())
+        self.assertEqual(4, len(report["calls"]))
+        self.assertEqual(1, report["totals"][sort_by.name]["calls"])
+
+        # nothing is recorded outside of a profile
+        nt.sort_by("a", True)
+        self.assertEqual(4, len(profiler))
+
+    def test_audit(self):
+
+        values = [5, 2, 7, 1, 3]
+        initialize_array_data("p1_input_", values)
+        party = audit.Party(name="party")
+        array = serialize_input_array(values, party, "p1_input_")
+
+        with instrument.profile() as outer:
+            with instrument.profile() as inner:
+                array_functions.sort_nada_array(list(array))
+            array_functions.nada_max(array)
+
+        self.assertEqual(1, len(inner))
+        self.assertEqual(2, len(outer))
+        self.assertEqual({"<": 9, "if_else": 9, "+": 9}, inner.records[0].ops)
+        self.assertEqual({"<": 4, "if_else": 4}, outer.totals()[outer.records[1].name]["ops"])
+
+
+if __name__ == "__main__":
+    unittest.main()
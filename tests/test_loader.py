@@ -0,0 +1,183 @@
+import unittest
+import doctest
+import os
+import tempfile
+import importlib.util
+import numpy as np
+from nada_dsl import audit
+from nada_data import loader, serialize_input_table, sum_nada_array
+from nada_data.utils import initialize_table_data, initialize_table_data_multi
+
+
+def load_tests(loader_, tests, ignore):
+    """
+    This is a special function that is recognized by unittest and can be used to add
+    additional tests to a test suite. In this case, we are adding the doctest tests
+    from the loader module to this test suite.
+    """
+    tests.addTests(doctest.DocTestSuite(loader))
+    return tests
+
+
+ROWS = [[3, 10, 7], [1, 20, 8], [3, 30, 9], [2, 40, 1]]
+
+
+def _values(rows) -> list:
+    return [[v.value for v in row] for row in rows]
+
+
+class TestLoader(unittest.TestCase):
+
+    def test_input_context(self):
+
+        initialize_table_data_multi({"p1": ROWS, "p2": [[5, 6]]})
+        expected = dict(audit.Abstract.context)
+        context = loader.InputContext({"p1_": np.array(ROWS), "p2_": [[5, 6]]})
+        self.assertEqual(expected, dict(context))
+        self.assertEqual(len(expected), len(context))
+        for name in ["p1_4_0", "p1_0_3", "p1_01_0", "p1_0", "p1_1_1_1", "p3_0_0", 7]:
+            self.assertNotIn(name, context)
+            self.assertIsNone(context.get(name))
+        with self.assertRaises(KeyError):
+            context["p1_0_-1"]  # pylint: disable=pointless-statement
+
+        # a prefix that starts another one does not hide it
+        context = loader.InputContext({"a": [[1, 2], [3, 4]], "a1_": [5, 6]})
+        self.assertEqual([5, 6, 2], [context["a1_0"], context["a1_1"], context["a0_1"]])
+        self.assertIsNone(context.get("a1_2"))
+
+        with self.assertRaises(TypeError):
+            loader.InputContext({"p": [[0.5]]})
+        with self.assertRaises(ValueError):
+            loader.InputContext({"p": [[[1]]]})
+
+    def test_input_rows(self):
+
+        initialize_table_data("p1_input_", ROWS)
+        party = audit.Party(name="party")
+        expected = serialize_input_table(ROWS, party, "p1_input_")
+
+        loader.bind_table_data("p1_input_", np.array(ROWS))
+        party = audit.Party(name="party")
+        rows = list(loader.input_rows(np.array(ROWS), party, "p1_input_"))
+        self.assertEqual(_values(expected), _values(rows))
+        self.assertEqual(
+            [[v.input.name for v in row] for row in expected],
+            [[v.input.name for v in row] for row in rows]
+        )
+        self.assertEqual(
+            ROWS[1:3], _values(loader.input_rows(np.array(ROWS), party, "p1_input_", 1, 3))
+        )
+        self.assertEqual(8 + 9, sum_nada_array([rows[1][2], rows[2][2]]).value)
+
+    def test_load_table(self):
+
+        with tempfile.TemporaryDirectory() as directory:
+            npy = os.path.join(directory, "rows.npy")
+            np.save(npy, np.array(ROWS))
+            csv = os.path.join(directory, "rows.csv")
+            with open(csv, "w", encoding="utf-8") as f:
+                f.write("a, b, c\n" + "\n".join(",".join(map(str, row)) for row in ROWS) + "\n")
+            headless = os.path.join(directory, "headless.csv")
+            with open(headless, "w", encoding="utf-8") as f:
+                f.write("\n".join(",".join(map(str, row)) for row in ROWS))
+
+            nt = loader.load_table(csv, "party")
+            self.assertEqual(["a", "b", "c"], nt.columns)
+            self.assertEqual(ROWS, _values(nt))
+            self.assertEqual({"party"}, nt.get_parties())
+            for source in [npy, headless, np.array(ROWS)]:
+                nt = loader.load_table(source, "party", prefix="p_", columns=["x", "y", "z"])
+                self.assertEqual(ROWS, _values(nt))
+            self.assertEqual(100, sum_nada_array([row[1] for row in nt]).value)
+
+            with self.assertRaises(ValueError):
+                loader.load_table(npy, "party")
+            with self.assertRaises(ValueError):
+                loader.load_table(csv, "party", columns=["a", "b"])
+            with self.assertRaises(ValueError):
+                loader.load_table(os.path.join(directory, "rows.txt"), "party", columns=["a"])
+            with self.assertRaises(ValueError):
+                loader.load_table(np.array([1, 2]), "party", columns=["a"])
+
+    def test_stream_table(self):
+
+        initialize_table_data("input_", ROWS)
+        expected = dict(audit.Abstract.context)
+        self.assertEqual(expected, loader.input_bindings(np.array(ROWS), "input_"))
+        self.assertEqual(
+            {k: v for k, v in expected.items() if k.startswith(("input_1_", "input_2_"))},
+            loader.input_bindings(np.array(ROWS), "input_", 1, 3)
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            npy = os.path.join(directory, "rows.npy")
+            np.save(npy, np.array(ROWS))
+            values, header = loader.read_table(npy)
+            self.assertIsInstance(values, np.memmap)
+            self.assertIsNone(header)
+            self.assertNotIsInstance(loader.read_table(npy, mmap=False)[0], np.memmap)
+
+            chunks = list(loader.stream_table(npy, "party", chunk_rows=3))
+            self.assertEqual([3, 1], [len(chunk) for chunk in chunks])
+            self.assertEqual(ROWS, _values(chunks[0] + chunks[1]))
+            self.assertEqual({"party"}, chunks[1][0].get_parties())
+            del values, chunks
+            audit.Abstract.initialize()
+
+        with self.assertRaises(ValueError):
+            next(loader.stream_table(np.array(ROWS), "party", chunk_rows=0))
+
+    def test_columns(self):
+
+        columns = loader.Columns([np.array(column) for column in zip(*ROWS)])
+        self.assertEqual((4, 3), columns.shape)
+        self.assertEqual(ROWS[1:3], columns[1:3].tolist())
+        self.assertEqual(
+            loader.input_bindings(np.array(ROWS), "p_"), loader.input_bindings(columns, "p_")
+        )
+        loader.bind_table_data("p_", columns)
+        self.assertEqual(ROWS, _values(loader.input_rows(columns, audit.Party(name="party"), "p_")))
+
+        with self.assertRaises(ValueError):
+            loader.Columns([np.array([1, 2]), np.array([3])])
+        with self.assertRaises(ValueError):
+            loader.Columns([])
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "requires pyarrow")
+    def test_arrow(self):
+
+        # pylint: disable=import-outside-toplevel
+        import pyarrow
+        from pyarrow import feather, parquet
+
+        table = pyarrow.table({name: list(column) for name, column in zip("abc", zip(*ROWS))})
+        with tempfile.TemporaryDirectory() as directory:
+            for extension in [".parquet", ".arrow", ".feather"]:
+                path = os.path.join(directory, f"rows{extension}")
+                if extension == ".parquet":
+                    parquet.write_table(table, path)
+                else:
+                    feather.write_feather(table, path)
+                nt = loader.load_table(path, "party")
+                self.assertEqual(["a", "b", "c"], nt.columns)
+                self.assertEqual(ROWS, _values(nt))
+                chunks = list(loader.stream_table(path, "party", chunk_rows=3))
+                self.assertEqual([3, 1], [len(chunk) for chunk in chunks])
+                self.assertEqual(ROWS, _values(chunks[0] + chunks[1]))
+
+            # Parquet files are decoded in batches, which may span several row groups, and
+            # the rows of earlier batches stay bound
+            path = os.path.join(directory, "groups.parquet")
+            parquet.write_table(table, path, row_group_size=3)
+            chunks = list(loader.stream_table(path, "party", chunk_rows=2))
+            self.assertEqual(ROWS, _values(chunks[0] + chunks[1]))
+            expected = loader.input_bindings(np.array(ROWS), "input_")
+            self.assertEqual(expected, {name: audit.Abstract.context[name] for name in expected})
+            loader.bind_table_data("input_", np.array(ROWS))
+            chunks = list(loader.stream_table(path, "party", chunk_rows=2, bind=False))
+            self.assertEqual(ROWS, _values(chunks[0] + chunks[1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
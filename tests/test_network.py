@@ -0,0 +1,118 @@
+import unittest
+import doctest
+import itertools
+from parameterized import parameterized
+from nada_data import network
+from nada_data.network import SortingNetwork, SelectionNetwork
+
+
+def load_tests(loader, tests, ignore):
+    """
+    This is a special function that is recognized by unittest and can be used to add
+    additional tests to a test suite. In this case, we are adding the doctest tests
+    from the network module to this test suite.
+    """
+    tests.addTests(doctest.DocTestSuite(network))
+    return tests
+
+
+class TestSortingNetwork(unittest.TestCase):
+
+    @parameterized.expand([
+        (algorithm, n)
+        for algorithm in ["odd_even", "bitonic", "optimal"]
+        for n in range(1, 13)
+    ])
+    def test_sorts_all_binary_inputs(self, algorithm: str, n: int):
+
+        # by the 0-1 principle, sorting every binary input implies sorting every input
+        for bits in itertools.product([0, 1], repeat=n):
+            values = list(bits)
+            for i, j in SortingNetwork(n, algorithm):
+                self.assertLess(i, j)
+                if values[i] > values[j]:
+                    values[i], values[j] = values[j], values[i]
+            self.assertEqual(values, sorted(bits))
+
+    @parameterized.expand([
+        (1, 0), (2, 1), (3, 3), (4, 5), (5, 9), (6, 12), (7, 16), (8, 19),
+        (9, 25), (10, 29), (11, 35), (12, 39)
+    ])
+    def test_optimal_size(self, n: int, expected: int):
+        self.assertEqual(len(SortingNetwork(n, "optimal")), expected)
+
+    @parameterized.expand([
+        (algorithm, n)
+        for algorithm in ["odd_even", "bitonic", "optimal"]
+        for n in [2, 5, 8, 12]
+    ])
+    def test_layers(self, algorithm: str, n: int):
+
+        net = SortingNetwork(n, algorithm)
+        layered = list(net.schedule(layered=True))
+        self.assertEqual(sorted(layered), sorted(net.comparators))
+        self.assertEqual(net.depth, len(net.layers))
+
+        for layer in net.layers:
+            indices = [idx for c in layer for idx in c]
+            self.assertEqual(len(indices), len(set(indices)))
+
+        # reordering must not change the data flow: with tied keys, the payload that
+        # ends up at each index depends on the exact order of dependent comparators
+        def apply(schedule, rows):
+            rows = list(rows)
+            for i, j in schedule:
+                if not rows[i][0] < rows[j][0]:
+                    rows[i], rows[j] = rows[j], rows[i]
+            return rows
+
+        rows = [((k * 7) % 3, k) for k in range(n)]
+        self.assertEqual(apply(layered, rows), apply(net.comparators, rows))
+
+    @parameterized.expand([
+        ("odd_even", 8, 6), ("bitonic", 8, 6), ("optimal", 8, 6),
+        ("odd_even", 16, 10), ("bitonic", 16, 10), ("optimal", 10, 8)
+    ])
+    def test_depth(self, algorithm: str, n: int, expected: int):
+        self.assertEqual(SortingNetwork(n, algorithm).depth, expected)
+
+    def test_cached(self):
+        self.assertIs(
+            SortingNetwork(37, "bitonic").comparators,
+            SortingNetwork(37, "bitonic").comparators
+        )
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            SortingNetwork(4, "unknown")
+        with self.assertRaises(ValueError):
+            SortingNetwork(13, "optimal")
+
+
+class TestSelectionNetwork(unittest.TestCase):
+
+    @parameterized.expand([
+        (n, k) for n in range(1, 12) for k in range(1, n + 2)
+    ])
+    def test_selects_all_binary_inputs(self, n: int, k: int):
+
+        for bits in itertools.product([0, 1], repeat=n):
+            values = list(bits)
+            for i, j in SelectionNetwork(n, k):
+                if values[i] > values[j]:
+                    values[i], values[j] = values[j], values[i]
+            self.assertEqual(values[:k], sorted(bits)[:k])
+
+    @parameterized.expand([
+        (64, 1), (64, 4), (1024, 8), (1000, 10)
+    ])
+    def test_fewer_comparators(self, n: int, k: int):
+        self.assertLess(len(SelectionNetwork(n, k)), len(SortingNetwork(n)) / 2)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            SelectionNetwork(4, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+import unittest
+from typing import Callable
+import numpy as np
+from nada_dsl import audit
+from parameterized import parameterized
+from nada_data import simulation
+from nada_data.array import functions as array_functions, serialize_input_array
+from nada_data.table import functions as table_functions, serialize_input_table
+from nada_data.utils import initialize_array_data, initialize_table_data
+
+
+def audit_array(values: np.ndarray):
+    initialize_array_data("p1_input_", values.tolist())
+    party = audit.Party(name="party")
+    return serialize_input_array(values.tolist(), party, "p1_input_")
+
+
+def audit_table(values: np.ndarray):
+    initialize_table_data("p1_input_", values.tolist())
+    party = audit.Party(name="party")
+    return serialize_input_table(values.tolist(), party, "p1_input_")
+
+
+def table_values(rows) -> list:
+    return [[v.value for v in row] for row in rows]
+
+
+class TestSimulation(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(7)
+
+    @parameterized.expand([(n,) for n in [1, 2, 7, 33]])
+    def test_reductions(self, n: int):
+
+        values = self.rng.integers(-50, 50, n)
+        self.assertEqual(
+            simulation.sum_nada_array(values),
+            array_functions.sum_nada_array(audit_array(values)).value
+        )
+        self.assertEqual(
+            simulation.nada_max(values), array_functions.nada_max(audit_array(values)).value
+        )
+        self.assertEqual(
+            simulation.nada_min(values), array_functions.nada_min(audit_array(values)).value
+        )
+
+    @parameterized.expand([
+        (array_functions.nada_lt,), (array_functions.nada_lteq,), (array_functions.nada_gt,),
+        (array_functions.nada_gteq,), (array_functions.nada_eq,)
+    ])
+    def test_filter(self, op: Callable):
+
+        values = self.rng.integers(0, 10, 20)
+        audit.Abstract.initialize(
+            {f"p1_input_{i}": int(v) for i, v in enumerate(values)} | {"cmp": 5}
+        )
+        cmp = audit.SecretInteger(audit.Input(name="cmp", party=audit.Party(name="cmp_party")))
+        arr = serialize_input_array(values.tolist(), audit.Party(name="party"), "p1_input_")
+
+        self.assertEqual(
+            simulation.filter_nada_array(values, op, 5).tolist(),
+            [v.value for v in array_functions.filter_nada_array(arr, op, cmp)]
+        )
+
+    @parameterized.expand([
+        (n, ascending, algorithm)
+        for n in [5, 16, 45]
+        for ascending in [True, False]
+        for algorithm in ["odd_even", "bitonic"]
+    ])
+    def test_sort(self, n: int, ascending: bool, algorithm: str):
+
+        values = self.rng.integers(0, 10, n)
+        expected = [
+            v.value for v in
+            array_functions.sort_nada_array(audit_array(values), ascending, algorithm)
+        ]
+        self.assertEqual(
+            simulation.sort_nada_array(values, ascending, algorithm).tolist(), expected
+        )
+
+    @parameterized.expand([(45, 4, True), (45, 4, False), (10, 12, True)])
+    def test_top_k(self, n: int, k: int, largest: bool):
+
+        values = self.rng.integers(0, 10, n)
+        expected = [
+            v.value for v in array_functions.top_k_nada_array(audit_array(values), k, largest)
+        ]
+        self.assertEqual(simulation.top_k_nada_array(values, k, largest).tolist(), expected)
+
+    @parameterized.expand([
+        (n, ascending) for n in [6, 16, 37] for ascending in [True, False]
+    ])
+    def test_table_sort(self, n: int, ascending: bool):
+
+        # few distinct keys, so that payload order depends on tie-breaking
+        values = np.column_stack([self.rng.integers(0, 4, n), np.arange(n), np.arange(n) * 3])
+        rows = audit_table(values)
+        table_functions.odd_even_sort(rows, 0, ascending)
+        simulation.odd_even_sort(values, 0, ascending)
+        self.assertEqual(values.tolist(), table_values(rows))
+
+    def test_table_top_k(self):
+
+        values = np.column_stack([self.rng.integers(0, 4, 30), np.arange(30)])
+        rows = audit_table(values)
+        self.assertEqual(
+            simulation.top_k(values, 0, 5).tolist(),
+            table_values(table_functions.top_k(rows, 0, 5))
+        )
+
+    @parameterized.expand([
+        (agg, n)
+        for agg in ["aggregate_sum", "aggregate_max", "aggregate_min"]
+        for n in [1, 9, 40]
+    ])
+    def test_aggregate(self, agg: str, n: int):
+
+        values = np.column_stack([self.rng.integers(0, 5, n), self.rng.integers(-20, 20, n)])
+        rows = audit_table(values)
+        getattr(table_functions, agg)(rows, 0, 1)
+        getattr(simulation, agg)(values, 0, 1)
+        self.assertEqual(values.tolist(), table_values(rows))
+
+    def test_multi_aggregate(self):
+
+        values = np.column_stack([
+            self.rng.integers(0, 5, 20), self.rng.integers(-20, 20, 20),
+            self.rng.integers(-20, 20, 20), self.rng.integers(-20, 20, 20)
+        ])
+        aggs = {1: "sum", 2: "count_distinct", 3: "count"}
+        values[:, 2] %= 4
+        rows = audit_table(values)
+        table_functions.aggregate(rows, 0, aggs)
+        simulation.aggregate(values, 0, aggs)
+        self.assertEqual(values.tolist(), table_values(rows))
+
+        aggs = {1: "sum", 2: "max", 3: "min"}
+        rows = audit_table(values)
+        table_functions.aggregate(rows, 0, aggs)
+        simulation.aggregate(values, 0, aggs)
+        self.assertEqual(values.tolist(), table_values(rows))
+
+    @parameterized.expand([(None,), (5,)])
+    def test_compact(self, limit: int):
+
+        values = self.rng.integers(-20, 20, 13)
+        keep = self.rng.integers(0, 2, 13)
+        if limit is not None:
+            keep[np.cumsum(keep) > limit] = 0
+        output, count = array_functions.compact_nada_array(audit_array(values), audit_array(keep), limit)
+        expected, expected_count = simulation.compact_nada_array(values, keep, limit)
+        self.assertEqual(expected.tolist(), [v.value for v in output])
+        self.assertEqual(expected_count, count.value)
+
+    @parameterized.expand([(True,), (False,)])
+    def test_multi_key(self, ascending: bool):
+
+        values = np.column_stack([
+            self.rng.integers(0, 3, 13), self.rng.integers(0, 3, 13), self.rng.integers(-9, 9, 13)
+        ])
+        rows = audit_table(values)
+        table_functions.odd_even_sort(rows, [0, 1], ascending)
+        simulation.odd_even_sort(values, [0, 1], ascending)
+        self.assertEqual(values.tolist(), table_values(rows))
+
+        table_functions.aggregate(rows, [0, 1], {2: "sum"})
+        simulation.aggregate(values, [0, 1], {2: "sum"})
+        self.assertEqual(values.tolist(), table_values(rows))
+
+
+if __name__ == '__main__':
+    unittest.main()
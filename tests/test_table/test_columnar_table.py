@@ -0,0 +1,205 @@
+import unittest
+import doctest
+from typing import List
+from nada_dsl import audit
+from parameterized import parameterized
+from nada_data.table import columnar_table, ColumnarNadaTable, NadaTable, serialize_input_table
+from nada_data import NadaArray
+from nada_data.utils import initialize_table_data
+
+
+def load_tests(loader, tests, ignore):
+    """
+    This is a special function that is recognized by unittest and can be used to add
+    additional tests to a test suite. In this case, we are adding the doctest tests
+    from the columnar_table module to this test suite.
+    """
+    tests.addTests(doctest.DocTestSuite(columnar_table))
+    return tests
+
+
+ROWS = [[3, 10, 7], [1, 20, 8], [3, 30, 9], [2, 40, 1], [1, 50, 2]]
+
+
+def _tables(input_rows: List[List[int]]):
+    initialize_table_data("p1_input_", input_rows)
+    party = audit.Party(name="party")
+    nt = NadaTable("a", "b", "c", rows=serialize_input_table(input_rows, party, "p1_input_"))
+    return nt, ColumnarNadaTable.from_rows(nt)
+
+
+def _values(table) -> List[List[int]]:
+    party = audit.Party(name="party")
+    return [[audit.Output(v, "output", party).value.value for v in row] for row in table.get_data()]
+
+
+class TestColumnarNadaTable(unittest.TestCase):
+
+    def test_create(self):
+
+        _, ct = _tables(ROWS)
+        self.assertEqual(
+            "ColumnarNadaTable | cols=['a','b','c'] | rows=5 | parties=['party']", str(ct)
+        )
+        self.assertEqual(ROWS, _values(ct))
+        self.assertEqual([[10], [20], [30], [40], [50]], _values(ct.select("b")))
+
+    def test_invalid_columns(self):
+
+        _, ct = _tables(ROWS)
+        with self.assertRaises(ValueError):
+            ColumnarNadaTable("a", "b", cols=[ct.get_column("a")])
+        with self.assertRaises(ValueError):
+            ColumnarNadaTable("a", "b", cols=[ct.get_column("a"), NadaArray(ct.get_column("b")[:2])])
+        with self.assertRaises(TypeError):
+            ColumnarNadaTable("a", cols=[list(ct.get_column("a"))])
+
+    def test_round_trip(self):
+
+        nt, ct = _tables(ROWS)
+        self.assertEqual(nt.columns, ct.to_rows().columns)
+        self.assertEqual(_values(nt), _values(ct.to_rows()))
+
+    def test_select_reuses_columns(self):
+
+        nt, ct = _tables(ROWS)
+        selected = ct.select("c", "a")
+
+        self.assertEqual(_values(nt.select("c", "a")), _values(selected))
+        for name in ["c", "a"]:
+            for x, y in zip(ct.get_column(name), selected.get_column(name)):
+                self.assertIs(x, y)
+
+    def test_concat(self):
+
+        nt, ct = _tables(ROWS)
+        self.assertEqual(_values(nt.concat(nt)), _values(ct.concat(ct)))
+        with self.assertRaises(ValueError):
+            ct.concat(ct.select("a", "b"))
+
+    def test_mutation(self):
+
+        nt, ct = _tables(ROWS)
+        for table in [nt, ct]:
+            table.append(table[0])
+            table.insert(1, table[4])
+            table[2] = table[3]
+            del table[0]
+            table.extend([table[1]])
+        self.assertEqual(_values(nt), _values(ct))
+        self.assertEqual(["x", "y", "z"], ct.rename("x", "y", "z").columns)
+        self.assertEqual(_values(ct), _values(ct.rename("x", "y", "z")))
+        with self.assertRaises(ValueError):
+            ct.append(NadaArray(ct[0][:2]))
+        with self.assertRaises(ValueError):
+            ct.rename("x")
+
+    def test_row_by_row(self):
+
+        nt, _ = _tables(ROWS)
+        ct = ColumnarNadaTable("a", "b", "c")
+        for row in nt:
+            ct.append(row)
+        self.assertEqual(5, len(ct))
+        self.assertEqual(ROWS, _values(ct))
+        ct.insert(0, nt[4])
+        ct.extend([nt[0], nt[1]])
+        self.assertEqual(ROWS[4:] + ROWS + ROWS[:2], _values(ct))
+
+    def test_columns_copied(self):
+
+        nt, ct = _tables(ROWS)
+        cols = [ct.get_column(c) for c in ct.columns]
+        other = ColumnarNadaTable("a", "b", "c", cols=cols)
+
+        # neither the arrays given to the table nor those returned by it are its own
+        other.append(nt[0])
+        other[0] = nt[1]
+        ct.get_column("a").append(nt[0][0])
+        self.assertEqual([5, 5, 5], [len(col) for col in cols])
+        self.assertEqual(ROWS, _values(ct))
+        self.assertEqual([ROWS[1]] + ROWS[1:] + [ROWS[0]], _values(other))
+
+    def test_empty(self):
+
+        empty = ColumnarNadaTable("a", "b", cols=[NadaArray(), NadaArray()])
+        self.assertEqual(0, len(empty.sort_by("a", True)))
+        self.assertEqual(0, len(empty.top_k("a", 1)))
+        self.assertEqual(0, len(empty.aggregate_sum("a", "b")))
+
+    @parameterized.expand([("a", True), ("b", False), ("c", True)])
+    def test_sort_by(self, key_col: str, ascending: bool):
+
+        nt, ct = _tables(ROWS)
+        for layered in [False, True]:
+            self.assertEqual(
+                _values(nt.sort_by(key_col, ascending, layered=layered)),
+                _values(ct.sort_by(key_col, ascending, layered=layered))
+            )
+        # the source table is left unchanged
+        self.assertEqual(ROWS, _values(ct))
+
+    def test_multi_key(self):
+
+        nt, ct = _tables(ROWS)
+        self.assertEqual(
+            _values(nt.sort_by(["a", "c"], True)), _values(ct.sort_by(["a", "c"], True))
+        )
+        self.assertEqual(
+            _values(nt.aggregate(["a", "c"], {"b": "max"})),
+            _values(ct.aggregate(["a", "c"], {"b": "max"}))
+        )
+
+    def test_join(self):
+
+        nt, ct = _tables(ROWS)
+        self.assertEqual(
+            _values(nt.select("c", "b").join(nt.select("a", "c"), "c", method="scan")),
+            _values(ct.select("c", "b").join(ct.select("a", "c"), "c", method="scan"))
+        )
+
+    @parameterized.expand([(1, True), (3, False)])
+    def test_top_k(self, k: int, largest: bool):
+
+        nt, ct = _tables(ROWS)
+        self.assertEqual(_values(nt.top_k("b", k, largest)), _values(ct.top_k("b", k, largest)))
+
+    @parameterized.expand([("aggregate_sum",), ("aggregate_max",), ("aggregate_min",)])
+    def test_aggregate(self, agg: str):
+
+        nt, ct = _tables(ROWS)
+        expected = getattr(nt, agg)("a", "c")
+        for method in ["shift", "scan"]:
+            output = getattr(ct, agg)("a", "c", method=method)
+
+            self.assertEqual(expected.columns, output.columns)
+            self.assertEqual(_values(expected), _values(output))
+        with self.assertRaises(ValueError):
+            getattr(ct, agg)("a", "a")
+
+    def test_aggregate_multi(self):
+
+        nt, ct = _tables(ROWS)
+        aggs = {"c": "avg", "b": "count_distinct"}
+        for method in ["shift", "scan"]:
+            self.assertEqual(
+                _values(nt.aggregate("a", aggs, method)), _values(ct.aggregate("a", aggs, method))
+            )
+
+    def test_aggregate_touches_two_columns(self):
+
+        _, ct = _tables(ROWS)
+        audit.Abstract.initialize({})
+        ct.aggregate_sum("a", "c")
+        two_columns = dict(audit.Abstract.analysis)
+
+        wide = ColumnarNadaTable(
+            "a", "c", "b", cols=[ct.get_column("a"), ct.get_column("c"), ct.get_column("b")]
+        )
+        audit.Abstract.initialize({})
+        wide.aggregate_sum("a", "c")
+        self.assertEqual(two_columns, dict(audit.Abstract.analysis))
+
+
+if __name__ == "__main__":
+    unittest.main()
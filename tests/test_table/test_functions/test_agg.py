@@ -1,7 +1,9 @@
 import unittest
+import random
 from typing import List, Callable
 from nada_dsl import audit
 from parameterized import parameterized
+from nada_data import SortingNetwork
 from nada_data.table import functions, serialize_input_table
 from nada_data.utils import initialize_table_data
 
@@ -17,17 +19,29 @@ class TestTableAgg(unittest.TestCase):
             expected: List[List[int]]
     ):
 
+        for method in ["shift", "scan"]:
+            self.assertEqual(
+                self.aggregate(input_rows, key_col, agg_col, agg_func, method), expected
+            )
+
+    @staticmethod
+    def aggregate(
+            input_rows: List[List[int]],
+            key_col: int,
+            agg_col: int,
+            agg_func: Callable,
+            method: str
+    ) -> List[List[int]]:
+
         initialize_table_data("p1_input_", input_rows)
         party = audit.Party(name="party")
         data = serialize_input_table(input_rows, party, "p1_input_")
-        agg_func(data, key_col, agg_col)
-        output = [
+        agg_func(data, key_col, agg_col, method=method)
+        return [
             [audit.Output(v, "output", party).value.value for v in data[i]]
             for i in range(len(data))
         ]
 
-        self.assertEqual(output, expected)
-
     @parameterized.expand([
         (
                 [[1, 2], [3, 4], [1, 3], [3, 3]],
@@ -91,6 +105,108 @@ class TestTableAgg(unittest.TestCase):
     ):
         self.run_test(input_rows, key_col, agg_col, functions.aggregate_min, expected)
 
+    @parameterized.expand([
+        (functions.aggregate_sum,), (functions.aggregate_max,), (functions.aggregate_min,)
+    ])
+    def test_scan_matches_shift(self, agg_func: Callable):
+
+        rng = random.Random(11)
+        for n in [1, 2, 3, 7, 16, 33]:
+            input_rows = [[rng.randint(0, 4), rng.randint(-50, 50)] for _ in range(n)]
+            self.assertEqual(
+                self.aggregate(input_rows, 0, 1, agg_func, "shift"),
+                self.aggregate(input_rows, 0, 1, agg_func, "scan")
+            )
+
+    @parameterized.expand([("shift",), ("scan",)])
+    def test_aggregate_multi(self, method: str):
+
+        rng = random.Random(12)
+        input_rows = [[rng.randint(0, 3)] + [rng.randint(-9, 9) for _ in range(3)] for _ in range(9)]
+
+        expected = [[0] * 4 for _ in input_rows]
+        for col, agg_func in [
+            (1, functions.aggregate_sum), (2, functions.aggregate_max), (3, functions.aggregate_min)
+        ]:
+            rows = [[r[0], r[col]] for r in input_rows]
+            for i, row in enumerate(self.aggregate(rows, 0, 1, agg_func, "shift")):
+                expected[i][0] = row[0]
+                expected[i][col] = row[1]
+
+        initialize_table_data("p1_input_", input_rows)
+        party = audit.Party(name="party")
+        data = serialize_input_table(input_rows, party, "p1_input_")
+        audit.Abstract.initialize({})
+        functions.aggregate(data, 0, {1: "sum", 2: "max", 3: "min"}, method=method)
+        output = [[audit.Output(v, "output", party).value.value for v in row] for row in data]
+
+        self.assertEqual(expected, output)
+        if method == "shift":
+            # a single sorting network, then one max and one min per pair of rows
+            self.assertEqual(len(SortingNetwork(9)) + 2 * 8, audit.Abstract.analysis["cmp"])
+            self.assertEqual(8, audit.Abstract.analysis["eq"])
+
+    @parameterized.expand([("shift",), ("scan",)])
+    def test_aggregate_multi_key(self, method: str):
+
+        rng = random.Random(14)
+        input_rows = [[rng.randint(0, 1), rng.randint(0, 2), rng.randint(-9, 9)] for _ in range(12)]
+        groups = {}
+        for a, b, v in input_rows:
+            groups[(a, b)] = groups.get((a, b), 0) + v
+
+        initialize_table_data("p1_input_", input_rows)
+        party = audit.Party(name="party")
+        data = serialize_input_table(input_rows, party, "p1_input_")
+        functions.aggregate(data, [0, 1], {2: "sum"}, method=method)
+        output = [[v.value for v in row] for row in data]
+
+        # the last row of each group holds the sum of the group, the others hold zero
+        keys = [tuple(row[:2]) for row in output]
+        self.assertEqual(sorted(keys), keys)
+        last = [i == len(keys) - 1 or keys[i] != keys[i + 1] for i in range(len(keys))]
+        self.assertEqual(
+            groups, {keys[i]: output[i][2] for i in range(len(keys)) if last[i]}
+        )
+        self.assertTrue(all(output[i][2] == 0 for i in range(len(keys)) if not last[i]))
+
+    @parameterized.expand([("shift",), ("scan",)])
+    def test_aggregate_count(self, method: str):
+
+        input_rows = [[2, 5, 1], [1, 3, 1], [2, 5, 4], [2, 7, 9], [1, 3, 3], [3, 1, 1]]
+        initialize_table_data("p1_input_", input_rows)
+        party = audit.Party(name="party")
+        data = serialize_input_table(input_rows, party, "p1_input_")
+        functions.aggregate(data, 0, {1: "count_distinct", 2: "count"}, method=method)
+        output = [[v.value for v in row] for row in data]
+
+        self.assertEqual(
+            [[1, 0, 0], [1, 1, 2], [2, 0, 0], [2, 0, 0], [2, 2, 3], [3, 1, 1]], output
+        )
+
+    @parameterized.expand([
+        ([[1, 2], [3, 4], [1, 3], [3, 3]], functions.aggregate_count, [[1, 0], [1, 2], [3, 0], [3, 2]]),
+        ([[1, 2], [1, 2], [1, 3], [3, 3]], functions.aggregate_count_distinct, [[1, 0], [1, 0], [1, 2], [3, 1]])
+    ])
+    def test_agg_count(self, input_rows: List[List[int]], agg_func: Callable, expected: List[List[int]]):
+        self.run_test(input_rows, 0, 1, agg_func, expected)
+
+    def test_aggregate_invalid(self):
+
+        with self.assertRaises(ValueError):
+            functions.aggregate([], 0, {0: "sum"})
+        with self.assertRaises(ValueError):
+            functions.aggregate([], [0, 1], {1: "sum"})
+        with self.assertRaises(ValueError):
+            functions.aggregate([], 0, {1: "avg"})
+        with self.assertRaises(ValueError):
+            functions.aggregate([], 0, {1: "count_distinct", 2: "count_distinct"})
+
+    def test_invalid_method(self):
+
+        with self.assertRaises(ValueError):
+            self.aggregate([[1, 2], [1, 3]], 0, 1, functions.aggregate_sum, "unknown")
+
 
 if __name__ == '__main__':
     unittest.main()
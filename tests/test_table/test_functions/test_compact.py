@@ -0,0 +1,35 @@
+import unittest
+from nada_dsl import audit
+from nada_data.table import functions, serialize_input_table
+from nada_data.array import serialize_input_array
+from nada_data.utils import initialize_table_data
+
+
+class TestTableCompact(unittest.TestCase):
+
+    def test_compact(self):
+
+        input_rows = [[1, 2], [3, 4], [5, 6], [7, 8], [9, 10]]
+        keep = [0, 1, 0, 0, 1]
+        initialize_table_data("p1_input_", input_rows)
+        audit.Abstract.initialize(
+            audit.Abstract.context | {f"p1_keep_{i}": keep[i] for i in range(len(keep))}
+        )
+        party = audit.Party(name="party")
+        data = serialize_input_table(input_rows, party, "p1_input_")
+        bits = serialize_input_array(keep, party, "p1_keep_")
+
+        rows, count = functions.compact(data, bits, limit=3)
+        output = [[v.value for v in row] for row in rows]
+
+        self.assertEqual(2, count.value)
+        self.assertEqual([[3, 4], [9, 10]], sorted(output[:2]))
+        self.assertEqual([[0, 0]], output[2:])
+        self.assertEqual(0, audit.Abstract.analysis["cmp"])
+
+        with self.assertRaises(ValueError):
+            functions.compact(data, bits[:2])
+
+
+if __name__ == '__main__':
+    unittest.main()
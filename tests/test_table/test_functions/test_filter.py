@@ -0,0 +1,37 @@
+import unittest
+from nada_dsl import audit
+from nada_data.array.functions.filter import nada_gteq
+from nada_data.table import functions, serialize_input_table
+from nada_data.utils import initialize_table_data
+
+
+class TestTableWhere(unittest.TestCase):
+
+    def test_where(self):
+
+        input_rows = [[1, 2], [3, 4], [5, 0], [7, 8], [9, 10]]
+        initialize_table_data("p1_input_", input_rows)
+        party = audit.Party(name="party")
+        data = serialize_input_table(input_rows, party, "p1_input_")
+
+        audit.Abstract.initialize(audit.Abstract.context)
+        bits = functions.where(data, [(0, ">", 2), (1, "!=", 0), (0, ">", 2), (0, nada_gteq, 9)])
+
+        self.assertEqual([0, 0, 0, 0, 1], [b.value for b in bits])
+        # the duplicate predicate is evaluated once per row
+        self.assertEqual(15, sum(audit.Abstract.analysis[op] for op in ["cmp", "eq", "ne"]))
+        self.assertEqual(15, audit.Abstract.analysis["ife"])
+
+        bits = functions.where(data, [(0, "<", data[2][0])], valid=bits)
+        self.assertEqual([0, 0, 0, 0, 0], [b.value for b in bits])
+
+        with self.assertRaises(ValueError):
+            functions.where(data, [])
+        with self.assertRaises(ValueError):
+            functions.where(data, [(0, "~", 1)])
+        with self.assertRaises(ValueError):
+            functions.where(data, [(0, "<", 1)], valid=bits[:2])
+
+
+if __name__ == '__main__':
+    unittest.main()
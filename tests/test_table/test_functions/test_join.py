@@ -0,0 +1,76 @@
+import unittest
+import random
+from typing import List
+from nada_dsl import audit
+from parameterized import parameterized
+from nada_data.table import functions, serialize_input_table
+from nada_data.utils import initialize_table_data_multi
+
+
+def nested_loop_join(primary: List[List[int]], foreign: List[List[int]]) -> List[List[int]]:
+    return [
+        [f[0]] + p[1:] + f[1:]
+        for f in foreign for p in primary if p[0] == f[0]
+    ]
+
+
+class TestTableJoin(unittest.TestCase):
+
+    def run_join(
+            self, primary: List[List[int]], foreign: List[List[int]], method: str
+    ) -> List[List[int]]:
+
+        initialize_table_data_multi({"primary": primary, "foreign": foreign})
+        primary_rows = serialize_input_table(primary, audit.Party(name="primary"), "primary_")
+        foreign_rows = serialize_input_table(foreign, audit.Party(name="foreign"), "foreign_")
+        rows = functions.join(primary_rows, foreign_rows, 0, 0, method=method)
+        return [[v.value for v in row] for row in rows]
+
+    @parameterized.expand([("shift",), ("scan",)])
+    def test_join(self, method: str):
+
+        primary = [[3, 30], [1, 10], [2, 20]]
+        foreign = [[2, 7, 1], [5, 8, 2], [3, 9, 3], [2, 6, 4]]
+        output = self.run_join(primary, foreign, method)
+
+        expected = nested_loop_join(primary, foreign)
+        self.assertEqual(len(foreign), len(output))
+        self.assertEqual(sorted(expected), sorted(output[:len(expected)]))
+        self.assertEqual([[0, 0, 0, 0]], output[len(expected):])
+
+    @parameterized.expand([("shift",), ("scan",)])
+    def test_join_random(self, method: str):
+
+        rng = random.Random(15)
+        keys = rng.sample(range(20), 9)
+        primary = [[k, rng.randint(-9, 9)] for k in keys]
+        foreign = [[rng.randint(0, 19), rng.randint(-9, 9)] for _ in range(13)]
+        output = self.run_join(primary, foreign, method)
+
+        expected = nested_loop_join(primary, foreign)
+        self.assertEqual(sorted(expected), sorted(output[:len(expected)]))
+        self.assertTrue(all(v == 0 for row in output[len(expected):] for v in row))
+
+    def test_join_invalid(self):
+
+        with self.assertRaises(ValueError):
+            functions.join([], [], [0, 1], 0)
+        with self.assertRaises(ValueError):
+            functions.join([], [], 0, 0, method="unknown")
+        self.assertEqual([], functions.join([], [], 0, 0))
+
+    def test_join_empty_primary(self):
+
+        foreign = [[2, 7, 1], [5, 8, 2]]
+        initialize_table_data_multi({"foreign": foreign})
+        foreign_rows = serialize_input_table(foreign, audit.Party(name="foreign"), "foreign_")
+
+        # every foreign row is kept, zeroed, as no row of the primary table matches it
+        rows = functions.join([], foreign_rows, 0, 1, primary_width=2)
+        self.assertEqual([[0, 0, 0, 0]] * 2, [[v.value for v in row] for row in rows])
+        with self.assertRaises(ValueError):
+            functions.join([], foreign_rows, 0, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,9 @@
 import unittest
+import random
 from typing import List
 from nada_dsl import audit
 from parameterized import parameterized
+from nada_data import SortingNetwork
 from nada_data.table import functions, serialize_input_table
 from nada_data.utils import initialize_table_data
 
@@ -38,17 +40,112 @@ class TestTableSort(unittest.TestCase):
             expected: List[int]
     ):
 
+        for swap in ["masked", "select"]:
+            initialize_table_data("p1_input_", input_rows)
+            party = audit.Party(name="party")
+            data = serialize_input_table(input_rows, party, "p1_input_")
+            functions.odd_even_sort(data, key_col, ascending, swap=swap)
+            output = [
+                [audit.Output(v, "output", party).value.value for v in data[i]]
+                for i in range(len(data))
+            ]
+
+            self.assertEqual(output, expected)
+
+        for algorithm in ["bitonic", "optimal"]:
+            initialize_table_data("p1_input_", input_rows)
+            party = audit.Party(name="party")
+            data = serialize_input_table(input_rows, party, "p1_input_")
+            functions.odd_even_sort(data, key_col, ascending, algorithm=algorithm)
+            output = [
+                [audit.Output(v, "output", party).value.value for v in data[i]]
+                for i in range(len(data))
+            ]
+
+            self.assertEqual(output, expected)
+
+    @parameterized.expand([
+        ("masked", {"cmp": 5, "ife": 5, "mul": 50}),
+        ("select", {"cmp": 5, "ife": 100, "mul": 0})
+    ])
+    def test_sort_op_count(self, swap: str, expected: dict):
+
+        input_rows = [[4 - i] + [i * 10 + j for j in range(9)] for i in range(4)]
+        initialize_table_data("p1_input_", input_rows)
+        party = audit.Party(name="party")
+        data = serialize_input_table(input_rows, party, "p1_input_")
+        functions.odd_even_sort(data, 0, True, swap=swap)
+
+        self.assertEqual(
+            {op: audit.Abstract.analysis[op] for op in expected}, expected
+        )
+        self.assertEqual([row[0].value for row in data], [1, 2, 3, 4])
+
+    @parameterized.expand([
+        ([[7, 8], [1, 6], [9, 2], [4, 4]], 0, 2, True, [[9, 2], [7, 8]]),
+        ([[7, 8], [1, 6], [9, 2], [4, 4]], 1, 1, True, [[7, 8]]),
+        ([[7, 8], [1, 6], [9, 2], [4, 4]], 1, 3, False, [[9, 2], [4, 4], [1, 6]])
+    ])
+    def test_top_k(
+            self,
+            input_rows: List[List[int]],
+            key_col: int,
+            k: int,
+            largest: bool,
+            expected: List[List[int]]
+    ):
+
         initialize_table_data("p1_input_", input_rows)
         party = audit.Party(name="party")
         data = serialize_input_table(input_rows, party, "p1_input_")
-        functions.odd_even_sort(data, key_col, ascending)
         output = [
-            [audit.Output(v, "output", party).value.value for v in data[i]]
-            for i in range(len(data))
+            [v.value for v in row]
+            for row in functions.top_k(data, key_col, k, largest)
         ]
 
         self.assertEqual(output, expected)
 
+    @parameterized.expand([(True,), (False,)])
+    def test_sort_multi_key(self, ascending: bool):
+
+        rng = random.Random(13)
+        input_rows = [[rng.randint(0, 2), rng.randint(0, 3), i] for i in range(11)]
+        initialize_table_data("p1_input_", input_rows)
+        party = audit.Party(name="party")
+        data = serialize_input_table(input_rows, party, "p1_input_")
+        functions.odd_even_sort(data, [0, 1], ascending)
+        output = [[v.value for v in row] for row in data]
+
+        self.assertEqual(sorted(input_rows), sorted(output))
+        self.assertEqual(
+            sorted([row[:2] for row in input_rows], reverse=not ascending),
+            [row[:2] for row in output]
+        )
+        # one comparison per key and one equality test per extra key for each comparator
+        comparators = len(SortingNetwork(11))
+        self.assertEqual(2 * comparators, audit.Abstract.analysis["cmp"])
+        self.assertEqual(comparators, audit.Abstract.analysis["eq"])
+
+    def test_top_k_multi_key(self):
+
+        input_rows = [[1, 5], [2, 1], [1, 7], [2, 3], [0, 9]]
+        initialize_table_data("p1_input_", input_rows)
+        party = audit.Party(name="party")
+        data = serialize_input_table(input_rows, party, "p1_input_")
+        output = [[v.value for v in row] for row in functions.top_k(data, [0, 1], 3)]
+
+        self.assertEqual([[2, 3], [2, 1], [1, 7]], output)
+
+    def test_sort_multi_key_invalid(self):
+        with self.assertRaises(ValueError):
+            functions.odd_even_sort([], [0, 1], True, swap="select")
+        with self.assertRaises(ValueError):
+            functions.odd_even_sort([], [], True)
+
+    def test_sort_unknown_swap(self):
+        with self.assertRaises(ValueError):
+            functions.odd_even_sort([], 0, True, swap="unknown")
+
 
 if __name__ == '__main__':
     unittest.main()
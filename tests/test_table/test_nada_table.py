@@ -1,8 +1,9 @@
 import unittest
 import doctest
 from typing import List, Callable, Dict
-from nada_dsl import audit
+from nada_dsl import audit, SecretInteger, Input, Party
 from parameterized import parameterized
+from nada_data import NadaArray
 from nada_data.table import nada_table, NadaTable, serialize_input_table
 from nada_data.utils import initialize_table_data, initialize_table_data_multi
 
@@ -95,6 +96,55 @@ class TestNadaTable(unittest.TestCase):
         ]
         self.assertEqual(output, expected_rows)
 
+    def test_parties_mutation(self):
+
+        rows = [
+            NadaArray([
+                SecretInteger(Input(name=f"input_{i}_{j}", party=Party(name=name)))
+                for j in range(2)
+            ])
+            for i, name in enumerate(["party_one", "party_two", "party_two"])
+        ]
+        nt = NadaTable("a", "b", rows=rows)
+
+        del nt[1]
+        self.assertEqual(nt.get_parties(), {"party_one", "party_two"})
+        nt[0] = nt[1]
+        self.assertEqual(nt.get_parties(), {"party_two"})
+        nt.set_data(rows[:1])
+        self.assertEqual(nt.get_parties(), {"party_one"})
+
+        # rows mutated in place after they were added
+        nt.append(rows[1])
+        rows[0][0] = rows[1][0]
+        rows[0][1] = rows[1][1]
+        self.assertEqual(nt.get_parties(), {"party_two"})
+        del nt[1]
+        self.assertEqual(str(nt), "NadaTable | cols=['a','b'] | rows=1 | parties=['party_two']")
+
+    def test_operations_share_values(self):
+
+        input_rows = [[3, 4, 5], [1, 2, 6]]
+        initialize_table_data("p1_input_", input_rows)
+        party = audit.Party(name="party")
+        nt = NadaTable(
+            "a", "b", "c",
+            rows=serialize_input_table(input_rows, party, "p1_input_")
+        )
+
+        selected = nt.select("c", "a")
+        self.assertIs(selected[0][0], nt[0][2])
+        self.assertIs(selected[1][1], nt[1][0])
+
+        concatenated = nt.concat(nt)
+        self.assertIs(concatenated[2][1], nt[0][1])
+
+        # sorting must not affect the rows of the original table
+        sorted_table = nt.sort_by("a", True)
+        self.assertEqual([[v.value for v in r] for r in sorted_table.get_data()], [[1, 2, 6], [3, 4, 5]])
+        self.assertEqual([[v.value for v in r] for r in nt.get_data()], input_rows)
+        self.assertEqual([[v.value for v in r] for r in concatenated.get_data()], input_rows * 2)
+
     @parameterized.expand([
         (
             ["a", "b"], "a", True,
@@ -127,14 +177,53 @@ class TestNadaTable(unittest.TestCase):
             *cols,
             rows=serialize_input_table(input_rows, party, "p1_input_")
         )
-        sorted_table = nt.sort_by(key_col, ascending)
+        for layered in [False, True]:
+            sorted_table = nt.sort_by(key_col, ascending, layered=layered)
+
+            output = [
+                [audit.Output(v, "output", party).value.value for v in sorted_table._rows[i]]
+                for i in range(len(sorted_table._rows))
+            ]
+
+            self.assertEqual(output, expected)
+
+    @parameterized.expand([
+        (
+            ["a", "b", "c"], "b", 2, True,
+            [[7, 8, 2], [1, 6, 5], [9, 2, 3], [4, 7, 1]],
+            [[7, 8, 2], [4, 7, 1]]
+        ),
+        (
+            ["a", "b", "c"], "c", 1, False,
+            [[7, 8, 2], [1, 6, 5], [9, 2, 3], [4, 7, 1]],
+            [[4, 7, 1]]
+        )
+    ])
+    def test_top_k(
+            self,
+            cols: list,
+            key_col: str,
+            k: int,
+            largest: bool,
+            input_rows: List[List[int]],
+            expected: List[List[int]]
+    ):
+
+        initialize_table_data("p1_input_", input_rows)
+        party = audit.Party(name="party")
+        nt = NadaTable(
+            *cols,
+            rows=serialize_input_table(input_rows, party, "p1_input_")
+        )
+        top_table = nt.top_k(key_col, k, largest)
 
         output = [
-            [audit.Output(v, "output", party).value.value for v in sorted_table._rows[i]]
-            for i in range(len(sorted_table._rows))
+            [audit.Output(v, "output", party).value.value for v in top_table._rows[i]]
+            for i in range(len(top_table._rows))
         ]
 
         self.assertEqual(output, expected)
+        self.assertEqual(len(nt), len(input_rows))
 
     def run_agg_test(
             self,
@@ -152,14 +241,15 @@ class TestNadaTable(unittest.TestCase):
             *cols,
             rows=serialize_input_table(input_rows, party, "p1_input_")
         )
-        agged_table = agg_func(nt, key_col, agg_col)
+        for method in ["shift", "scan"]:
+            agged_table = agg_func(nt, key_col, agg_col, method=method)
 
-        output = [
-            [audit.Output(v, "output", party).value.value for v in agged_table._rows[i]]
-            for i in range(len(agged_table._rows))
-        ]
+            output = [
+                [audit.Output(v, "output", party).value.value for v in agged_table._rows[i]]
+                for i in range(len(agged_table._rows))
+            ]
 
-        self.assertEqual(output, expected)
+            self.assertEqual(output, expected)
 
     @parameterized.expand([
         (
@@ -185,6 +275,187 @@ class TestNadaTable(unittest.TestCase):
             input_rows, cols, key_col, agg_col, nada_table.NadaTable.aggregate_sum, expected
         )
 
+    def test_multi_key(self):
+
+        input_rows = [[2, 1, 5], [1, 2, 6], [2, 1, 7], [1, 1, 1], [2, 0, 4]]
+        initialize_table_data("p1_input_", input_rows)
+        party = audit.Party(name="party")
+        nt = NadaTable("a", "b", "c", rows=serialize_input_table(input_rows, party, "p1_input_"))
+
+        sorted_table = nt.sort_by(["a", "b"], False)
+        self.assertEqual(
+            [[2, 1], [2, 1], [2, 0], [1, 2], [1, 1]],
+            [[v.value for v in row][:2] for row in sorted_table._rows]
+        )
+
+        agged_table = nt.aggregate(["a", "b"], {"c": "sum"}, method="scan")
+        self.assertEqual(["a", "b", "c"], agged_table.columns)
+        self.assertEqual(
+            [[1, 1, 1], [1, 2, 6], [2, 0, 4], [2, 1, 0], [2, 1, 12]],
+            [[v.value for v in row] for row in agged_table._rows]
+        )
+        with self.assertRaises(ValueError):
+            nt.aggregate(["a", "b"], {"b": "sum"})
+
+    def test_aggregate(self):
+
+        input_rows = [[1, 2, 5, 9], [3, 4, 6, 8], [1, 3, 7, 7], [3, 3, 1, 6]]
+        initialize_table_data("p1_input_", input_rows)
+        party = audit.Party(name="party")
+        nt = NadaTable("a", "b", "c", "d", rows=serialize_input_table(input_rows, party, "p1_input_"))
+
+        for method in ["shift", "scan"]:
+            agged_table = nt.aggregate("a", {"d": "min", "b": "sum", "c": "max"}, method=method)
+            output = [
+                [audit.Output(v, "output", party).value.value for v in row]
+                for row in agged_table._rows
+            ]
+
+            self.assertEqual(["a", "d", "b", "c"], agged_table.columns)
+            self.assertEqual([[1, 0, 0, 0], [1, 7, 5, 7], [3, 0, 0, 0], [3, 6, 7, 6]], output)
+
+        with self.assertRaises(ValueError):
+            nt.aggregate("a", {"a": "sum"})
+        with self.assertRaises(ValueError):
+            nt.aggregate("a", {"b": "median"})
+
+    def test_join(self):
+
+        inputs = {"primary": [[1, 10, 5], [2, 20, 6]], "foreign": [[7, 2, 0], [1, 1, 1], [2, 3, 2]]}
+        initialize_table_data_multi(inputs)
+        primary = NadaTable(
+            "id", "x", "y", rows=serialize_input_table(inputs["primary"], audit.Party(name="primary"), "primary_")
+        )
+        foreign = NadaTable(
+            "z", "id", "w", rows=serialize_input_table(inputs["foreign"], audit.Party(name="foreign"), "foreign_")
+        )
+
+        for method in ["shift", "scan"]:
+            joined = primary.join(foreign, "id", method=method)
+            output = [[v.value for v in row] for row in joined._rows]
+
+            self.assertEqual(["id", "x", "y", "z", "w"], joined.columns)
+            self.assertEqual([[1, 10, 5, 1, 1], [2, 20, 6, 7, 0]], sorted(output[:2]))
+            self.assertEqual([0, 0, 0, 0, 0], output[2])
+
+        with self.assertRaises(ValueError):
+            primary.join(primary, "id")
+
+        empty = NadaTable("id", "x", "y", rows=[])
+        joined = empty.join(foreign, "id")
+        self.assertEqual(["id", "x", "y", "z", "w"], joined.columns)
+        self.assertEqual([[0] * 5] * 3, [[v.value for v in row] for row in joined._rows])
+
+    def test_where(self):
+
+        input_rows = [[3, 10, 7], [1, 20, 8], [3, 30, 9], [2, 40, 1], [1, 50, 2]]
+        initialize_table_data("p1_input_", input_rows)
+        party = audit.Party(name="party")
+        nt = NadaTable("a", "b", "c", rows=serialize_input_table(input_rows, party, "p1_input_"))
+
+        self.assertIsNone(nt.get_valid())
+        filtered = nt.where("b", ">", 15).where("c", "<", 9)
+        self.assertEqual(5, len(filtered))
+        self.assertEqual([0, 1, 0, 1, 1], [v.value for v in filtered.get_valid()])
+        self.assertEqual([0, 1, 0, 1, 1], [v.value for v in filtered.select("a").get_valid()])
+
+        sorted_table = filtered.sort_by("a", False)
+        self.assertEqual(
+            [[2, 40, 1], [1, 50, 2], [1, 20, 8]],
+            sorted([[v.value for v in row] for row in sorted_table._rows[:3]], reverse=True)
+        )
+        self.assertEqual([1, 1, 1, 0, 0], [v.value for v in sorted_table.get_valid()])
+
+        top = filtered.top_k("b", 2)
+        self.assertEqual([[1, 50, 2], [2, 40, 1]], [[v.value for v in row] for row in top._rows])
+
+        for method in ["shift", "scan"]:
+            agged_table = filtered.aggregate("a", {"b": "sum", "c": "count"}, method=method)
+            output = [
+                [v.value for v in row] for row, bit in zip(agged_table._rows, agged_table.get_valid())
+                if bit.value == 1
+            ]
+            self.assertEqual([[1, 0, 0], [1, 70, 2], [2, 40, 1]], sorted(output))
+            self.assertEqual(2, [v.value for v in agged_table.get_valid()].count(0))
+
+        foreign = nt.select("a", "c").where("c", "!=", 2)
+        joined = filtered.select("a", "b").where("a", ">", 1).join(foreign, "a")
+        output = [[v.value for v in row] for row in joined._rows]
+        self.assertEqual([[2, 40, 1]], output[:1])
+        self.assertEqual([[0, 0, 0]] * 4, output[1:])
+
+        self.assertEqual(
+            [0, 1, 0, 1, 1, 1, 1, 1, 1, 1], [v.value for v in filtered.concat(nt).get_valid()]
+        )
+        with self.assertRaises(ValueError):
+            nt.where("d", "<", 1)
+        with self.assertRaises(ValueError):
+            nt.where("a", "~", 1)
+
+    def test_where_then_mutate(self):
+
+        input_rows = [[1, 10], [7, 20], [9, 30], [2, 40]]
+        initialize_table_data("p1_input_", input_rows)
+        party = audit.Party(name="party")
+        rows = serialize_input_table(input_rows, party, "p1_input_")
+
+        # rows added after where are valid, whether or not the predicates were evaluated
+        lazy = NadaTable("a", "b", rows=rows[:2]).where("a", "<", 5)
+        evaluated = NadaTable("a", "b", rows=rows[:2]).where("a", "<", 5)
+        evaluated.get_valid()
+        for table in [lazy, evaluated]:
+            table.append(rows[2])
+            table.insert(0, rows[2])
+            table.extend([rows[3]])
+            table[1] = rows[3]
+        self.assertEqual([1, 1, 0, 1, 1], [v.value for v in lazy.get_valid()])
+        self.assertEqual(
+            [v.value for v in evaluated.get_valid()], [v.value for v in lazy.get_valid()]
+        )
+
+        # a replaced row is valid, whatever the predicates made of the row it replaces
+        for table in [lazy, evaluated]:
+            table[2] = rows[2]
+            self.assertEqual([1, 1, 1, 1, 1], [v.value for v in table.get_valid()])
+
+    def test_where_then_aggregate(self):
+
+        input_rows = [[0, 2, 4], [1, 0, -3]]
+        initialize_table_data("p1_input_", input_rows)
+        party = audit.Party(name="party")
+        nt = NadaTable("a", "b", "c", rows=serialize_input_table(input_rows, party, "p1_input_"))
+
+        # the filtered row keeps its key, and is told apart from the groups by its bit
+        agged_table = nt.where("c", ">", -3).aggregate_sum("a", "b")
+        output = [[v.value for v in row] for row in agged_table._rows]
+        self.assertEqual([[0, 2], [1, 0]], output)
+        self.assertEqual([1, 0], [v.value for v in agged_table.get_valid()])
+
+    def test_aggregate_avg(self):
+
+        input_rows = [[1, 2, 5], [3, 4, 6], [1, 3, 5], [3, 3, 1], [3, 8, 1]]
+        initialize_table_data("p1_input_", input_rows)
+        party = audit.Party(name="party")
+        nt = NadaTable("a", "b", "c", rows=serialize_input_table(input_rows, party, "p1_input_"))
+
+        agged_table = nt.aggregate("a", {"b": "avg", "c": "count_distinct"})
+        self.assertEqual(["a", "b", "b_count", "c"], agged_table.columns)
+        self.assertEqual(
+            [[1, 0, 0, 0], [1, 5, 2, 1], [3, 0, 0, 0], [3, 0, 0, 0], [3, 15, 3, 2]],
+            [[v.value for v in row] for row in agged_table._rows]
+        )
+        self.assertEqual(["a", "c", "c_count"], nt.aggregate_avg("a", "c").columns)
+        self.assertEqual(["a", "b"], nt.aggregate_count("a", "b").columns)
+
+        # the count column of an average must not clash with another output column
+        renamed = nt.rename("a", "b", "b_count")
+        with self.assertRaises(ValueError):
+            renamed.aggregate("a", {"b": "avg", "b_count": "sum"})
+        with self.assertRaises(ValueError):
+            nt.rename("b_count", "b", "c").aggregate_avg("b_count", "b")
+        with self.assertRaises(ValueError):
+            renamed.query().aggregate("a", {"b": "avg", "b_count": "sum"})
+
     @parameterized.expand([
         (
                 [[1, 2], [3, 4], [1, 3], [3, 3]],
@@ -0,0 +1,150 @@
+import unittest
+import doctest
+from typing import List
+from nada_dsl import audit
+from nada_data.table import query, collect, NadaTable, serialize_input_table
+from nada_data.utils import initialize_table_data
+
+
+def load_tests(loader, tests, ignore):
+    """
+    This is a special function that is recognized by unittest and can be used to add
+    additional tests to a test suite. In this case, we are adding the doctest tests
+    from the query module to this test suite.
+    """
+    tests.addTests(doctest.DocTestSuite(query))
+    return tests
+
+
+ROWS = [[3, 10, 7, 1], [1, 20, 8, 2], [3, 30, 9, 3], [2, 40, 1, 4], [1, 50, 2, 5]]
+
+
+def _table(input_rows: List[List[int]]) -> NadaTable:
+    initialize_table_data("p1_input_", input_rows)
+    party = audit.Party(name="party")
+    return NadaTable("a", "b", "c", "d", rows=serialize_input_table(input_rows, party, "p1_input_"))
+
+
+def _values(table: NadaTable) -> List[List[int]]:
+    return [[v.value for v in row] for row in table.get_data()]
+
+
+def _steps(q: query.Query) -> List[str]:
+    return [step.op for step in q.steps]
+
+
+class TestQuery(unittest.TestCase):
+
+    def test_optimize(self):
+
+        nt = _table(ROWS)
+
+        # sorts that are sorted again, or aggregated, are dropped
+        q = nt.query().sort_by("a", True).where("b", ">", 5).sort_by("c", False)
+        self.assertEqual(["where", "sort_by"], _steps(q.optimize()))
+        q = nt.query().sort_by("a", True).aggregate_sum("a", "b")
+        self.assertEqual(["aggregate"], _steps(q.optimize()))
+
+        # a sort on a prefix of the keys of the previous sort is dropped
+        q = nt.query().sort_by(["a", "b"], True).sort_by("a", True)
+        self.assertEqual(["sort_by"], _steps(q.optimize()))
+        self.assertEqual(("a", "b"), q.optimize().steps[0].args[0])
+        q = nt.query().sort_by(["a", "b"], True).sort_by("a", False)
+        self.assertEqual(("a",), q.optimize().steps[0].args[0])
+
+        # unused columns are dropped ahead of sorts
+        q = nt.query().where("d", "<", 5).sort_by("a", True).select("b", "a")
+        optimized = q.optimize()
+        self.assertEqual(["where", "select", "sort_by", "select"], _steps(optimized))
+        self.assertEqual(("a", "b"), optimized.steps[1].args[0])
+        self.assertEqual(q.columns, optimized.columns)
+
+        q = nt.query().sort_by("a", True)
+        self.assertEqual(["sort_by"], _steps(q.optimize()))
+
+    def test_collect(self):
+
+        nt = _table(ROWS)
+        other = _table(ROWS)
+
+        self.assertEqual(
+            _values(nt.where("d", "<", 5).sort_by("a", True).select("b", "a")),
+            _values(nt.query().where("d", "<", 5).sort_by("a", True).select("b", "a").collect())
+        )
+        self.assertEqual(
+            _values(nt.top_k("b", 2, False).concat(nt.top_k("b", 2, False)).select("c")),
+            _values(nt.query().top_k("b", 2, False).concat(nt.top_k("b", 2, False)).select("c").collect())
+        )
+        self.assertEqual(
+            _values(nt.select("d", "b").join(other.select("c", "d"), "d").select("d", "c")),
+            _values(
+                nt.query().select("d", "b").sort_by("b", True).join(other.select("c", "d"), "d")
+                .select("d", "c").collect()
+            )
+        )
+        self.assertEqual(ROWS, _values(nt.query().collect()))
+
+        with self.assertRaises(ValueError):
+            nt.query().select("e")
+        with self.assertRaises(ValueError):
+            nt.query().aggregate("a", {"a": "sum"})
+        with self.assertRaises(ValueError):
+            nt.query().concat(nt.select("a"))
+        with self.assertRaises(ValueError):
+            nt.query().join(other, "a")
+
+    def test_cost(self):
+
+        nt = _table(ROWS)
+        other = _table(ROWS).select("c", "d").where("c", ">", 2)
+        pipelines = [
+            nt.query().where("b", ">", 15).where("c", "<", 9).sort_by("a", True).select("a", "b"),
+            nt.query().where("b", ">", 15).aggregate("a", {"c": "avg", "d": "count_distinct"}),
+            nt.query().top_k(["a", "b"], 2).concat(nt.top_k("a", 2).where("d", "==", 1)),
+            nt.query().where("d", "!=", 3).select("d", "b").join(other, "d", method="scan"),
+            nt.query().aggregate_max("a", "b", method="scan").sort_by("b", False)
+        ]
+
+        for q in pipelines:
+            self.assertEqual(len(q.optimize().steps) + 2, len(q.explain().splitlines()))
+            # estimated before evaluating, which evaluates the predicates of other tables
+            estimated = q.cost().counts()
+            audit.Abstract.initialize(audit.Abstract.context)
+            q.collect()
+            self.assertEqual(dict(audit.Abstract.analysis), estimated)
+
+    def test_shared_aggregation(self):
+
+        nt = _table(ROWS)
+        base = nt.query().where("d", "!=", 3)
+        queries = [
+            base.aggregate_sum("a", "b"),
+            base.aggregate_avg("a", "c"),
+            base.aggregate_count_distinct("a", "d"),
+            base.aggregate_count_distinct("a", "b")
+        ]
+
+        expected = [
+            _values(nt.where("d", "!=", 3).aggregate("a", {"b": "sum"})),
+            _values(nt.where("d", "!=", 3).aggregate("a", {"c": "avg"})),
+            _values(nt.where("d", "!=", 3).aggregate("a", {"d": "count_distinct"})),
+            _values(nt.where("d", "!=", 3).aggregate("a", {"b": "count_distinct"}))
+        ]
+        audit.Abstract.initialize(audit.Abstract.context)
+        outputs = collect(*queries)
+        merged = audit.Abstract.analysis["cmp"]
+
+        self.assertEqual(["a", "b"], outputs[0].columns)
+        self.assertEqual(["a", "c", "c_count"], outputs[1].columns)
+        for e, o in zip(expected, outputs):
+            self.assertEqual(sorted(e), sorted(_values(o)))
+
+        # the first three aggregations share a sort, and the predicate is evaluated once
+        audit.Abstract.initialize(audit.Abstract.context)
+        for q in queries:
+            q.collect()
+        self.assertLess(merged, audit.Abstract.analysis["cmp"])
+
+
+if __name__ == "__main__":
+    unittest.main()